@@ -1,96 +1,172 @@
 #!/usr/bin/env python3
 # Configuration Loading PoC for Metadata Code Extractor
+import functools
 import os
 import sys
-from dotenv import load_dotenv
-
-# Check for required packages
-try:
-    from pydantic import BaseModel, Field
-except ImportError:
-    print("Error: pydantic package not installed.")
-    print("Install with: pip install pydantic")
-    sys.exit(1)
+from types import SimpleNamespace
+from env_bootstrap import init_env
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
 
 # Load environment variables
-load_dotenv()
+init_env()
+
+# Snapshot the environment once; field defaults below read from it lazily
+_ENV = os.environ.copy()
+
+
+def _env(key, default=""):
+    """Build a default_factory that reads `key` from the env snapshot."""
+    return lambda: _ENV.get(key, default)
+
+
+def _env_int(key, default):
+    return lambda: int(_ENV.get(key, default))
+
+
+def _env_float(key, default):
+    return lambda: float(_ENV.get(key, default))
 
-class LLMConfig(BaseModel):
-    provider: str = Field(
-        default=os.getenv("LLM_PROVIDER", "openrouter"), 
+
+class AppConfig(BaseModel):
+    """Flat config model; `llm`, `database` and `scanning` are grouped read-only views."""
+
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
+    # LLM settings
+    llm_provider: str = Field(
+        default_factory=_env("LLM_PROVIDER", "openrouter"), 
         description="LLM provider to use"
     )
-    openrouter_api_key: str = Field(
-        default=os.getenv("OPENROUTER_API_KEY", ""), 
+    llm_openrouter_api_key: str = Field(
+        default_factory=_env("OPENROUTER_API_KEY", ""), 
         description="OpenRouter API key"
     )
-    openrouter_model: str = Field(
-        default=os.getenv("OPENROUTER_MODEL", "openai/gpt-4"), 
+    llm_openrouter_model: str = Field(
+        default_factory=_env("OPENROUTER_MODEL", "openai/gpt-4"), 
         description="OpenRouter model to use"
     )
-    openrouter_site_url: str = Field(
-        default=os.getenv("OPENROUTER_SITE_URL", "https://github.com/metadata-code-extractor"), 
+    llm_openrouter_site_url: str = Field(
+        default_factory=_env("OPENROUTER_SITE_URL", "https://github.com/metadata-code-extractor"), 
         description="OpenRouter site URL for referrer"
     )
-    openrouter_app_name: str = Field(
-        default=os.getenv("OPENROUTER_APP_NAME", "metadata-code-extractor"), 
+    llm_openrouter_app_name: str = Field(
+        default_factory=_env("OPENROUTER_APP_NAME", "metadata-code-extractor"), 
         description="OpenRouter app name"
     )
 
-class DatabaseConfig(BaseModel):
-    graph_provider: str = Field(
-        default=os.getenv("GRAPH_DB_PROVIDER", "neo4j"), 
+    # Database settings
+    database_graph_provider: str = Field(
+        default_factory=_env("GRAPH_DB_PROVIDER", "neo4j"), 
         description="Graph database provider"
     )
-    vector_provider: str = Field(
-        default=os.getenv("VECTOR_DB_PROVIDER", "weaviate"), 
+    database_vector_provider: str = Field(
+        default_factory=_env("VECTOR_DB_PROVIDER", "weaviate"), 
         description="Vector database provider"
     )
-    neo4j_uri: str = Field(
-        default=os.getenv("NEO4J_URI", "bolt://localhost:7687"), 
+    database_neo4j_uri: str = Field(
+        default_factory=_env("NEO4J_URI", "bolt://localhost:7687"), 
         description="Neo4j connection URI"
     )
-    neo4j_user: str = Field(
-        default=os.getenv("NEO4J_USER", "neo4j"), 
+    database_neo4j_user: str = Field(
+        default_factory=_env("NEO4J_USER", "neo4j"), 
         description="Neo4j username"
     )
-    neo4j_password: str = Field(
-        default=os.getenv("NEO4J_PASSWORD", "password"), 
+    database_neo4j_password: str = Field(
+        default_factory=_env("NEO4J_PASSWORD", "password"), 
         description="Neo4j password"
     )
-    weaviate_url: str = Field(
-        default=os.getenv("WEAVIATE_URL", "http://localhost:8080"), 
+    database_weaviate_url: str = Field(
+        default_factory=_env("WEAVIATE_URL", "http://localhost:8080"), 
         description="Weaviate connection URL"
     )
-    weaviate_api_key: str = Field(
-        default=os.getenv("WEAVIATE_API_KEY", ""), 
+    database_weaviate_api_key: str = Field(
+        default_factory=_env("WEAVIATE_API_KEY", ""), 
         description="Weaviate API key (optional for local instances)"
     )
 
-class ScanningConfig(BaseModel):
-    chunk_size: int = Field(
-        default=int(os.getenv("DEFAULT_CHUNK_SIZE", "40")), 
+    # Scanning settings
+    scanning_chunk_size: int = Field(
+        default_factory=_env_int("DEFAULT_CHUNK_SIZE", "40"), 
         description="Default code chunk size"
     )
-    chunk_overlap: int = Field(
-        default=int(os.getenv("DEFAULT_CHUNK_OVERLAP", "10")), 
+    scanning_chunk_overlap: int = Field(
+        default_factory=_env_int("DEFAULT_CHUNK_OVERLAP", "10"), 
         description="Default chunk overlap"
     )
-    max_tokens: int = Field(
-        default=int(os.getenv("MAX_TOKENS", "16000")), 
+    scanning_max_tokens: int = Field(
+        default_factory=_env_int("MAX_TOKENS", "16000"), 
         description="Maximum tokens for LLM context"
     )
-    temperature: float = Field(
-        default=float(os.getenv("TEMPERATURE", "0.1")), 
+    scanning_temperature: float = Field(
+        default_factory=_env_float("TEMPERATURE", "0.1"), 
         description="LLM temperature setting"
     )
 
-class AppConfig(BaseModel):
-    llm: LLMConfig = Field(default_factory=LLMConfig)
-    database: DatabaseConfig = Field(default_factory=DatabaseConfig)
-    scanning: ScanningConfig = Field(default_factory=ScanningConfig)
-    log_level: str = Field(default=os.getenv("LOG_LEVEL", "INFO"), description="Logging level")
-    log_file: str = Field(default=os.getenv("LOG_FILE", "metadata_code_extractor.log"), description="Log file path")
+    log_level: str = Field(default_factory=_env("LOG_LEVEL", "INFO"), description="Logging level")
+    log_file: str = Field(default_factory=_env("LOG_FILE", "metadata_code_extractor.log"), description="Log file path")
+
+    def _group(self, prefix):
+        """Collect the fields starting with `prefix` into a namespace without it."""
+        return SimpleNamespace(**{
+            name[len(prefix):]: getattr(self, name)
+            for name in type(self).model_fields
+            if name.startswith(prefix)
+        })
+
+    @functools.cached_property
+    def llm(self):
+        return self._group("llm_")
+
+    @functools.cached_property
+    def database(self):
+        return self._group("database_")
+
+    @functools.cached_property
+    def scanning(self):
+        return self._group("scanning_")
+
+# Required fields per provider as (field, label, show_value)
+_LLM_REQUIRED = {
+    "openrouter": (
+        ("openrouter_api_key", "OpenRouter API key", False),
+        ("openrouter_model", "OpenRouter model", True),
+        ("openrouter_site_url", "OpenRouter site URL", True),
+    ),
+}
+_GRAPH_DB_REQUIRED = {
+    "neo4j": (
+        ("neo4j_uri", "Neo4j URI", True),
+        ("neo4j_user", "Neo4j username", True),
+        ("neo4j_password", "Neo4j password", False),
+    ),
+}
+_VECTOR_DB_REQUIRED = {
+    "weaviate": (
+        ("weaviate_url", "Weaviate URL", True),
+    ),
+}
+
+def _check_required(section, required, lines):
+    """Append a status line per required field; return True if all are set."""
+    all_set = True
+    for field, label, show_value in required:
+        value = getattr(section, field)
+        if not value:
+            lines.append(f"❌ Warning: {label} is empty")
+            all_set = False
+        elif show_value:
+            lines.append(f"✅ {label} is set: {value}")
+        else:
+            lines.append(f"✅ {label} is set")
+    return all_set
+
+# Built once so the validator/serializer is reused for every (de)serialization
+_APP_ADAPTER = TypeAdapter(AppConfig)
+
+@functools.lru_cache(maxsize=1)
+def get_config() -> AppConfig:
+    """Build the AppConfig once per process; use get_config.cache_clear() to reset."""
+    return AppConfig()
 
 def run_poc():
     success = True
@@ -102,7 +178,7 @@ def run_poc():
     
     try:
         print("Loading configuration...")
-        config = AppConfig()
+        config = get_config()
         validation_results["config_loading"] = True
         
         print("\n✅ Configuration loaded successfully:")
@@ -113,80 +189,41 @@ def run_poc():
         print(f"Log Level: {config.log_level}")
         
         # Validate provider-specific configurations
-        print("\nValidating LLM provider configuration...")
-        if config.llm.provider == "openrouter":
-            if not config.llm.openrouter_api_key:
-                print("❌ Warning: OpenRouter API key is empty")
-                success = False
-            else:
-                print("✅ OpenRouter API key is set")
-                
-            if not config.llm.openrouter_model:
-                print("❌ Warning: OpenRouter model is empty")
-                success = False
-            else:
-                print(f"✅ OpenRouter model is set: {config.llm.openrouter_model}")
-                
-            if not config.llm.openrouter_site_url:
-                print("❌ Warning: OpenRouter site URL is empty")
-                success = False
-            else:
-                print(f"✅ OpenRouter site URL is set: {config.llm.openrouter_site_url}")
-                
-            validation_results["llm_provider_validation"] = bool(
-                config.llm.openrouter_api_key and 
-                config.llm.openrouter_model and 
-                config.llm.openrouter_site_url
-            )
+        lines = ["\nValidating LLM provider configuration..."]
+        llm_required = _LLM_REQUIRED.get(config.llm.provider)
+        if llm_required:
+            llm_ok = _check_required(config.llm, llm_required, lines)
+            validation_results["llm_provider_validation"] = llm_ok
+            success = success and llm_ok
+        print("\n".join(lines))
         
-        print("\nValidating database provider configuration...")
-        if config.database.graph_provider == "neo4j":
-            if not config.database.neo4j_uri:
-                print("❌ Warning: Neo4j URI is empty")
-                success = False
-            else:
-                print(f"✅ Neo4j URI is set: {config.database.neo4j_uri}")
-                
-            if not config.database.neo4j_user:
-                print("❌ Warning: Neo4j username is empty")
-                success = False
-            else:
-                print(f"✅ Neo4j username is set: {config.database.neo4j_user}")
-                
-            if not config.database.neo4j_password:
-                print("❌ Warning: Neo4j password is empty")
-                success = False
-            else:
-                print("✅ Neo4j password is set")
-                
-            validation_results["database_provider_validation"] = bool(
-                config.database.neo4j_uri and 
-                config.database.neo4j_user and 
-                config.database.neo4j_password
-            )
+        lines = ["\nValidating database provider configuration..."]
+        graph_required = _GRAPH_DB_REQUIRED.get(config.database.graph_provider)
+        if graph_required:
+            graph_ok = _check_required(config.database, graph_required, lines)
+            validation_results["database_provider_validation"] = graph_ok
+            success = success and graph_ok
+            
+        vector_required = _VECTOR_DB_REQUIRED.get(config.database.vector_provider)
+        if vector_required:
+            success = _check_required(config.database, vector_required, lines) and success
             
-        if config.database.vector_provider == "weaviate":
-            if not config.database.weaviate_url:
-                print("❌ Warning: Weaviate URL is empty")
-                success = False
-            else:
-                print(f"✅ Weaviate URL is set: {config.database.weaviate_url}")
-                
             # API key is optional for local instances
             if config.database.weaviate_api_key:
-                print("✅ Weaviate API key is set (for cloud instances)")
+                lines.append("✅ Weaviate API key is set (for cloud instances)")
             else:
-                print("ℹ️ Weaviate API key not set (assuming local instance)")
+                lines.append("ℹ️ Weaviate API key not set (assuming local instance)")
+        print("\n".join(lines))
 
         # Test serialization
         print("\nTesting config serialization...")
-        config_dict = config.model_dump()
-        print("✅ Config successfully serialized to dictionary")
+        config_json = _APP_ADAPTER.dump_json(config)
+        print("✅ Config successfully serialized to JSON")
         
-        # Recreate from dict
+        # Recreate from JSON without an intermediate dict
         print("Testing config deserialization...")
-        config2 = AppConfig.model_validate(config_dict)
-        print("✅ Config successfully deserialized from dictionary")
+        config2 = _APP_ADAPTER.validate_json(config_json)
+        print("✅ Config successfully deserialized from JSON")
         
         # Print summary
         print("\n" + "=" * 50)
@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+# Shared .env loading for the technology validation PoCs
+import os
+
+from dotenv import find_dotenv, load_dotenv
+
+_DONE = False
+
+
+def init_env():
+    """Load the .env file into os.environ at most once per process."""
+    global _DONE
+    if _DONE or os.environ.get("DOTENV_LOADED") == "1":
+        _DONE = True
+        return
+
+    # Nothing to parse when no .env file is found
+    dotenv_path = find_dotenv()
+    if dotenv_path:
+        load_dotenv(dotenv_path)
+
+    os.environ["DOTENV_LOADED"] = "1"
+    _DONE = True
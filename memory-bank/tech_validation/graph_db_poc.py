@@ -1,130 +1,189 @@
 #!/usr/bin/env python3
 # Graph Database PoC for Metadata Code Extractor - Neo4j v4.4.44
 import os
-from dotenv import load_dotenv
+from collections import OrderedDict
+from functools import cached_property
+from env_bootstrap import init_env
 import sys
 
-try:
-    from neo4j import GraphDatabase
-    import neo4j
-    print(f"Using Neo4j Python driver version: {neo4j.__version__}")
-except ImportError:
-    print("Error: neo4j package not installed.")
-    print("Install with: pip install neo4j==4.4.44")
-    sys.exit(1)
-
 # Load environment variables
-load_dotenv()
+init_env()
 
 # Configuration
 URI = os.getenv("NEO4J_URI", "bolt://localhost:7687")
 USER = os.getenv("NEO4J_USER", "neo4j")
 PASSWORD = os.getenv("NEO4J_PASSWORD", "password")
 
+# Upper bound on memoized entity query results
+ENTITY_CACHE_SIZE = 1024
+
+# Cypher statements are kept as constants so every run sends identical
+# text and hits the server's query plan cache
+_CQ_VERIFY_CONNECTION = "RETURN 'Connection Successful!' AS message"
+_CQ_CREATE_ENTITY_CONSTRAINT = "CREATE CONSTRAINT IF NOT EXISTS FOR (e:DataEntity) REQUIRE e.name IS UNIQUE"
+_CQ_CREATE_FIELD_CONSTRAINT = "CREATE CONSTRAINT IF NOT EXISTS FOR (f:Field) REQUIRE f.id IS UNIQUE"
+# The entity is bound once and every field row reuses it, so there is no
+# per-field index lookup for the DataEntity node
+_CQ_MERGE_ENTITY_WITH_FIELDS = """
+MERGE (e:DataEntity {name: 'User', type: 'class', description: 'Represents a user in the system'})
+WITH e
+UNWIND $fields AS field
+MERGE (f:Field {id: field.name + '_User'})
+  ON CREATE SET f.name = field.name, f.entity_name = 'User',
+                f.type = field.type, f.description = field.description
+MERGE (e)-[:HAS_FIELD]->(f)
+"""
+_CQ_QUERY_ENTITY = """
+MATCH (e:DataEntity {name: $entity_name})-[:HAS_FIELD]->(f:Field)
+RETURN e.name AS entity, e.description AS description,
+       collect({name: f.name, type: f.type, description: f.description}) AS fields
+"""
+_CQ_DELETE_ENTITY = """
+MATCH (e:DataEntity {name: 'User'})
+OPTIONAL MATCH (e)-[:HAS_FIELD]->(f:Field)
+DETACH DELETE e, f
+"""
+
+def _ensure_deps():
+    """Check for the neo4j driver; deferred so importing this module stays cheap."""
+    try:
+        import neo4j
+        print(f"Using Neo4j Python driver version: {neo4j.__version__}")
+    except ImportError:
+        print("Error: neo4j package not installed.")
+        print("Install with: pip install neo4j==4.4.44")
+        sys.exit(1)
+
 class GraphDBPOC:
     def __init__(self, uri, user, password):
-        self.driver = GraphDatabase.driver(uri, auth=(user, password))
+        # The driver connects lazily on first use
+        self._uri = uri
+        self._auth = (user, password)
         self.connection_success = False
         self.schema_success = False
         self.data_success = False
         self.query_success = False
+        # LRU of query_entity_with_fields results keyed by entity name;
+        # cleared by every write so reads never see stale data
+        self._entity_cache = OrderedDict()
+
+    @cached_property
+    def driver(self):
+        from neo4j import GraphDatabase
+
+        # The PoC is single-threaded, so a one-connection pool is enough
+        return GraphDatabase.driver(
+            self._uri,
+            auth=self._auth,
+            max_connection_pool_size=1,
+            connection_acquisition_timeout=30
+        )
+
+    @cached_property
+    def _session(self):
+        # One session is shared by every PoC step
+        return self.driver.session()
         
     def close(self):
-        if hasattr(self, 'driver'):
+        if "_session" in self.__dict__:
+            self._session.close()
+        if "driver" in self.__dict__:
             self.driver.close()
         
     def verify_connection(self):
-        with self.driver.session() as session:
-            result = session.run("RETURN 'Connection Successful!' AS message")
-            record = result.single()
-            message = record["message"]
-            self.connection_success = True
-            return message
+        session = self._session
+        result = session.run(_CQ_VERIFY_CONNECTION)
+        record = result.single()
+        message = record["message"]
+        self.connection_success = True
+        return message
             
     def create_schema(self):
         # Create constraints for our node types
-        with self.driver.session() as session:
-            try:
-                # Create constraints for unique IDs (Community Edition compatible)
-                session.run("CREATE CONSTRAINT IF NOT EXISTS FOR (e:DataEntity) REQUIRE e.name IS UNIQUE")
-                # Use a simpler constraint for Field nodes that works with Community Edition
-                session.run("CREATE CONSTRAINT IF NOT EXISTS FOR (f:Field) REQUIRE f.id IS UNIQUE")
-                
-                self.schema_success = True
-                print("✅ Schema created successfully")
-            except Exception as e:
-                print(f"❌ Schema creation error: {e}")
-                return False
+        session = self._session
+        try:
+            # Consume each result so its errors surface here, not on the
+            # shared session's next query
+            # Create constraints for unique IDs (Community Edition compatible)
+            session.run(_CQ_CREATE_ENTITY_CONSTRAINT).consume()
+            # Use a simpler constraint for Field nodes that works with Community Edition
+            session.run(_CQ_CREATE_FIELD_CONSTRAINT).consume()
+            
+            self.schema_success = True
+            print("✅ Schema created successfully")
+        except Exception as e:
+            print(f"❌ Schema creation error: {e}")
+            return False
         return True
             
     def create_sample_data(self):
+        # Create Field nodes
+        fields = [
+            {"name": "user_id", "type": "str", "description": "Unique identifier for the user"},
+            {"name": "name", "type": "str", "description": "User's full name"},
+            {"name": "email", "type": "str", "description": "User's email address"},
+            {"name": "is_active", "type": "bool", "description": "Whether the user account is active"}
+        ]
+
+        def _create(tx):
+            # Create the DataEntity node and all its Field nodes in one statement
+            tx.run(_CQ_MERGE_ENTITY_WITH_FIELDS, fields=fields).consume()
+
+        self._entity_cache.clear()
         try:
-            with self.driver.session() as session:
-                # Create a DataEntity node
-                session.run("""
-                    MERGE (e:DataEntity {name: 'User', type: 'class', description: 'Represents a user in the system'})
-                """)
-                
-                # Create Field nodes
-                fields = [
-                    {"name": "user_id", "type": "str", "description": "Unique identifier for the user"},
-                    {"name": "name", "type": "str", "description": "User's full name"},
-                    {"name": "email", "type": "str", "description": "User's email address"},
-                    {"name": "is_active", "type": "bool", "description": "Whether the user account is active"}
-                ]
+            self._session.write_transaction(_create)
                 
-                for field in fields:
-                    session.run("""
-                        MATCH (e:DataEntity {name: 'User'})
-                        MERGE (f:Field {id: $name + '_User', name: $name, entity_name: 'User', type: $type, description: $description})
-                        MERGE (e)-[:HAS_FIELD]->(f)
-                    """, field)
-                    
-                self.data_success = True
-                print("✅ Sample data created successfully")
-                return True
+            self.data_success = True
+            print("✅ Sample data created successfully")
+            return True
         except Exception as e:
             print(f"❌ Data creation error: {e}")
             return False
             
     def query_entity_with_fields(self, entity_name):
+        if entity_name in self._entity_cache:
+            self._entity_cache.move_to_end(entity_name)
+            self.query_success = True
+            return self._entity_cache[entity_name]
+
+        def _query(tx):
+            result = tx.run(_CQ_QUERY_ENTITY, entity_name=entity_name)
+            return result.single()
+
         try:
-            with self.driver.session() as session:
-                result = session.run("""
-                    MATCH (e:DataEntity {name: $entity_name})-[:HAS_FIELD]->(f:Field)
-                    RETURN e.name AS entity, e.description AS description,
-                           collect({name: f.name, type: f.type, description: f.description}) AS fields
-                """, {"entity_name": entity_name})
-                
-                record = result.single()
-                if record:
-                    self.query_success = True
-                    return {
-                        "entity": record["entity"],
-                        "description": record["description"],
-                        "fields": record["fields"]
-                    }
-                return None
+            record = self._session.read_transaction(_query)
+            if record:
+                self.query_success = True
+                result = {
+                    "entity": record["entity"],
+                    "description": record["description"],
+                    "fields": record["fields"]
+                }
+                self._entity_cache[entity_name] = result
+                if len(self._entity_cache) > ENTITY_CACHE_SIZE:
+                    self._entity_cache.popitem(last=False)
+                return result
+            return None
         except Exception as e:
             print(f"❌ Query error: {e}")
             return None
 
     def cleanup(self):
         """Clean up test data"""
+        def _delete(tx):
+            tx.run(_CQ_DELETE_ENTITY)
+
+        self._entity_cache.clear()
         try:
-            with self.driver.session() as session:
-                session.run("""
-                    MATCH (e:DataEntity {name: 'User'})
-                    OPTIONAL MATCH (e)-[:HAS_FIELD]->(f:Field)
-                    DETACH DELETE e, f
-                """)
-                print("✅ Test data cleaned up successfully")
-                return True
+            self._session.write_transaction(_delete)
+            print("✅ Test data cleaned up successfully")
+            return True
         except Exception as e:
             print(f"❌ Cleanup error: {e}")
             return False
 
 def run_poc():
+    _ensure_deps()
     poc = None
     try:
         print(f"Connecting to Neo4j at {URI}...")
@@ -1,44 +1,260 @@
 #!/usr/bin/env python3
 # Vector Database PoC for Metadata Code Extractor - Weaviate v1.24.20
+import asyncio
+import hashlib
+import importlib.util
+import json
+import math
 import os
+import pickle
+import struct
 import sys
-from dotenv import load_dotenv
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from pathlib import Path
+from env_bootstrap import init_env
 
 # Load environment variables
-load_dotenv()
+init_env()
 
-# Check for required packages
-required_packages = ["weaviate-client", "openai"]
-missing_packages = []
+# numpy is optional; with it embeddings are kept as compact float32 arrays
+# instead of lists of boxed Python floats
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
-for package in required_packages:
-    try:
-        if package == "weaviate-client":
-            import weaviate
-        else:
-            __import__(package)
-    except ImportError:
-        missing_packages.append(package)
-
-if missing_packages:
-    print("Error: Missing required packages:")
-    for package in missing_packages:
-        print(f"  - {package}")
-    print("Install with: pip install " + " ".join(missing_packages))
-    sys.exit(1)
-
-# Now that we've checked, import the packages
-import weaviate
-from openai import OpenAI
+# blake3 is optional; it hashes with SIMD and can emit any digest length.
+# Without it shake_128, the stdlib's extendable-output hash, is used
+try:
+    from blake3 import blake3
+except ImportError:
+    blake3 = None
 
 # Configuration
 OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
 WEAVIATE_URL = os.getenv("WEAVIATE_URL", "http://localhost:8080")
 WEAVIATE_API_KEY = os.getenv("WEAVIATE_API_KEY", "")  # Optional for local instances
 COLLECTION_NAME = "CodeSnippets"
+# "text2vec-openai" lets Weaviate embed snippets itself during ingestion and
+# search; the default "none" keeps embedding client-side through OpenRouter
+WEAVIATE_VECTORIZER = os.getenv("WEAVIATE_VECTORIZER", "none")
+SERVER_SIDE_EMBEDDING = WEAVIATE_VECTORIZER == "text2vec-openai"
+# Key Weaviate forwards to OpenAI when it does the embedding
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+# Maximum number of inputs the embeddings endpoint accepts per request
+EMBEDDING_BATCH_SIZE = 2048
+# Embedding requests in flight at once
+EMBEDDING_MAX_CONCURRENCY = int(os.getenv("EMBEDDING_MAX_CONCURRENCY", "3"))
+# Retries for transient embedding API failures
+EMBEDDING_MAX_RETRIES = 6
+# Embedding model; it must be a text-embedding-3 model to honor `dimensions`
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+# text-embedding-3 vectors are truncated server-side to this many dimensions
+EMBEDDING_DIMENSIONS = int(os.getenv("EMBEDDING_DIMENSIONS", "512"))
+# Sent with every Weaviate request so the vectorizer module can reach OpenAI
+_VECTORIZER_HEADERS = {"X-OpenAI-Api-Key": OPENAI_API_KEY} if SERVER_SIDE_EMBEDDING and OPENAI_API_KEY else {}
+# Seconds to wait for any of the raced connection methods to become ready
+WEAVIATE_CONNECT_TIMEOUT = 6
+# A client that passed its readiness probe this recently is reused as is
+WEAVIATE_READY_TTL = 60
+# Sockets kept open to Weaviate; batch workers and queries share them
+WEAVIATE_POOL_SIZE = int(os.getenv("WEAVIATE_POOL_SIZE", "50"))
+# Objects per Weaviate batch request (the client adapts it when dynamic)
+WEAVIATE_BATCH_SIZE = 100
+# The schema description records the vector size the class was built for
+SCHEMA_DESCRIPTION = f"Code snippets for metadata extraction ({EMBEDDING_DIMENSIONS}-dim vectors)"
+# On-disk cache of API embeddings keyed by content hash
+EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", "./data/embed_cache")
+# JSONL log of stored snippet IDs so an interrupted ingest resumes where it stopped
+INGEST_CHECKPOINT_PATH = os.getenv("INGEST_CHECKPOINT_PATH", "./data/ingest_progress.jsonl")
+
+def _normalize_code(code):
+    """Drop blank lines, whole-line comments and surrounding whitespace."""
+    lines = (line.strip() for line in code.splitlines())
+    return "\n".join(line for line in lines if line and not line.startswith("#"))
+
+def _content_key(code):
+    return hashlib.sha256(_normalize_code(code).encode("utf-8")).hexdigest()
+
+class EmbeddingDiskCache:
+    """Content-addressed embedding store: one file per SHA-256 of model and text.
+    
+    Vectors are saved as float32 .npy files when numpy is available and as
+    pickles otherwise.
+    """
+
+    def __init__(self, cache_dir, model):
+        self.cache_dir = Path(cache_dir)
+        self.model = model
+        self._suffix = ".pkl" if np is None else ".npy"
+
+    def _path(self, text):
+        key = hashlib.sha256(f"{self.model}:{text}".encode("utf-8")).hexdigest()
+        return self.cache_dir / f"{key}{self._suffix}"
+
+    def get(self, text):
+        try:
+            if np is not None:
+                return np.load(self._path(text))
+            with open(self._path(text), "rb") as f:
+                return pickle.load(f)
+        except (OSError, ValueError, pickle.UnpicklingError, EOFError):
+            return None
+
+    def set(self, text, vector):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        if np is not None:
+            np.save(self._path(text), np.asarray(vector, dtype=np.float32))
+            return
+        with open(self._path(text), "wb") as f:
+            pickle.dump(vector, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+def _hash_bytes(data, length):
+    """`length` pseudo-random bytes derived from `data`."""
+    if blake3 is not None:
+        return blake3(data).digest(length=length)
+    return hashlib.shake_128(data).digest(length)
+
+def _load_checkpoint(path):
+    """Return the snippet IDs already recorded in the JSONL checkpoint."""
+    done = set()
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    done.add(json.loads(line)["id"])
+                except (ValueError, KeyError):
+                    # A partially written last line from a crash
+                    continue
+    except FileNotFoundError:
+        pass
+    return done
+
+def _ensure_deps():
+    """Check for the required packages; deferred so importing this module stays cheap."""
+    # find_spec only locates the packages; they are imported on first use
+    required = {"weaviate": "weaviate-client", "openai": "openai"}
+    missing = [dist for module, dist in required.items() if importlib.util.find_spec(module) is None]
+    if missing:
+        print("Error: Missing required packages:")
+        for package in missing:
+            print(f"  - {package}")
+        print("Install with: pip install " + " ".join(missing))
+        sys.exit(1)
+
+# One client per process; each new client opens a session and probes the server
+_WEAVIATE_CLIENT = None
+_WEAVIATE_READY_AT = 0.0
+
+def _tune_weaviate_session(client):
+    """Widen the client's HTTP pool and retry transient statuses with backoff."""
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+    
+    session = getattr(getattr(client, "_connection", None), "_session", None)
+    if session is None:
+        return
+    # Retry only covers idempotent methods by default, so batch POSTs are
+    # left to the batch's own timeout retries rather than retried twice
+    adapter = HTTPAdapter(
+        pool_connections=WEAVIATE_POOL_SIZE,
+        pool_maxsize=WEAVIATE_POOL_SIZE,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.2,
+            status_forcelist=[429, 502, 503, 504],
+            raise_on_status=False  # hand the last response back to the client
+        )
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+def _get_or_create_weaviate_client(attempts):
+    """Return a ready Weaviate client, or None with the failures in `attempts`.
+    
+    Without an API key only the unauthenticated connection is tried; with one,
+    all authentication methods are probed at once and the first ready wins.
+    """
+    global _WEAVIATE_CLIENT, _WEAVIATE_READY_AT
+    import weaviate
+    
+    if _WEAVIATE_CLIENT is not None:
+        if time.monotonic() - _WEAVIATE_READY_AT < WEAVIATE_READY_TTL:
+            return _WEAVIATE_CLIENT
+        if _WEAVIATE_CLIENT.is_ready():
+            _WEAVIATE_READY_AT = time.monotonic()
+            return _WEAVIATE_CLIENT
+        _WEAVIATE_CLIENT = None
+    
+    headers = _VECTORIZER_HEADERS or None
+    methods = [("no auth", lambda: weaviate.Client(url=WEAVIATE_URL, additional_headers=headers))]
+    if WEAVIATE_API_KEY:
+        methods += [
+            ("API key", lambda: weaviate.Client(
+                url=WEAVIATE_URL,
+                auth_client_secret=weaviate.AuthApiKey(api_key=WEAVIATE_API_KEY),
+                additional_headers=headers
+            )),
+            ("bearer token", lambda: weaviate.Client(
+                url=WEAVIATE_URL,
+                auth_client_secret=weaviate.AuthBearerToken(access_token=WEAVIATE_API_KEY),
+                additional_headers=headers
+            )),
+            ("custom headers", lambda: weaviate.Client(
+                url=WEAVIATE_URL,
+                additional_headers={**_VECTORIZER_HEADERS, "Authorization": f"Bearer {WEAVIATE_API_KEY}"}
+            )),
+        ]
+    
+    if len(methods) == 1:
+        label, client = _try_connect(*methods[0], attempts)
+    else:
+        label, client = _race_connect(methods, attempts)
+    if client is not None:
+        print(f"✅ Connected to Weaviate at {WEAVIATE_URL} ({label})")
+        _tune_weaviate_session(client)
+        _WEAVIATE_CLIENT = client
+        _WEAVIATE_READY_AT = time.monotonic()
+    return client
+
+def _try_connect(label, connect, attempts):
+    """Build one client and probe it; (label, None) with the reason recorded on failure."""
+    try:
+        print(f"Attempting connection with {label}...")
+        client = connect()
+        if client.is_ready():
+            return label, client
+        attempts.append(f"{label}: Weaviate not ready")
+    except Exception as e:
+        attempts.append(f"{label}: {str(e)}")
+    return label, None
+
+def _race_connect(methods, attempts):
+    """Probe every method concurrently and return the first ready (label, client)."""
+    pool = ThreadPoolExecutor(max_workers=len(methods))
+    futures = [pool.submit(_try_connect, label, connect, attempts) for label, connect in methods]
+    try:
+        for future in as_completed(futures, timeout=WEAVIATE_CONNECT_TIMEOUT):
+            label, client = future.result()
+            if client is not None:
+                return label, client
+    except FuturesTimeoutError:
+        attempts.append(f"no method connected within {WEAVIATE_CONNECT_TIMEOUT}s")
+    finally:
+        # Don't wait for the losing probes
+        pool.shutdown(wait=False, cancel_futures=True)
+    return None, None
 
 class VectorDBPOC:
     def __init__(self):
+        from openai import AsyncOpenAI
+
+        # Vectors of different sizes must never be mixed, so each size gets its own cache
+        self.embedding_cache = EmbeddingDiskCache(
+            Path(EMBEDDING_CACHE_DIR) / f"dim{EMBEDDING_DIMENSIONS}", EMBEDDING_MODEL
+        )
         self.connection_success = False
         self.schema_success = False
         self.embeddings_success = False
@@ -50,72 +266,9 @@ class VectorDBPOC:
             print(f"Attempting to connect to Weaviate at {WEAVIATE_URL}")
             print(f"API Key provided: {'Yes' if WEAVIATE_API_KEY else 'No'}")
             
-            # Try multiple authentication methods
             connection_attempts = []
-            
-            # Method 1: Try without authentication first (for local instances)
-            try:
-                print("Attempting connection without authentication...")
-                self.client = weaviate.Client(url=WEAVIATE_URL)
-                if self.client.is_ready():
-                    print(f"✅ Connected to Weaviate at {WEAVIATE_URL} (no auth)")
-                    self.connection_success = True
-                else:
-                    connection_attempts.append("No auth: Weaviate not ready")
-            except Exception as e:
-                connection_attempts.append(f"No auth: {str(e)}")
-            
-            # Method 2: Try with API key if provided and no auth didn't work
-            if not self.connection_success and WEAVIATE_API_KEY:
-                try:
-                    print("Attempting connection with API key authentication...")
-                    self.client = weaviate.Client(
-                        url=WEAVIATE_URL,
-                        auth_client_secret=weaviate.AuthApiKey(api_key=WEAVIATE_API_KEY)
-                    )
-                    if self.client.is_ready():
-                        print(f"✅ Connected to Weaviate at {WEAVIATE_URL} (API key)")
-                        self.connection_success = True
-                    else:
-                        connection_attempts.append("API key: Weaviate not ready")
-                except Exception as e:
-                    connection_attempts.append(f"API key: {str(e)}")
-            
-            # Method 3: Try with bearer token if API key is provided
-            if not self.connection_success and WEAVIATE_API_KEY:
-                try:
-                    print("Attempting connection with bearer token authentication...")
-                    self.client = weaviate.Client(
-                        url=WEAVIATE_URL,
-                        auth_client_secret=weaviate.AuthBearerToken(access_token=WEAVIATE_API_KEY)
-                    )
-                    if self.client.is_ready():
-                        print(f"✅ Connected to Weaviate at {WEAVIATE_URL} (bearer token)")
-                        self.connection_success = True
-                    else:
-                        connection_attempts.append("Bearer token: Weaviate not ready")
-                except Exception as e:
-                    connection_attempts.append(f"Bearer token: {str(e)}")
-            
-            # Method 4: Try with additional headers for custom authentication
-            if not self.connection_success:
-                try:
-                    print("Attempting connection with additional headers...")
-                    additional_headers = {}
-                    if WEAVIATE_API_KEY:
-                        additional_headers["Authorization"] = f"Bearer {WEAVIATE_API_KEY}"
-                    
-                    self.client = weaviate.Client(
-                        url=WEAVIATE_URL,
-                        additional_headers=additional_headers
-                    )
-                    if self.client.is_ready():
-                        print(f"✅ Connected to Weaviate at {WEAVIATE_URL} (custom headers)")
-                        self.connection_success = True
-                    else:
-                        connection_attempts.append("Custom headers: Weaviate not ready")
-                except Exception as e:
-                    connection_attempts.append(f"Custom headers: {str(e)}")
+            self.client = _get_or_create_weaviate_client(connection_attempts)
+            self.connection_success = self.client is not None
             
             if not self.connection_success:
                 print("❌ All Weaviate connection attempts failed:")
@@ -144,6 +297,22 @@ class VectorDBPOC:
             self.connection_success = False  # Mark as failed but continue
             return  # Don't raise, continue with validation
         
+        # Objects are sent in bulk requests instead of one request each;
+        # per-object failures are collected by the flush callback
+        self._batch_errors = []
+        self._failed_ids = set()
+        self.client.batch.configure(
+            batch_size=WEAVIATE_BATCH_SIZE,
+            dynamic=True,
+            timeout_retries=3,
+            num_workers=2,
+            callback=self._collect_batch_errors
+        )
+        
+        if SERVER_SIDE_EMBEDDING:
+            print(f"✅ Weaviate {WEAVIATE_VECTORIZER} module will generate embeddings")
+            return
+        
         # Initialize embedding provider (OpenRouter in this case)
         if not OPENROUTER_API_KEY:
             print("❌ Error: OPENROUTER_API_KEY environment variable not set")
@@ -151,29 +320,36 @@ class VectorDBPOC:
             
         try:
             # Configure OpenAI client to use OpenRouter
-            self.embedding_client = OpenAI(
+            # The SDK retries 408/409/429/5xx and connection errors with
+            # exponential backoff and jitter, honoring Retry-After
+            self.embedding_client = AsyncOpenAI(
                 api_key=OPENROUTER_API_KEY,
-                base_url="https://openrouter.ai/api/v1"
+                base_url="https://openrouter.ai/api/v1",
+                max_retries=EMBEDDING_MAX_RETRIES
             )
+            self._embedding_semaphore = asyncio.Semaphore(EMBEDDING_MAX_CONCURRENCY)
             print("✅ Initialized OpenRouter client for embeddings")
         except Exception as e:
             print(f"❌ OpenRouter client initialization error: {e}")
             raise
         
+    def _collect_batch_errors(self, results):
+        for item in results or []:
+            item_errors = item.get("result", {}).get("errors")
+            if item_errors:
+                self._batch_errors.append(item_errors)
+                self._failed_ids.add(str(item.get("id")))
+        
     def create_schema(self):
         """Create Weaviate schema for code snippets"""
+        from weaviate.exceptions import UnexpectedStatusCodeException
+        
         try:
-            # Check if class already exists
-            if self.client.schema.exists(COLLECTION_NAME):
-                print(f"✅ Schema '{COLLECTION_NAME}' already exists")
-                self.schema_success = True
-                return True
-            
             # Define schema
             schema = {
                 "class": COLLECTION_NAME,
-                "description": "Code snippets for metadata extraction",
-                "vectorizer": "none",  # We'll provide our own vectors
+                "description": SCHEMA_DESCRIPTION,
+                "vectorizer": WEAVIATE_VECTORIZER,  # "none": we provide our own vectors
                 "properties": [
                     {
                         "name": "code",
@@ -198,9 +374,38 @@ class VectorDBPOC:
                 ]
             }
             
-            # Create schema
-            self.client.schema.create_class(schema)
-            print(f"✅ Created schema '{COLLECTION_NAME}'")
+            if SERVER_SIDE_EMBEDDING:
+                # Only the code is embedded, matching the client-side path
+                schema["moduleConfig"] = {
+                    WEAVIATE_VECTORIZER: {
+                        "model": EMBEDDING_MODEL,
+                        "dimensions": EMBEDDING_DIMENSIONS,
+                        "vectorizeClassName": False
+                    }
+                }
+                for prop in schema["properties"]:
+                    if prop["name"] != "code":
+                        prop["moduleConfig"] = {WEAVIATE_VECTORIZER: {"skip": True}}
+            
+            # Create schema; an existing class is rejected with 422, which
+            # saves a separate exists() round trip on every run
+            try:
+                self.client.schema.create_class(schema)
+                print(f"✅ Created schema '{COLLECTION_NAME}'")
+            except UnexpectedStatusCodeException as e:
+                if e.status_code != 422:
+                    raise
+                # 422 also covers invalid definitions; only an existing class is fine
+                try:
+                    existing = self.client.schema.get(COLLECTION_NAME).get("description", "")
+                except UnexpectedStatusCodeException:
+                    raise e
+                # Vectors of another size would only fail later, at query time
+                if existing != SCHEMA_DESCRIPTION:
+                    print(f"❌ Schema '{COLLECTION_NAME}' was created for different vectors: {existing!r}")
+                    return False
+                print(f"✅ Schema '{COLLECTION_NAME}' already exists")
+            
             self.schema_success = True
             return True
             
@@ -208,84 +413,217 @@ class VectorDBPOC:
             print(f"❌ Schema creation error: {e}")
             return False
         
-    def generate_embedding(self, text):
+    async def generate_embedding(self, text):
         """Generate embedding for text using OpenRouter or fallback to simple vectors"""
+        return (await self.generate_embeddings_batch([text]))[0]
+
+    async def generate_embeddings_batch(self, texts, batch_size=EMBEDDING_BATCH_SIZE):
+        """Generate embeddings for many texts with one request per `batch_size` inputs"""
+        embeddings, _ = await self._generate_embeddings(texts, batch_size)
+        return embeddings
+
+    async def _generate_embeddings(self, texts, batch_size=EMBEDDING_BATCH_SIZE):
+        """Return the embeddings and, per text, whether it got a fallback vector."""
+        # Serve what we can from the disk cache; only misses go to the API
+        embeddings = [self.embedding_cache.get(text) for text in texts]
+        fallback = [False] * len(texts)
+        misses = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if len(misses) < len(texts):
+            self.embeddings_success = True
+            print(f"✅ {len(texts) - len(misses)} embeddings served from cache")
+        if not misses:
+            return embeddings, fallback
+        
+        # Each distinct text is embedded once, however often it repeats
+        slots = {}
+        for i in misses:
+            slots.setdefault(texts[i], len(slots))
+        miss_texts = list(slots)
+        chunks = [
+            miss_texts[start:start + batch_size]
+            for start in range(0, len(miss_texts), batch_size)
+        ]
+        # Chunk requests run concurrently
+        results = await asyncio.gather(*(self._embed_chunk(chunk) for chunk in chunks))
+        fresh = [embedding for chunk_embeddings, _ in results for embedding in chunk_embeddings]
+        fresh_fallback = [flag for _, chunk_fallback in results for flag in chunk_fallback]
+        
+        # Scatter fresh embeddings back into input order
+        for i in misses:
+            embeddings[i] = fresh[slots[texts[i]]]
+            fallback[i] = fresh_fallback[slots[texts[i]]]
+        return embeddings, fallback
+
+    async def _embed_chunk(self, texts):
+        from openai import BadRequestError
+        
+        rejected = False
         try:
             # Try different embedding models available through OpenRouter
+            # Only text-embedding-3 models accept `dimensions`, so ada-002
+            # is not tried: its 1536-dim vectors would not fit the schema
             embedding_models = [
-                "text-embedding-ada-002",  # OpenAI model via OpenRouter
-                "openai/text-embedding-ada-002",  # Explicit OpenAI model
-                "text-embedding-3-small",  # Original model
+                EMBEDDING_MODEL,  # Original model
+                f"openai/{EMBEDDING_MODEL}",  # Explicit OpenAI model
             ]
             
             for model in embedding_models:
                 try:
-                    response = self.embedding_client.embeddings.create(
-                        input=text,
-                        model=model
-                    )
+                    async with self._embedding_semaphore:
+                        response = await self.embedding_client.embeddings.create(
+                            input=texts,
+                            model=model,
+                            dimensions=EMBEDDING_DIMENSIONS
+                        )
                     self.embeddings_success = True
-                    print(f"✅ Using embedding model: {model}")
-                    return response.data[0].embedding
+                    print(f"✅ Using embedding model: {model} ({len(texts)} texts)")
+                    # Results carry an index; don't rely on response ordering
+                    data = sorted(response.data, key=lambda d: d.index)
+                    embeddings = [d.embedding for d in data]
+                    if np is not None:
+                        # One contiguous (N, D) float32 block; rows are views into it
+                        embeddings = list(np.asarray(embeddings, dtype=np.float32))
+                    # Only real API embeddings are cached, never fallback vectors
+                    for text, embedding in zip(texts, embeddings):
+                        self.embedding_cache.set(text, embedding)
+                    return embeddings, [False] * len(texts)
                 except Exception as model_error:
                     print(f"⚠️ Model {model} failed: {str(model_error)}")
+                    rejected = rejected or isinstance(model_error, BadRequestError)
                     continue
             
+            # One bad input gets the whole request rejected; retry the texts
+            # one by one so only the inputs that really fail get fallback vectors
+            if rejected and len(texts) > 1:
+                print(f"⚠️ Batch of {len(texts)} failed, retrying texts individually")
+                results = await asyncio.gather(*(self._embed_chunk([text]) for text in texts))
+                return (
+                    [embeddings[0] for embeddings, _ in results],
+                    [fallback[0] for _, fallback in results],
+                )
+            
             # If all embedding models fail, use a simple fallback
             print("⚠️ All embedding models failed, using simple text vector fallback")
-            return self._generate_simple_vector(text)
+            return [self._generate_simple_vector(text) for text in texts], [True] * len(texts)
             
         except Exception as e:
             print(f"⚠️ Embedding generation failed, using fallback: {e}")
-            return self._generate_simple_vector(text)
+            return [self._generate_simple_vector(text) for text in texts], [True] * len(texts)
     
     def _generate_simple_vector(self, text):
         """Generate a simple vector representation for validation purposes"""
-        import hashlib
-        import struct
-        
         # Create a simple hash-based vector for validation
         # This is not a real embedding but allows us to test the Weaviate functionality
-        hash_obj = hashlib.md5(text.encode())
-        hash_bytes = hash_obj.digest()
-        
-        # Convert to a 384-dimensional vector (common embedding size)
-        vector = []
-        for i in range(0, len(hash_bytes), 4):
-            chunk = hash_bytes[i:i+4]
-            if len(chunk) == 4:
-                value = struct.unpack('f', chunk)[0]
-            else:
-                # Pad with zeros if needed
-                padded = chunk + b'\x00' * (4 - len(chunk))
-                value = struct.unpack('f', padded)[0]
-            vector.append(value)
-        
-        # Extend to 384 dimensions by repeating and normalizing
-        while len(vector) < 384:
-            vector.extend(vector[:min(len(vector), 384 - len(vector))])
-        
-        vector = vector[:384]  # Ensure exactly 384 dimensions
-        
-        # Simple normalization
-        magnitude = sum(x*x for x in vector) ** 0.5
-        if magnitude > 0:
-            vector = [x/magnitude for x in vector]
+        # One 32-bit integer per dimension straight from the hash; reading the
+        # bytes as floats would yield NaN/inf values. Normalizing makes any
+        # prior scaling redundant, so the integers are scaled only once
+        digest = _hash_bytes(text.encode(), EMBEDDING_DIMENSIONS * 4)
+        if np is not None:
+            vector = np.frombuffer(digest, dtype="<i4").astype(np.float32)
+            magnitude = np.linalg.norm(vector)
+            if magnitude > 0:
+                vector *= np.float32(1.0 / magnitude)
+        else:
+            vector = struct.unpack(f"<{EMBEDDING_DIMENSIONS}i", digest)
+            magnitude = math.sqrt(math.fsum(x * x for x in vector))
+            scale = 1.0 / magnitude if magnitude > 0 else 1.0
+            vector = [x * scale for x in vector]
         
         self.embeddings_success = True
-        print(f"✅ Generated simple vector (384 dimensions) for validation")
+        print(f"✅ Generated simple vector ({EMBEDDING_DIMENSIONS} dimensions) for validation")
         return vector
         
-    def add_snippets(self, snippets):
-        """Add code snippets to Weaviate"""
+    async def add_snippets(self, snippets, output_jsonl=INGEST_CHECKPOINT_PATH):
+        """Add code snippets to Weaviate, skipping IDs already in the checkpoint"""
         try:
-            print(f"Generating embeddings for {len(snippets)} snippets...")
+            from weaviate.util import generate_uuid5
             
-            # Process each snippet
+            # Snippets are identified by content, so duplicates are stored once
+            pending = {}
             for i, snippet in enumerate(snippets):
-                # Generate embedding
-                embedding = self.generate_embedding(snippet["code"])
-                
+                pending.setdefault(_content_key(snippet["code"]), (i, snippet))
+            if len(pending) < len(snippets):
+                print(f"Skipping {len(snippets) - len(pending)} duplicate snippets")
+            
+            done = _load_checkpoint(output_jsonl) if output_jsonl else set()
+            pending = [
+                (key, generate_uuid5(key), i, snippet)
+                for key, (i, snippet) in pending.items() if key not in done
+            ]
+            skipped = len(snippets) - len(pending)
+            if done and skipped:
+                print(f"Resuming from checkpoint: {skipped} snippets already stored")
+            print(f"Generating embeddings for {len(pending)} snippets...")
+            
+            # Start from a clean slate of per-object errors for this call
+            errors = self._batch_errors
+            failed_ids = self._failed_ids
+            errors.clear()
+            failed_ids.clear()
+            
+            if output_jsonl:
+                Path(output_jsonl).parent.mkdir(parents=True, exist_ok=True)
+            
+            # Embed and store one mini-batch at a time so a crash only loses
+            # the batch in flight; the next batch is embedded while the
+            # current one is imported
+            chunks = [
+                pending[start:start + WEAVIATE_BATCH_SIZE]
+                for start in range(0, len(pending), WEAVIATE_BATCH_SIZE)
+            ]
+            next_embeddings = None
+            try:
+                for n, chunk in enumerate(chunks):
+                    if next_embeddings is None:
+                        embeddings, fallback = await self._embed_for_import(chunk)
+                    else:
+                        embeddings, fallback = await next_embeddings
+                    if n + 1 < len(chunks):
+                        next_embeddings = asyncio.ensure_future(self._embed_for_import(chunks[n + 1]))
+                    
+                    # The batch flush blocks on HTTP, so it runs off the event loop
+                    await asyncio.to_thread(self._import_chunk, chunk, embeddings)
+                    
+                    # The batch has flushed; record what actually landed.
+                    # Fallback vectors are left out so a rerun embeds them again
+                    if output_jsonl:
+                        with open(output_jsonl, "a", encoding="utf-8") as f:
+                            for (key, uuid, _, _), embedding, is_fallback in zip(chunk, embeddings, fallback):
+                                if uuid not in failed_ids and not is_fallback:
+                                    dim = EMBEDDING_DIMENSIONS if embedding is None else len(embedding)
+                                    f.write(json.dumps({"id": key, "dim": dim}) + "\n")
+            finally:
+                if next_embeddings is not None and not next_embeddings.done():
+                    next_embeddings.cancel()
+            
+            if errors:
+                print(f"❌ Data storage error: {len(errors)} objects failed: {errors[0]}")
+                return False
+            
+            if SERVER_SIDE_EMBEDDING:
+                self.embeddings_success = True
+            self.storage_success = True
+            print(f"✅ {len(snippets)} snippets added to Weaviate")
+            return True
+            
+        except Exception as e:
+            print(f"❌ Data storage error: {e}")
+            return False
+        
+    async def _embed_for_import(self, chunk):
+        if SERVER_SIDE_EMBEDDING:
+            # Weaviate embeds the objects while importing the batch
+            return [None] * len(chunk), [False] * len(chunk)
+        return await self._generate_embeddings([snippet["code"] for _, _, _, snippet in chunk])
+    
+    def _import_chunk(self, chunk, embeddings):
+        """Send one chunk through the Weaviate batch; blocks until it is flushed."""
+        if np is not None and embeddings and embeddings[0] is not None:
+            # Vectors stay float32 arrays until here; the v3 client sends
+            # JSON, so convert the whole chunk to lists in one call
+            embeddings = np.asarray(embeddings, dtype=np.float32).tolist()
+        with self.client.batch as batch:
+            for (_, uuid, i, snippet), embedding in zip(chunk, embeddings):
                 # Prepare data object
                 data_object = {
                     "code": snippet["code"],
@@ -294,37 +632,33 @@ class VectorDBPOC:
                     "snippet_id": f"snippet_{i}"
                 }
                 
-                # Add to Weaviate with vector
-                self.client.data_object.create(
+                # Queue for Weaviate with vector; the content-derived UUID
+                # makes re-ingesting the same code an upsert
+                batch.add_data_object(
                     data_object=data_object,
                     class_name=COLLECTION_NAME,
+                    uuid=uuid,
                     vector=embedding
                 )
-            
-            self.storage_success = True
-            print(f"✅ {len(snippets)} snippets added to Weaviate")
-            return True
-            
-        except Exception as e:
-            print(f"❌ Data storage error: {e}")
-            return False
         
-    def search(self, query, n_results=2):
+    async def search(self, query, n_results=2):
         """Search for similar snippets using vector similarity"""
         try:
-            # Generate query embedding
-            print(f"Generating embedding for query: '{query}'")
-            query_embedding = self.generate_embedding(query)
-            
-            # Perform vector search
-            result = (
-                self.client.query
-                .get(COLLECTION_NAME, ["code", "language", "description", "snippet_id"])
-                .with_near_vector({"vector": query_embedding})
-                .with_limit(n_results)
-                .with_additional(["distance"])
-                .do()
+            query_builder = self.client.query.get(
+                COLLECTION_NAME, ["code", "language", "description", "snippet_id"]
             )
+            if SERVER_SIDE_EMBEDDING:
+                # Weaviate embeds the query text with the class vectorizer
+                query_builder = query_builder.with_near_text({"concepts": [query]})
+            else:
+                # Generate query embedding
+                print(f"Generating embedding for query: '{query}'")
+                query_embedding = await self.generate_embedding(query)
+                query_builder = query_builder.with_near_vector({"vector": query_embedding})
+            
+            # Perform vector search off the event loop; the query is blocking HTTP
+            query_builder = query_builder.with_limit(n_results).with_additional(["distance"])
+            result = await asyncio.to_thread(query_builder.do)
             
             self.search_success = True
             return result
@@ -335,10 +669,19 @@ class VectorDBPOC:
             
     def cleanup(self):
         """Clean up test schema"""
+        from weaviate.exceptions import UnexpectedStatusCodeException
+        
         try:
-            if self.client.schema.exists(COLLECTION_NAME):
+            # Delete directly instead of checking exists() first
+            try:
                 self.client.schema.delete_class(COLLECTION_NAME)
                 print(f"✅ Test schema '{COLLECTION_NAME}' deleted")
+            except UnexpectedStatusCodeException as e:
+                if e.status_code != 404:
+                    raise
+            # The stored objects are gone, so the checkpoint no longer applies
+            if INGEST_CHECKPOINT_PATH and os.path.exists(INGEST_CHECKPOINT_PATH):
+                os.remove(INGEST_CHECKPOINT_PATH)
             return True
         except Exception as e:
             print(f"❌ Cleanup error: {e}")
@@ -393,7 +736,8 @@ def process_user_data(user_data: dict) -> User:
     }
 ]
 
-def run_poc():
+async def run_poc():
+    _ensure_deps()
     poc = None
     try:
         print("Initializing Weaviate Vector DB PoC...")
@@ -423,13 +767,13 @@ def run_poc():
             return False
         
         # Add snippets
-        if not poc.add_snippets(code_snippets):
+        if not await poc.add_snippets(code_snippets):
             return False
         
         # Perform search
         query = "function to convert user data dictionary into user object"
         print(f"\nPerforming similarity search with query: '{query}'")
-        results = poc.search(query)
+        results = await poc.search(query)
         
         if not results or not results.get("data", {}).get("Get", {}).get("CodeSnippets"):
             print("❌ Search returned no results")
@@ -474,5 +818,5 @@ def run_poc():
         return False
 
 if __name__ == "__main__":
-    success = run_poc()
+    success = asyncio.run(run_poc())
     sys.exit(0 if success else 1) 
\ No newline at end of file
@@ -8,9 +8,29 @@ __version__ = "0.1.0"
 __author__ = "Metadata Code Extractor Team"
 __email__ = "team@metadata-code-extractor.com"
 
-# Package-level imports for convenience
-from metadata_code_extractor.core.config import get_config
-from metadata_code_extractor.core.logging import setup_logging
+from typing import Any, List
+
+# Package-level conveniences, imported on first access (PEP 562) so that
+# importing the package does not pull in pydantic and yaml
+_LAZY_ATTRS = {
+    "get_config": "metadata_code_extractor.core.config",
+    "setup_logging": "metadata_code_extractor.core.logging",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_ATTRS:
+        from importlib import import_module
+
+        value = getattr(import_module(_LAZY_ATTRS[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
+
 
 __all__ = [
     "__version__",
@@ -9,8 +9,11 @@ Handles loading configuration from multiple sources with proper precedence:
 
 import os
 import logging
+import re
+from copy import deepcopy
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Type
 
 import yaml
 from pydantic import ValidationError
@@ -19,9 +22,87 @@ from metadata_code_extractor.core.models.config import AppConfig
 
 logger = logging.getLogger(__name__)
 
+# Prefer the libyaml C parser; fall back to the pure-Python one
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+logger.debug("YAML config loader: %s", _YamlLoader.__name__)
+
 # Global configuration instance
 _config: Optional[AppConfig] = None
 
+# Map known configuration paths to their correct structure
+_PATH_MAPPINGS = {
+    'llm_default_provider': ['llm', 'default_provider'],
+    'llm_default_model_name': ['llm', 'default_model_name'],
+    'llm_default_embedding_model_name': ['llm', 'default_embedding_model_name'],
+    'llm_cache_enabled': ['llm', 'cache_enabled'],
+    'llm_cache_path': ['llm', 'cache_path'],
+    'llm_max_async': ['llm', 'llm_max_async'],
+    'llm_model_params_temperature': ['llm', 'model_params', 'temperature'],
+    'llm_model_params_max_tokens': ['llm', 'model_params', 'max_tokens'],
+    'llm_providers': ['llm', 'providers'],
+    'graph_db_type': ['graph_db', 'db_type'],
+    'graph_db_uri': ['graph_db', 'uri'],
+    'graph_db_username': ['graph_db', 'username'],
+    'graph_db_password': ['graph_db', 'password'],
+    'graph_db_database_name': ['graph_db', 'database_name'],
+    'vector_db_type': ['vector_db', 'db_type'],
+    'vector_db_path': ['vector_db', 'path'],
+    'vector_db_collection_name': ['vector_db', 'collection_name'],
+    'scan_paths_code_repositories': ['scan_paths', 'code_repositories'],
+    'scan_paths_documentation_sources': ['scan_paths', 'documentation_sources'],
+    'log_level': ['log_level'],
+}
+
+# Numeric env values; anything else (including "nan"/"inf") stays a string
+_INT_RE = re.compile(r"[+-]?\d+")
+_FLOAT_RE = re.compile(r"[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?")
+
+# Trie node markers: the keys for a path ending at this node, and a subtree
+# whose remaining tokens are <provider>_<field>
+_KEYS = object()
+_PROVIDER_FIELD = object()
+
+
+def _build_path_trie() -> Dict[Any, Any]:
+    """Build a token trie from _PATH_MAPPINGS, split on underscores."""
+    trie: Dict[Any, Any] = {}
+    for key_path, keys in _PATH_MAPPINGS.items():
+        node = trie
+        for token in key_path.split('_'):
+            node = node.setdefault(token, {})
+        node[_KEYS] = keys
+    # Nested provider configurations like llm_providers_openai_api_key
+    trie['llm']['providers'][_PROVIDER_FIELD] = ['llm', 'providers']
+    return trie
+
+
+_PATH_TRIE = _build_path_trie()
+
+
+def _resolve_key_path(key_path: str) -> List[str]:
+    """Map an underscore-separated env key path to its nested config keys."""
+    tokens = key_path.split('_')
+    node = _PATH_TRIE
+    for index, token in enumerate(tokens):
+        if _PROVIDER_FIELD in node and len(tokens) - index >= 2:
+            # Join remaining parts for compound field names
+            prefix: List[str] = node[_PROVIDER_FIELD]
+            return prefix + [token, '_'.join(tokens[index + 1:])]
+        child = node.get(token)
+        if child is None:
+            break
+        node = child
+    else:
+        if _KEYS in node:
+            keys: List[str] = node[_KEYS]
+            return keys
+    
+    # Fallback to simple split for unknown paths
+    return tokens
+
 
 class ConfigLoader:
     """Loads configuration from multiple sources with proper precedence."""
@@ -36,6 +117,10 @@ class ConfigLoader:
         """
         Load configuration from multiple sources.
         
+        Results are memoized on the config file's modification time and the
+        MCE_* environment variables, so repeated loads with unchanged inputs
+        skip parsing and validation.
+        
         Args:
             config_file: Optional path to configuration file
             
@@ -45,6 +130,22 @@ class ConfigLoader:
         Raises:
             ValidationError: If configuration validation fails
         """
+        file_mtime = None
+        if config_file:
+            try:
+                file_mtime = Path(config_file).stat().st_mtime_ns
+            except OSError:
+                pass
+        env_fingerprint = tuple(sorted(
+            (k, v) for k, v in os.environ.items() if k.startswith(self.ENV_PREFIX)
+        ))
+        # mypy does not treat class objects as Hashable for lru_cache
+        config = _load_cached(type(self), config_file, file_mtime, env_fingerprint)  # type: ignore[arg-type]
+        # Callers may modify their config, so each gets its own copy
+        return config.model_copy(deep=True)
+    
+    def _load_uncached(self, config_file: Optional[str] = None) -> AppConfig:
+        """Read, merge and validate all configuration sources."""
         # Start with default configuration
         config_dict = {}
         
@@ -53,12 +154,12 @@ class ConfigLoader:
             try:
                 file_config = self._load_from_file(config_file)
                 config_dict = self._merge_dicts(config_dict, file_config)
-                logger.info(f"Loaded configuration from file: {config_file}")
+                logger.info("Loaded configuration from file: %s", config_file)
             except Exception as e:
-                logger.error(f"Failed to load config file {config_file}: {e}")
+                logger.error("Failed to load config file %s: %s", config_file, e)
                 raise
         elif config_file:
-            logger.warning(f"Config file not found: {config_file}, using defaults")
+            logger.warning("Config file not found: %s, using defaults", config_file)
         
         # Load from environment variables (highest precedence)
         env_config = self._load_from_env()
@@ -77,15 +178,17 @@ class ConfigLoader:
             return config
             
         except ValidationError as e:
-            logger.error(f"Configuration validation failed: {e}")
+            logger.error("Configuration validation failed: %s", e)
             raise
     
     def _load_from_file(self, config_file: str) -> Dict[str, Any]:
         """Load configuration from YAML file."""
         try:
-            with open(config_file, 'r') as f:
-                config_data = yaml.safe_load(f)
-                return config_data or {}
+            # One binary read; the YAML parser decodes UTF-8/UTF-16 itself
+            with open(config_file, 'rb', buffering=1 << 16) as f:
+                raw = f.read()
+            config_data = yaml.load(raw, Loader=_YamlLoader)
+            return config_data or {}
         except yaml.YAMLError as e:
             raise ValueError(f"Invalid YAML in config file: {e}")
         except Exception as e:
@@ -95,12 +198,16 @@ class ConfigLoader:
         """Load configuration from environment variables."""
         config = {}
         
-        # Get all environment variables with our prefix
-        env_vars = {k: v for k, v in os.environ.items() if k.startswith(self.ENV_PREFIX)}
+        prefix = self.ENV_PREFIX
+        prefix_len = len(prefix)
         
-        for env_key, env_value in env_vars.items():
+        # Single pass over the environment, skipping variables without our prefix
+        for env_key, env_value in os.environ.items():
+            if not env_key.startswith(prefix):
+                continue
+            
             # Remove prefix and convert to lowercase
-            key_path = env_key[len(self.ENV_PREFIX):].lower()
+            key_path = env_key[prefix_len:].lower()
             
             # Convert environment variable to nested dict structure
             self._set_nested_value(config, key_path, env_value)
@@ -109,45 +216,7 @@ class ConfigLoader:
     
     def _set_nested_value(self, config: Dict[str, Any], key_path: str, value: str):
         """Set a nested value in config dict from underscore-separated key path."""
-        # Map known configuration paths to their correct structure
-        path_mappings = {
-            'llm_default_provider': ['llm', 'default_provider'],
-            'llm_default_model_name': ['llm', 'default_model_name'],
-            'llm_default_embedding_model_name': ['llm', 'default_embedding_model_name'],
-            'llm_cache_enabled': ['llm', 'cache_enabled'],
-            'llm_model_params_temperature': ['llm', 'model_params', 'temperature'],
-            'llm_model_params_max_tokens': ['llm', 'model_params', 'max_tokens'],
-            'llm_providers': ['llm', 'providers'],
-            'graph_db_type': ['graph_db', 'db_type'],
-            'graph_db_uri': ['graph_db', 'uri'],
-            'graph_db_username': ['graph_db', 'username'],
-            'graph_db_password': ['graph_db', 'password'],
-            'graph_db_database_name': ['graph_db', 'database_name'],
-            'vector_db_type': ['vector_db', 'db_type'],
-            'vector_db_path': ['vector_db', 'path'],
-            'vector_db_collection_name': ['vector_db', 'collection_name'],
-            'scan_paths_code_repositories': ['scan_paths', 'code_repositories'],
-            'scan_paths_documentation_sources': ['scan_paths', 'documentation_sources'],
-            'log_level': ['log_level'],
-        }
-        
-        # Check if we have a specific mapping for this path
-        if key_path in path_mappings:
-            keys = path_mappings[key_path]
-        else:
-            # Handle nested provider configurations like llm_providers_openai_api_key
-            if key_path.startswith('llm_providers_'):
-                parts = key_path.split('_')
-                if len(parts) >= 4:  # llm_providers_<provider>_<field>
-                    provider_name = parts[2]
-                    field_name = '_'.join(parts[3:])  # Join remaining parts for compound field names
-                    keys = ['llm', 'providers', provider_name, field_name]
-                else:
-                    # Fallback to simple split
-                    keys = key_path.split('_')
-            else:
-                # Fallback to simple split for unknown paths
-                keys = key_path.split('_')
+        keys = _resolve_key_path(key_path)
         
         # Navigate/create nested structure
         current = config
@@ -169,34 +238,45 @@ class ConfigLoader:
         if value.lower() in ('true', 'false'):
             return value.lower() == 'true'
         
-        # Try integer
-        try:
+        # Classify numbers up front; most values are strings and would
+        # otherwise raise twice
+        if _INT_RE.fullmatch(value):
             return int(value)
-        except ValueError:
-            pass
-        
-        # Try float
-        try:
+        if _FLOAT_RE.fullmatch(value):
             return float(value)
-        except ValueError:
-            pass
         
         # Return as string
         return value
     
     def _merge_dicts(self, base: Dict[str, Any], override: Dict[str, Any]) -> Dict[str, Any]:
-        """Recursively merge two dictionaries."""
-        result = base.copy()
+        """Merge override into a copy of base, descending into nested dicts."""
+        result = deepcopy(base)
         
-        for key, value in override.items():
-            if key in result and isinstance(result[key], dict) and isinstance(value, dict):
-                result[key] = self._merge_dicts(result[key], value)
-            else:
-                result[key] = value
+        # Walk matching sub-dicts with an explicit stack instead of recursing
+        stack = [(result, override)]
+        while stack:
+            target, source = stack.pop()
+            for key, value in source.items():
+                current = target.get(key)
+                if isinstance(current, dict) and isinstance(value, dict):
+                    stack.append((current, value))
+                else:
+                    target[key] = value
         
         return result
 
 
+@lru_cache(maxsize=8)
+def _load_cached(
+    loader_cls: Type[ConfigLoader],
+    config_file: Optional[str],
+    file_mtime: Optional[int],
+    env_fingerprint: tuple,
+) -> AppConfig:
+    """Load configuration once per loader class, config file version and environment."""
+    return loader_cls()._load_uncached(config_file)
+
+
 def get_config() -> AppConfig:
     """
     Get the global configuration instance.
@@ -234,4 +314,5 @@ def setup_config(config_file: Optional[str] = None) -> AppConfig:
 def reset_config():
     """Reset the global configuration (mainly for testing)."""
     global _config
-    _config = None 
\ No newline at end of file
+    _config = None
+    _load_cached.cache_clear() 
\ No newline at end of file
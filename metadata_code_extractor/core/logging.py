@@ -3,13 +3,65 @@ Logging configuration for the Metadata Code Extractor.
 
 Provides centralized logging setup with configurable levels,
 formatters, and output destinations.
+
+Log calls should pass arguments separately, e.g.
+``logger.debug("parsed %d nodes", n)`` rather than an f-string, so the
+message is only formatted when a handler will actually emit it.
 """
 
+import atexit
 import logging
 import logging.handlers
+import queue
 import sys
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
+
+# Library default: discard records until setup_logging() installs handlers
+logging.getLogger("metadata_code_extractor").addHandler(logging.NullHandler())
+
+# Shared formatters; Formatter holds no per-record state
+_CONSOLE_FMT = logging.Formatter(
+    fmt="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S"
+)
+_FILE_FMT = logging.Formatter(
+    fmt="%(asctime)s - %(name)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S"
+)
+# Only merges args into the message; the listener's handlers apply the real formats
+_QUEUE_FMT = logging.Formatter("%(message)s")
+
+# Background listener that writes queued records to the real handlers
+_listener: Optional[logging.handlers.QueueListener] = None
+# Arguments of the setup_logging() call that built the running listener
+_active_setup: Optional[tuple] = None
+
+
+def shutdown_logging() -> None:
+    """
+    Stop the background log listener, flushing any queued records.
+    
+    Safe to call more than once; registered to run at interpreter exit.
+    """
+    global _listener, _active_setup
+    if _listener is None:
+        return
+    
+    # Detach the queue first so no records are stranded after the listener stops
+    logger = logging.getLogger("metadata_code_extractor")
+    for handler in list(logger.handlers):
+        if isinstance(handler, logging.handlers.QueueHandler):
+            logger.removeHandler(handler)
+    
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
+    _active_setup = None
+
+
+atexit.register(shutdown_logging)
 
 
 def setup_logging(
@@ -30,6 +82,8 @@ def setup_logging(
     Raises:
         ValueError: If invalid logging level is provided
     """
+    global _listener, _active_setup
+    
     # Validate logging level
     numeric_level = getattr(logging, level.upper(), None)
     if not isinstance(numeric_level, int):
@@ -38,28 +92,24 @@ def setup_logging(
     # Get the root logger for our application
     logger = logging.getLogger("metadata_code_extractor")
     
+    # Nothing to do if the same configuration is already running
+    setup_args = (numeric_level, log_file, max_file_size, backup_count)
+    if (_listener is not None and setup_args == _active_setup
+            and logger.level == numeric_level and logger.handlers):
+        return
+    
     # Clear any existing handlers to avoid duplicates
     logger.handlers.clear()
+    shutdown_logging()
     
     # Set the logging level
     logger.setLevel(numeric_level)
     
-    # Create formatters
-    console_formatter = logging.Formatter(
-        fmt="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S"
-    )
-    
-    file_formatter = logging.Formatter(
-        fmt="%(asctime)s - %(name)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S"
-    )
-    
     # Console handler
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(numeric_level)
-    console_handler.setFormatter(console_formatter)
-    logger.addHandler(console_handler)
+    console_handler.setFormatter(_CONSOLE_FMT)
+    handlers: List[logging.Handler] = [console_handler]
     
     # File handler (if specified)
     if log_file:
@@ -75,16 +125,27 @@ def setup_logging(
             encoding='utf-8'
         )
         file_handler.setLevel(numeric_level)
-        file_handler.setFormatter(file_formatter)
-        logger.addHandler(file_handler)
+        file_handler.setFormatter(_FILE_FMT)
+        handlers.append(file_handler)
+    
+    # Callers only enqueue records; console and file I/O happen on the
+    # listener thread so logging never blocks the event loop
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.setFormatter(_QUEUE_FMT)
+    logger.addHandler(queue_handler)
+    
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    _active_setup = setup_args
     
     # Prevent propagation to root logger to avoid duplicate messages
     logger.propagate = False
     
     # Log the setup completion
-    logger.info(f"Logging initialized with level: {level}")
+    logger.info("Logging initialized with level: %s", level)
     if log_file:
-        logger.info(f"Log file: {log_file}")
+        logger.info("Log file: %s", log_file)
 
 
 def get_logger(name: str) -> logging.Logger:
@@ -115,10 +176,15 @@ def set_log_level(level: str) -> None:
         raise ValueError(f"Invalid log level: {level}")
     
     logger = logging.getLogger("metadata_code_extractor")
+    if logger.level == numeric_level:
+        return
     logger.setLevel(numeric_level)
     
-    # Update all handlers
-    for handler in logger.handlers:
+    # Update all handlers, including those behind the queue listener
+    handlers = list(logger.handlers)
+    if _listener is not None:
+        handlers.extend(_listener.handlers)
+    for handler in handlers:
         handler.setLevel(numeric_level)
     
-    logger.info(f"Log level changed to: {level}") 
\ No newline at end of file
+    logger.info("Log level changed to: %s", level) 
\ No newline at end of file
@@ -53,6 +53,8 @@ class LLMSettings(BaseModel):
     )
     model_params: ModelParams = Field(default_factory=ModelParams)
     cache_enabled: bool = True
+    cache_path: Optional[Path] = None
+    llm_max_async: int = Field(default=32, gt=0)
 
 
 class GraphDBConnectionConfig(BaseModel):
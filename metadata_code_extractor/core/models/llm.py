@@ -43,10 +43,12 @@ class ModelConfig(BaseModel):
     frequency_penalty: Optional[float] = Field(default=None, ge=-2.0, le=2.0)
     presence_penalty: Optional[float] = Field(default=None, ge=-2.0, le=2.0)
     stop: Optional[Union[str, List[str]]] = None
+    no_cache: bool = False
     
     class Config:
         """Pydantic configuration."""
         extra = "forbid"
+        frozen = True
 
 
 class EmbeddingConfig(BaseModel):
@@ -59,6 +61,7 @@ class EmbeddingConfig(BaseModel):
     class Config:
         """Pydantic configuration."""
         extra = "forbid"
+        frozen = True
 
 
 class LLMResponse(BaseModel):
@@ -6,12 +6,15 @@ including caching, prompt management, and response handling.
 """
 
 from .cache import (
+    DiskLLMCache,
     FileLLMCache,
     InMemoryLLMCache,
     LLMCacheError,
     LLMCacheInterface,
+    SemanticCache,
 )
 from .client import (
+    EmbeddingBatcher,
     LLMClient,
     LLMClientError,
     LLMProviderAdapter,
@@ -20,11 +23,14 @@ from .client import (
 
 __all__ = [
     # Cache
+    "DiskLLMCache",
     "FileLLMCache",
     "InMemoryLLMCache", 
     "LLMCacheError",
     "LLMCacheInterface",
+    "SemanticCache",
     # Client
+    "EmbeddingBatcher",
     "LLMClient",
     "LLMClientError",
     "LLMProviderAdapter",
@@ -8,19 +8,51 @@ and file-based caching with configurable TTL and cleanup.
 
 import hashlib
 import json
-import re
+import math
+import operator
+import os
+import sqlite3
+import threading
 import time
 from abc import ABC, abstractmethod
-from datetime import datetime, timedelta
+from collections import OrderedDict, deque
 from pathlib import Path
-from typing import Any, Dict, Optional, Union
+from types import ModuleType
+from typing import Any, Deque, Dict, List, Optional, Type, Union
+
+orjson: Optional[ModuleType]
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# numpy is optional; with it the semantic cache scores a namespace in one
+# matrix-vector product instead of a Python loop per entry
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 from metadata_code_extractor.core.models.llm import (
+    EmbeddingConfig,
     EmbeddingResponse,
     LLMResponse,
 )
 
 
+_RESPONSE_TYPES: Dict[str, Type[Union[LLMResponse, EmbeddingResponse]]] = {
+    "LLMResponse": LLMResponse,
+    "EmbeddingResponse": EmbeddingResponse,
+}
+
+
+def _loads_bytes(data: bytes) -> Any:
+    """Parse JSON bytes, preferring orjson when installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
 class LLMCacheError(Exception):
     """Exception raised when there's an error with the LLM cache."""
     pass
@@ -74,24 +106,31 @@ class InMemoryLLMCache(LLMCacheInterface):
     """
     In-memory LLM cache implementation.
     
-    Stores cached responses in memory with TTL support and automatic cleanup.
+    Stores cached responses in memory with TTL support. Expired entries are
+    dropped lazily on access and the least recently used entries are evicted
+    once max_entries is exceeded.
     """
     
-    def __init__(self, default_ttl: int = 3600):
+    def __init__(self, default_ttl: int = 3600, max_entries: int = 10_000):
         """
         Initialize the in-memory cache.
         
         Args:
             default_ttl: Default time to live in seconds (default: 1 hour)
+            max_entries: Maximum number of cached entries (default: 10000)
             
         Raises:
-            ValueError: If TTL is not positive
+            ValueError: If TTL or max_entries is not positive
         """
         if default_ttl <= 0:
             raise ValueError("TTL must be positive")
         
+        if max_entries <= 0:
+            raise ValueError("Max entries must be positive")
+        
         self.default_ttl = default_ttl
-        self._cache: Dict[str, Dict[str, Any]] = {}
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
     
     def get(self, key: str) -> Optional[Union[LLMResponse, EmbeddingResponse]]:
         """
@@ -109,10 +148,11 @@ class InMemoryLLMCache(LLMCacheInterface):
         entry = self._cache[key]
         
         # Check if expired
-        if datetime.now() > entry["expires_at"]:
+        if time.monotonic() > entry["expires_at"]:
             del self._cache[key]
             return None
         
+        self._cache.move_to_end(key)
         return entry["response"]
     
     def set(
@@ -142,12 +182,17 @@ class InMemoryLLMCache(LLMCacheInterface):
             raise LLMCacheError(f"Unsupported response type: {type(response)}")
         
         ttl = ttl or self.default_ttl
-        expires_at = datetime.now() + timedelta(seconds=ttl)
+        expires_at = time.monotonic() + ttl
         
         self._cache[key] = {
             "response": response,
             "expires_at": expires_at
         }
+        self._cache.move_to_end(key)
+        
+        # Evict least recently used entries
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
     
     def clear(self) -> None:
         """Clear all cached entries."""
@@ -157,18 +202,17 @@ class InMemoryLLMCache(LLMCacheInterface):
         """
         Get the number of cached entries.
         
-        Automatically cleans up expired entries.
+        Expired entries are only dropped when accessed or by _cleanup_expired,
+        so they may still be counted.
         
         Returns:
-            Number of valid (non-expired) cached entries
+            Number of cached entries
         """
-        # Clean up expired entries
-        self._cleanup_expired()
         return len(self._cache)
     
     def _cleanup_expired(self) -> None:
         """Remove expired entries from the cache."""
-        now = datetime.now()
+        now = time.monotonic()
         expired_keys = [
             key for key, entry in self._cache.items()
             if now > entry["expires_at"]
@@ -231,29 +275,24 @@ class FileLLMCache(LLMCacheInterface):
             return None
         
         try:
-            with open(cache_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            with open(cache_file, 'rb') as f:
+                data = _loads_bytes(f.read())
             
             # Check if expired
-            expires_at = datetime.fromisoformat(data["expires_at"])
-            if datetime.now() > expires_at:
+            if time.time() > data["expires_at"]:
                 cache_file.unlink(missing_ok=True)
                 return None
             
             # Reconstruct response object
-            response_data = data["response"]
-            response_type = response_data.get("response_type")
-            
-            if response_type == "LLMResponse":
-                return LLMResponse(**{k: v for k, v in response_data.items() if k != "response_type"})
-            elif response_type == "EmbeddingResponse":
-                return EmbeddingResponse(**{k: v for k, v in response_data.items() if k != "response_type"})
-            else:
+            response_cls = _RESPONSE_TYPES.get(data["response_type"])
+            if response_cls is None:
                 # Unknown response type, remove file
                 cache_file.unlink(missing_ok=True)
                 return None
+            
+            return response_cls.model_validate(data["response"])
                 
-        except (json.JSONDecodeError, KeyError, ValueError, OSError):
+        except (KeyError, TypeError, ValueError, OSError):
             # Corrupted or invalid file, remove it
             cache_file.unlink(missing_ok=True)
             return None
@@ -285,37 +324,49 @@ class FileLLMCache(LLMCacheInterface):
             raise LLMCacheError(f"Unsupported response type: {type(response)}")
         
         ttl = ttl or self.default_ttl
-        expires_at = datetime.now() + timedelta(seconds=ttl)
-        
-        # Prepare data for serialization
-        response_data = response.model_dump()
-        response_data["response_type"] = response.__class__.__name__
-        
-        cache_data = {
-            "response": response_data,
-            "expires_at": expires_at.isoformat()
-        }
+        now = time.time()
+        expires_at = now + ttl
+        
+        # Splice pydantic's JSON into the envelope instead of re-serializing a dict
+        payload = b"".join((
+            b'{"response_type":"',
+            type(response).__name__.encode(),
+            b'","response":',
+            response.model_dump_json().encode('utf-8'),
+            b',"expires_at":',
+            repr(expires_at).encode(),
+            b'}',
+        ))
         
         # Check file size before writing
-        cache_json = json.dumps(cache_data, indent=2)
-        if len(cache_json.encode('utf-8')) > self.max_file_size:
+        if len(payload) > self.max_file_size:
             raise LLMCacheError(f"Response too large for cache (max: {self.max_file_size} bytes)")
         
         cache_file = self._get_cache_file_path(key)
+        # Per-writer temp file so concurrent writers never share a partial file
+        tmp_file = cache_file.with_name(
+            f"{cache_file.name}.tmp.{os.getpid()}.{threading.get_ident()}"
+        )
         
         try:
             # Ensure parent directory exists
             cache_file.parent.mkdir(parents=True, exist_ok=True)
             
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                f.write(cache_json)
+            # Atomic rename so readers never see a truncated file; no fsync,
+            # a cache needs atomicity but not durability
+            with open(tmp_file, 'wb') as f:
+                f.write(payload)
+            # The mtime encodes the expiry so cleanup only needs a stat
+            os.utime(tmp_file, (now, expires_at))
+            os.replace(tmp_file, cache_file)
                 
         except (OSError, PermissionError) as e:
+            tmp_file.unlink(missing_ok=True)
             raise LLMCacheError(f"Failed to write cache file: {e}")
     
     def clear(self) -> None:
         """Clear all cached entries."""
-        for cache_file in self.cache_dir.glob("*.json"):
+        for cache_file in self.cache_dir.rglob("*.json"):
             try:
                 cache_file.unlink()
             except OSError:
@@ -329,35 +380,496 @@ class FileLLMCache(LLMCacheInterface):
         Returns:
             Number of cache files in the directory
         """
-        return len(list(self.cache_dir.glob("*.json")))
+        return sum(1 for _ in self.cache_dir.rglob("*.json"))
     
     def _cleanup_expired(self) -> None:
-        """Remove expired cache files."""
-        now = datetime.now()
+        """Remove expired cache files, using each file's mtime as its expiry time."""
+        now = time.time()
+        pending: List[Union[str, Path]] = [self.cache_dir]
         
-        for cache_file in self.cache_dir.glob("*.json"):
+        while pending:
             try:
-                with open(cache_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                expires_at = datetime.fromisoformat(data["expires_at"])
-                if now > expires_at:
-                    cache_file.unlink(missing_ok=True)
-                    
-            except (json.JSONDecodeError, KeyError, ValueError, OSError):
-                # Corrupted file, remove it
-                cache_file.unlink(missing_ok=True)
+                entries = os.scandir(pending.pop())
+            except OSError:
+                continue
+            
+            with entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append(entry.path)
+                        elif entry.name.endswith(".json") and entry.stat().st_mtime < now:
+                            os.unlink(entry.path)
+                    except OSError:
+                        # Ignore errors during cleanup
+                        pass
     
     def _get_cache_file_path(self, key: str) -> Path:
         """
         Get the file path for a cache key.
         
+        Keys are hashed so any length or charset maps to a safe file name, and
+        files are bucketed two levels deep to keep directories small.
+        
         Args:
             key: Cache key
             
         Returns:
             Path to the cache file
         """
-        # Sanitize the key to be filesystem-safe
-        safe_key = re.sub(r'[<>:"/\\|?*]', '_', key)
-        return self.cache_dir / f"{safe_key}.json" 
\ No newline at end of file
+        h = hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest()
+        return self.cache_dir / h[:2] / h[2:4] / f"{h}.json"
+
+
+class DiskLLMCache(LLMCacheInterface):
+    """
+    Persistent SQLite-backed LLM cache implementation.
+    
+    Survives process restarts, expires entries by TTL and evicts the least
+    recently used entries once the stored payloads exceed max_bytes. The
+    payload total is kept in a one-row stats table maintained by triggers,
+    so writes check the budget without scanning the table.
+    """
+    
+    # Expired entries are purged once every this many writes
+    PURGE_INTERVAL = 256
+    
+    def __init__(
+        self,
+        path: Union[str, Path],
+        max_bytes: int = 1 << 30,
+        default_ttl: int = 3600
+    ):
+        """
+        Initialize the disk cache.
+        
+        Args:
+            path: Directory holding the cache database
+            max_bytes: Maximum total size of cached payloads (default: 1GB)
+            default_ttl: Default time to live in seconds (default: 1 hour)
+            
+        Raises:
+            ValueError: If TTL or max_bytes is not positive
+            LLMCacheError: If the cache database cannot be opened
+        """
+        if default_ttl <= 0:
+            raise ValueError("TTL must be positive")
+        
+        if max_bytes <= 0:
+            raise ValueError("Max bytes must be positive")
+        
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._lock = threading.Lock()
+        self._writes = 0
+        
+        try:
+            self.path.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(
+                str(self.path / "llm_cache.sqlite3"),
+                check_same_thread=False,
+                isolation_level=None
+            )
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, "
+                "response_type TEXT NOT NULL, "
+                "payload BLOB NOT NULL, "
+                "size INTEGER NOT NULL, "
+                "expires_at REAL NOT NULL, "
+                "accessed_at REAL NOT NULL)"
+            )
+            # Schema setup in one transaction so concurrent openers agree
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at)"
+                )
+                self._conn.execute(
+                    "CREATE INDEX IF NOT EXISTS entries_expires_at ON entries (expires_at)"
+                )
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS stats ("
+                    "id INTEGER PRIMARY KEY CHECK (id = 1), "
+                    "total_bytes INTEGER NOT NULL)"
+                )
+                # Seeds the total once for databases created before the stats table
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO stats (id, total_bytes) "
+                    "SELECT 1, COALESCE(SUM(size), 0) FROM entries"
+                )
+                self._conn.execute(
+                    "CREATE TRIGGER IF NOT EXISTS entries_size_insert AFTER INSERT ON entries "
+                    "BEGIN UPDATE stats SET total_bytes = total_bytes + NEW.size WHERE id = 1; END"
+                )
+                self._conn.execute(
+                    "CREATE TRIGGER IF NOT EXISTS entries_size_delete AFTER DELETE ON entries "
+                    "BEGIN UPDATE stats SET total_bytes = total_bytes - OLD.size WHERE id = 1; END"
+                )
+                self._conn.execute(
+                    "CREATE TRIGGER IF NOT EXISTS entries_size_update AFTER UPDATE OF size ON entries "
+                    "BEGIN UPDATE stats SET total_bytes = total_bytes + NEW.size - OLD.size "
+                    "WHERE id = 1; END"
+                )
+                self._conn.execute("COMMIT")
+            except sqlite3.Error:
+                self._conn.execute("ROLLBACK")
+                raise
+        except (OSError, sqlite3.Error) as e:
+            raise LLMCacheError(f"Failed to open cache database: {e}")
+    
+    def get(self, key: str) -> Optional[Union[LLMResponse, EmbeddingResponse]]:
+        """
+        Get a cached response by key.
+        
+        Args:
+            key: Cache key
+            
+        Returns:
+            Cached response or None if not found/expired
+        """
+        now = time.time()
+        
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response_type, payload, expires_at FROM entries WHERE key = ?",
+                (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            
+            response_type, payload, expires_at = row
+            if now > expires_at:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                return None
+            
+            self._conn.execute(
+                "UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+        
+        response_cls = _RESPONSE_TYPES.get(response_type)
+        if response_cls is None:
+            return None
+        
+        try:
+            return response_cls.model_validate_json(payload)
+        except ValueError:
+            # Corrupted entry, remove it
+            with self._lock:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            return None
+    
+    def set(
+        self,
+        key: str,
+        response: Union[LLMResponse, EmbeddingResponse],
+        ttl: Optional[int] = None
+    ) -> None:
+        """
+        Set a cached response.
+        
+        Args:
+            key: Cache key
+            response: Response to cache
+            ttl: Time to live in seconds (optional)
+            
+        Raises:
+            LLMCacheError: If key is empty, response is invalid, or the write fails
+        """
+        if not key or not key.strip():
+            raise LLMCacheError("Cache key cannot be empty")
+        
+        if response is None:
+            raise LLMCacheError("Response cannot be None")
+        
+        if not isinstance(response, (LLMResponse, EmbeddingResponse)):
+            raise LLMCacheError(f"Unsupported response type: {type(response)}")
+        
+        payload = response.model_dump_json().encode("utf-8")
+        if len(payload) > self.max_bytes:
+            raise LLMCacheError(f"Response too large for cache (max: {self.max_bytes} bytes)")
+        
+        now = time.time()
+        expires_at = now + (ttl or self.default_ttl)
+        
+        try:
+            with self._lock:
+                # Upsert rather than REPLACE so the size triggers see an UPDATE
+                self._conn.execute(
+                    "INSERT INTO entries "
+                    "(key, response_type, payload, size, expires_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (key) DO UPDATE SET "
+                    "response_type = excluded.response_type, payload = excluded.payload, "
+                    "size = excluded.size, expires_at = excluded.expires_at, "
+                    "accessed_at = excluded.accessed_at",
+                    (key, response.__class__.__name__, payload, len(payload), expires_at, now)
+                )
+                self._evict(now)
+        except sqlite3.Error as e:
+            raise LLMCacheError(f"Failed to write cache entry: {e}")
+    
+    def clear(self) -> None:
+        """Clear all cached entries."""
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+    
+    def size(self) -> int:
+        """
+        Get the number of cached entries.
+        
+        Returns:
+            Number of valid (non-expired) cached entries
+        """
+        with self._lock:
+            (count,) = self._conn.execute(
+                "SELECT COUNT(*) FROM entries WHERE expires_at >= ?", (time.time(),)
+            ).fetchone()
+        return int(count)
+    
+    def close(self) -> None:
+        """Close the cache database."""
+        with self._lock:
+            self._conn.close()
+    
+    def _total_bytes(self) -> int:
+        """Total size of stored payloads, read from the stats row."""
+        (total,) = self._conn.execute("SELECT total_bytes FROM stats WHERE id = 1").fetchone()
+        return int(total)
+    
+    def _evict(self, now: float) -> None:
+        """
+        Keep the cache within max_bytes.
+        
+        Expired entries are purged every PURGE_INTERVAL writes, or first when
+        over budget; least recently used entries go next if still over.
+        """
+        self._writes += 1
+        if self._writes % self.PURGE_INTERVAL == 0:
+            self._conn.execute("DELETE FROM entries WHERE expires_at < ?", (now,))
+        
+        total = self._total_bytes()
+        if total <= self.max_bytes:
+            return
+        
+        self._conn.execute("DELETE FROM entries WHERE expires_at < ?", (now,))
+        total = self._total_bytes()
+        if total <= self.max_bytes:
+            return
+        
+        excess = total - self.max_bytes
+        victims = []
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM entries ORDER BY accessed_at"
+        ):
+            victims.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+
+
+class SemanticCache:
+    """
+    Embedding-similarity cache for chat completions.
+    
+    Stores responses keyed by the embedding of the prompt and returns the
+    closest stored response when its cosine similarity meets the threshold.
+    Entries are partitioned by namespace so only prompts sharing the same
+    conversation context and model configuration can match each other.
+    
+    Vectors are stored unit-normalized, so cosine similarity is a dot product.
+    With numpy installed each namespace is scored with one matrix-vector
+    product. lookup() is thread-safe so callers can run it off the event loop.
+    Lookups skip expired entries; they are removed on insert.
+    """
+    
+    # Expired entries are purged once every this many inserts
+    PURGE_INTERVAL = 256
+    
+    def __init__(
+        self,
+        embedding_config: EmbeddingConfig,
+        threshold: float = 0.92,
+        default_ttl: int = 3600,
+        max_entries: int = 2000
+    ):
+        """
+        Initialize the semantic cache.
+        
+        Args:
+            embedding_config: Embedding configuration used to embed prompts
+            threshold: Minimum cosine similarity for a cache hit
+            default_ttl: Default time to live in seconds (default: 1 hour)
+            max_entries: Maximum entries kept per namespace (default: 2000)
+            
+        Raises:
+            ValueError: If threshold is outside (0, 1] or TTL/max_entries is not positive
+        """
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError("Threshold must be in (0, 1]")
+        
+        if default_ttl <= 0:
+            raise ValueError("TTL must be positive")
+        
+        if max_entries <= 0:
+            raise ValueError("Max entries must be positive")
+        
+        self.embedding_config = embedding_config
+        self.threshold = threshold
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        # namespace -> deque of (unit vector, response, expires_at), oldest first
+        self._entries: Dict[str, Deque[tuple]] = {}
+        # namespace -> (dimension, stacked unit vectors, responses, expiry times); numpy only
+        self._matrices: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        self._writes = 0
+    
+    def lookup(self, embedding: List[float], namespace: str) -> Optional[LLMResponse]:
+        """
+        Find the most similar cached response within a namespace.
+        
+        Args:
+            embedding: Embedding of the prompt
+            namespace: Partition to search
+            
+        Returns:
+            Cached response or None if nothing is similar enough
+        """
+        query = self._normalize(embedding)
+        if query is None:
+            return None
+        dim = len(query)
+        
+        # Snapshot under the lock; scoring runs without holding it
+        now = time.time()
+        cached: Optional[tuple] = None
+        snapshot: List[tuple] = []
+        with self._lock:
+            entries = self._entries.get(namespace)
+            if not entries:
+                return None
+            
+            if np is not None:
+                cached = self._matrices.get(namespace)
+                if cached is None or cached[0] != dim:
+                    rows = [entry for entry in entries if len(entry[0]) == dim]
+                    if not rows:
+                        return None
+                    cached = (
+                        dim,
+                        np.stack([vector for vector, _, _ in rows]),
+                        [response for _, response, _ in rows],
+                        np.array([expires_at for _, _, expires_at in rows]),
+                    )
+                    self._matrices[namespace] = cached
+            else:
+                snapshot = list(entries)
+        
+        best_score = -1.0
+        best_response: Optional[LLMResponse] = None
+        if cached is not None:
+            # Expired rows stay in the matrix until the next purge; mask them out
+            scores = np.where(cached[3] > now, cached[1] @ query, -np.inf)
+            best = int(np.argmax(scores))
+            best_score, best_response = float(scores[best]), cached[2][best]
+        else:
+            for vector, response, expires_at in snapshot:
+                if expires_at <= now or len(vector) != dim:
+                    continue
+                score = sum(map(operator.mul, vector, query))
+                if score > best_score:
+                    best_score, best_response = score, response
+        
+        if best_score >= self.threshold:
+            return best_response
+        return None
+    
+    def add(
+        self,
+        embedding: List[float],
+        response: LLMResponse,
+        namespace: str,
+        ttl: Optional[int] = None
+    ) -> None:
+        """
+        Store a response under the embedding of its prompt.
+        
+        The oldest entry of a full namespace is evicted, and expired entries
+        are purged every PURGE_INTERVAL inserts.
+        
+        Args:
+            embedding: Embedding of the prompt
+            response: Response to cache
+            namespace: Partition to store the entry in
+            ttl: Time to live in seconds (optional)
+            
+        Raises:
+            LLMCacheError: If the response is not an LLMResponse
+        """
+        if not isinstance(response, LLMResponse):
+            raise LLMCacheError(f"Unsupported response type: {type(response)}")
+        
+        vector = self._normalize(embedding)
+        if vector is None:
+            return
+        
+        now = time.time()
+        with self._lock:
+            self._writes += 1
+            if self._writes % self.PURGE_INTERVAL == 0:
+                self._purge_expired(now)
+            
+            entries = self._entries.get(namespace)
+            if entries is None:
+                entries = self._entries[namespace] = deque(maxlen=self.max_entries)
+            entries.append((vector, response, now + (ttl or self.default_ttl)))
+            self._matrices.pop(namespace, None)
+    
+    def _purge_expired(self, now: float) -> None:
+        """Drop expired entries from every namespace; the caller holds the lock."""
+        for namespace, entries in list(self._entries.items()):
+            if any(entry[2] <= now for entry in entries):
+                live = deque((entry for entry in entries if entry[2] > now), maxlen=self.max_entries)
+                if live:
+                    self._entries[namespace] = live
+                else:
+                    del self._entries[namespace]
+                self._matrices.pop(namespace, None)
+    
+    def clear(self) -> None:
+        """Clear all cached entries."""
+        with self._lock:
+            self._entries.clear()
+            self._matrices.clear()
+    
+    def size(self) -> int:
+        """
+        Get the number of cached entries.
+        
+        Returns:
+            Number of valid (non-expired) cached entries
+        """
+        now = time.time()
+        with self._lock:
+            return sum(
+                1 for entries in self._entries.values() for entry in entries if entry[2] > now
+            )
+    
+    @staticmethod
+    def _normalize(embedding: List[float]) -> Optional[Any]:
+        """Scale an embedding to unit length, or return None for a zero vector."""
+        if np is not None:
+            vector = np.asarray(embedding, dtype=np.float32)
+            norm = float(np.linalg.norm(vector))
+            if norm == 0.0:
+                return None
+            return vector / norm
+        
+        norm = math.sqrt(math.fsum(x * x for x in embedding))
+        if norm == 0.0:
+            return None
+        return [x / norm for x in embedding]
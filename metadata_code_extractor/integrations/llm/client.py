@@ -5,12 +5,28 @@ This module provides a unified interface for interacting with various LLM provid
 including support for chat completions, text generation, embeddings, and caching.
 """
 
+import asyncio
 import hashlib
 import json
 import time
+import weakref
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional, Union
+from types import ModuleType
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, Union, cast
 
+orjson: Optional[ModuleType]
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+from metadata_code_extractor.core.models.config import LLMSettings
+from metadata_code_extractor.integrations.llm.cache import DiskLLMCache, SemanticCache
 from metadata_code_extractor.core.models.llm import (
     ChatMessage,
     EmbeddingConfig,
@@ -20,6 +36,64 @@ from metadata_code_extractor.core.models.llm import (
     ModelConfig,
 )
 
+# ChatMessage uses use_enum_values=True, so roles are plain strings at runtime
+_USER_ROLE = MessageRole.USER.value
+
+# One byte per role for the binary cache-key payload
+_ROLE_BYTES = {role.value: bytes([i]) for i, role in enumerate(MessageRole)}
+
+
+def _new_key_hasher() -> Any:
+    """Return a streaming 128-bit hasher, preferring xxh3 when installed."""
+    if xxhash is not None:
+        return xxhash.xxh3_128()
+    return hashlib.blake2b(digest_size=16)
+
+
+def _canonical_json(obj: Any) -> bytes:
+    """Serialize obj to JSON bytes with sorted keys, preferring orjson when installed."""
+    if orjson is not None:
+        data: bytes = orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+        return data
+    return json.dumps(obj, sort_keys=True, separators=(",", ":")).encode()
+
+
+def _update_chunk(h: Any, data: bytes) -> None:
+    """Feed a length-prefixed chunk so adjacent fields cannot run together."""
+    h.update(len(data).to_bytes(4, "big"))
+    h.update(data)
+
+
+def _update_optional(h: Any, data: Optional[bytes]) -> None:
+    """Feed a presence tag, then the chunk if present, so None and empty differ."""
+    if data is None:
+        h.update(b"\x00")
+    else:
+        h.update(b"\x01")
+        _update_chunk(h, data)
+
+
+# Serialized config fields keyed by id(); configs are frozen, and entries are
+# dropped when the config is garbage collected so a reused id never goes stale
+_CONFIG_FINGERPRINTS: Dict[int, bytes] = {}
+
+
+def _config_fingerprint(config: Union[ModelConfig, EmbeddingConfig]) -> bytes:
+    """Return the cache-key encoding of a config, memoized per config object."""
+    key = id(config)
+    fingerprint = _CONFIG_FINGERPRINTS.get(key)
+    if fingerprint is None:
+        # Config fields are scalars (or a list of stop strings) whose repr is stable
+        parts = [type(config).__name__.encode()]
+        for field_name in type(config).model_fields:
+            value = repr(getattr(config, field_name)).encode()
+            parts.append(len(value).to_bytes(4, "big"))
+            parts.append(value)
+        fingerprint = b"".join(parts)
+        _CONFIG_FINGERPRINTS[key] = fingerprint
+        weakref.finalize(config, _CONFIG_FINGERPRINTS.pop, key, None)
+    return fingerprint
+
 
 class LLMClientError(Exception):
     """Base exception for LLM client errors."""
@@ -48,6 +122,19 @@ class LLMProviderAdapter(ABC):
         """Get a chat completion from the LLM provider."""
         pass
     
+    async def stream_chat_completion(
+        self,
+        messages: List[ChatMessage],
+        config: ModelConfig
+    ) -> AsyncIterator[str]:
+        """
+        Stream a chat completion from the LLM provider as content deltas.
+        
+        Providers without native streaming yield the full completion at once.
+        """
+        response = await self.get_chat_completion(messages, config)
+        yield response.content
+    
     @abstractmethod
     async def generate_embeddings(
         self, 
@@ -61,6 +148,150 @@ class LLMProviderAdapter(ABC):
     async def is_available(self) -> bool:
         """Check if the provider is available."""
         pass
+    
+    async def close(self) -> None:
+        """Release provider resources such as HTTP connection pools."""
+        pass
+
+
+class EmbeddingBatcher:
+    """
+    Coalesces single-text embedding requests into batched provider calls.
+    
+    Texts submitted within a short window are sent together as one request,
+    and each caller receives its own embedding via a per-item future.
+    All requests handled by one batcher share the same embedding config.
+    Up to max_in_flight batches run concurrently; while they are all busy,
+    new requests keep accumulating into the next batch.
+    """
+    
+    def __init__(
+        self,
+        embed_fn: Callable[[List[str], EmbeddingConfig], Awaitable[EmbeddingResponse]],
+        config: EmbeddingConfig,
+        max_batch_size: int = 128,
+        max_wait_ms: float = 5.0,
+        max_in_flight: int = 32
+    ):
+        """
+        Initialize the embedding batcher.
+        
+        Args:
+            embed_fn: Coroutine function that embeds a list of texts
+            config: Embedding configuration shared by every batched request
+            max_batch_size: Maximum number of texts per provider call
+            max_wait_ms: Maximum time to wait for a batch to fill
+            max_in_flight: Maximum number of batches dispatched concurrently
+        """
+        self.embed_fn = embed_fn
+        self.config = config
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.max_in_flight = max_in_flight
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # Dispatch tasks mapped to their batches; the references keep tasks alive
+        self._in_flight: Dict[asyncio.Task, List[Tuple[str, asyncio.Future]]] = {}
+    
+    async def submit(self, text: str) -> List[float]:
+        """
+        Queue a text for embedding and wait for its vector.
+        
+        Args:
+            text: Text to embed
+            
+        Returns:
+            Embedding vector for the text
+        """
+        loop = asyncio.get_running_loop()
+        # The queue and worker are bound to the loop they were created on
+        queue = self._queue
+        if queue is None or self._task is None or self._task.done() or self._loop is not loop:
+            self._loop = loop
+            self._queue = queue = asyncio.Queue()
+            # Each worker gets its own dispatch slots
+            slots = asyncio.Semaphore(self.max_in_flight)
+            self._task = loop.create_task(self._run(queue, slots))
+        
+        future: "asyncio.Future[List[float]]" = loop.create_future()
+        queue.put_nowait((text, future))
+        return await future
+    
+    async def close(self) -> None:
+        """Stop the background worker and in-flight batches, failing their requests."""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        
+        pending: List[asyncio.Future] = []
+        for task, batch in list(self._in_flight.items()):
+            task.cancel()
+            pending.extend(future for _, future in batch)
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+        self._in_flight.clear()
+        
+        while self._queue is not None and not self._queue.empty():
+            pending.append(self._queue.get_nowait()[1])
+        
+        for future in pending:
+            if not future.done():
+                future.set_exception(LLMClientError("Embedding batcher closed"))
+    
+    async def _run(self, queue: asyncio.Queue, slots: asyncio.Semaphore) -> None:
+        """Drain the queue into batches and dispatch them to the provider."""
+        loop = asyncio.get_running_loop()
+        
+        def on_dispatched(task: asyncio.Task) -> None:
+            # Bound to this worker's semaphore, which a restart replaces
+            self._in_flight.pop(task, None)
+            slots.release()
+        
+        while True:
+            # Wait for a free dispatch slot first so requests keep batching up
+            await slots.acquire()
+            try:
+                batch = [await queue.get()]
+            except BaseException:
+                slots.release()
+                raise
+            deadline = loop.time() + self.max_wait
+            
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            task = loop.create_task(self._dispatch(batch))
+            self._in_flight[task] = batch
+            task.add_done_callback(on_dispatched)
+    
+    async def _dispatch(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        """Embed one batch and resolve each caller's future."""
+        try:
+            response = await self.embed_fn([text for text, _ in batch], self.config)
+            if len(response.embeddings) != len(batch):
+                raise LLMProviderError(
+                    f"Expected {len(batch)} embeddings, got {len(response.embeddings)}"
+                )
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        for (_, future), embedding in zip(batch, response.embeddings):
+            if not future.done():
+                future.set_result(embedding)
 
 
 class LLMClient:
@@ -74,7 +305,11 @@ class LLMClient:
     def __init__(
         self, 
         provider_adapter: Optional[LLMProviderAdapter] = None,
-        cache: Optional[Any] = None
+        cache: Optional[Any] = None,
+        max_concurrency: int = 32,
+        semantic_cache: Optional[SemanticCache] = None,
+        availability_ttl: float = 30.0,
+        cache_ttl_seconds: int = 3600
     ):
         """
         Initialize the LLM client.
@@ -82,9 +317,85 @@ class LLMClient:
         Args:
             provider_adapter: The provider adapter to use for LLM operations
             cache: Optional cache implementation for storing responses
+            max_concurrency: Maximum number of in-flight provider calls
+            semantic_cache: Optional similarity cache for deterministic chat completions
+            availability_ttl: Seconds to reuse a provider availability check
+            cache_ttl_seconds: Time to live for cached responses
         """
+        if max_concurrency <= 0:
+            raise LLMClientError("max_concurrency must be positive")
+        
         self.provider_adapter = provider_adapter
         self.cache = cache
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self.semantic_cache = semantic_cache
+        self.max_concurrency = max_concurrency
+        # Created on first use so it binds to the running event loop
+        self._sem: Optional[asyncio.Semaphore] = None
+        self._availability_ttl = availability_ttl
+        # Monotonic time of the last successful check; failures are never reused
+        self._available_at: Optional[float] = None
+        self._batchers: Dict[Tuple[str, Optional[int], str], EmbeddingBatcher] = {}
+    
+    @classmethod
+    def from_settings(
+        cls,
+        settings: LLMSettings,
+        provider_adapter: Optional[LLMProviderAdapter] = None,
+        cache: Optional[Any] = None
+    ) -> "LLMClient":
+        """
+        Create a client using the concurrency limit and cache from LLM settings.
+        
+        When no cache is given, caching is enabled and a cache path is set,
+        a persistent DiskLLMCache is created at that path.
+        
+        Args:
+            settings: LLM configuration settings
+            provider_adapter: The provider adapter to use for LLM operations
+            cache: Optional cache implementation for storing responses
+            
+        Returns:
+            Configured LLM client
+        """
+        if cache is None and settings.cache_enabled and settings.cache_path is not None:
+            cache = DiskLLMCache(settings.cache_path)
+        
+        return cls(
+            provider_adapter=provider_adapter,
+            cache=cache,
+            max_concurrency=settings.llm_max_async
+        )
+    
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """Return the semaphore bounding concurrent provider calls."""
+        if self._sem is None:
+            self._sem = asyncio.Semaphore(self.max_concurrency)
+        return self._sem
+    
+    async def _check_available(self) -> None:
+        """
+        Raise if the provider is unavailable, reusing a recent successful check.
+        
+        Outages that start between checks surface as errors from the real call.
+        An unavailable result is not cached, so the next call probes again
+        instead of failing fast for the whole TTL after a transient blip.
+        
+        Raises:
+            LLMProviderError: If no adapter is configured or the provider
+                reported itself unavailable
+        """
+        adapter = self.provider_adapter
+        if adapter is None:
+            raise LLMProviderError("No provider adapter configured")
+        
+        now = time.monotonic()
+        if self._available_at is not None and now - self._available_at < self._availability_ttl:
+            return
+        
+        if not await adapter.is_available():
+            raise LLMProviderError("Provider is not available")
+        self._available_at = now
     
     async def get_chat_completion(
         self, 
@@ -112,26 +423,149 @@ class LLMClient:
             raise LLMProviderError("No provider adapter configured")
         
         # Check if provider is available
-        if not await self.provider_adapter.is_available():
-            raise LLMProviderError("Provider is not available")
+        await self._check_available()
         
         # Check cache if available
-        if self.cache:
+        cache = self.cache if self.cache and not config.no_cache else None
+        cache_key = None
+        if cache is not None:
             cache_key = self._generate_cache_key(messages, config)
-            cached_response = self.cache.get(cache_key)
+            cached_response: Optional[LLMResponse] = cache.get(cache_key)
             if cached_response:
                 return cached_response
         
+        # Fall back to a similarity lookup for deterministic requests
+        semantic_cache = self.semantic_cache
+        semantic_entry: Optional[Tuple[List[float], str]] = None
+        if semantic_cache is not None and not config.no_cache and config.temperature == 0:
+            semantic_result = await self._semantic_lookup(semantic_cache, messages, config)
+            if isinstance(semantic_result, LLMResponse):
+                return semantic_result
+            semantic_entry = semantic_result
+        
         # Get response from provider
-        response = await self.provider_adapter.get_chat_completion(messages, config)
+        async with self._get_semaphore():
+            response = await self.provider_adapter.get_chat_completion(messages, config)
         
         # Cache the response if cache is available
-        if self.cache:
-            cache_key = self._generate_cache_key(messages, config)
-            self.cache.set(cache_key, response)
+        if cache is not None:
+            cache.set(cache_key, response, ttl=self.cache_ttl_seconds)
+        
+        if semantic_cache is not None and semantic_entry is not None:
+            embedding, namespace = semantic_entry
+            semantic_cache.add(embedding, response, namespace)
         
         return response
     
+    async def stream_chat_completion(
+        self,
+        messages: List[ChatMessage],
+        config: ModelConfig
+    ) -> AsyncIterator[str]:
+        """
+        Stream a chat completion from the LLM provider.
+        
+        Content deltas are yielded as they arrive. A cached response is
+        yielded as a single chunk, and a fully consumed stream is cached
+        as one response.
+        
+        Args:
+            messages: List of chat messages
+            config: Model configuration
+            
+        Yields:
+            Content deltas of the completion
+            
+        Raises:
+            LLMProviderError: If the provider is unavailable or returns an error
+            LLMClientError: If messages list is empty
+        """
+        if not messages:
+            raise LLMClientError("Messages cannot be empty")
+        
+        if not self.provider_adapter:
+            raise LLMProviderError("No provider adapter configured")
+        
+        # Check if provider is available
+        await self._check_available()
+        
+        # Check cache if available
+        cache = self.cache if self.cache and not config.no_cache else None
+        cache_key = None
+        if cache is not None:
+            cache_key = self._generate_cache_key(messages, config)
+            cached_response: Optional[LLMResponse] = cache.get(cache_key)
+            if cached_response:
+                yield cached_response.content
+                return
+        
+        # Hold a concurrency slot for as long as the stream is open
+        chunks = []
+        async with self._get_semaphore():
+            stream = self.provider_adapter.stream_chat_completion(messages, config)
+            try:
+                async for delta in stream:
+                    chunks.append(delta)
+                    yield delta
+            finally:
+                # Close the provider stream now if the consumer stops early
+                aclose = getattr(stream, "aclose", None)
+                if aclose is not None:
+                    await aclose()
+        
+        # Cache the buffered response if cache is available
+        if cache is not None:
+            response = LLMResponse(content="".join(chunks), model=config.model_name)
+            cache.set(cache_key, response, ttl=self.cache_ttl_seconds)
+    
+    async def _semantic_lookup(
+        self,
+        semantic_cache: SemanticCache,
+        messages: List[ChatMessage],
+        config: ModelConfig
+    ) -> Optional[Union[LLMResponse, Tuple[List[float], str]]]:
+        """
+        Look up a chat completion in the semantic cache.
+        
+        The last user message is embedded and matched against earlier prompts
+        that share the same preceding messages and model configuration.
+        
+        Args:
+            semantic_cache: Semantic cache to search
+            messages: List of chat messages
+            config: Model configuration
+            
+        Returns:
+            The cached response on a hit, the (embedding, namespace) pair to
+            store the fresh response under on a miss, or None if the prompt
+            cannot be embedded
+        """
+        last_user = None
+        for index in range(len(messages) - 1, -1, -1):
+            if messages[index].role == _USER_ROLE:
+                last_user = index
+                break
+        if last_user is None or not messages[last_user].content.strip():
+            return None
+        
+        try:
+            embedding_response = await self.generate_embeddings(
+                [messages[last_user].content], semantic_cache.embedding_config
+            )
+        except LLMClientError:
+            # The real request still goes ahead without the semantic cache
+            return None
+        
+        embedding = embedding_response.embeddings[0]
+        context = messages[:last_user] + messages[last_user + 1:]
+        namespace = self._generate_cache_key(context, config)
+        
+        # The similarity scan is CPU-bound; keep it off the event loop
+        cached_response = await asyncio.to_thread(semantic_cache.lookup, embedding, namespace)
+        if cached_response is not None:
+            return cached_response
+        return embedding, namespace
+    
     async def generate_text(
         self, 
         prompt: str, 
@@ -188,26 +622,68 @@ class LLMClient:
             raise LLMProviderError("No provider adapter configured")
         
         # Check if provider is available
-        if not await self.provider_adapter.is_available():
-            raise LLMProviderError("Provider is not available")
+        await self._check_available()
         
         # Check cache if available
-        if self.cache:
+        cache = self.cache if self.cache else None
+        cache_key = None
+        if cache is not None:
             cache_key = self._generate_cache_key(texts, config)
-            cached_response = self.cache.get(cache_key)
+            cached_response: Optional[EmbeddingResponse] = cache.get(cache_key)
             if cached_response:
                 return cached_response
         
         # Get response from provider
-        response = await self.provider_adapter.generate_embeddings(texts, config)
+        async with self._get_semaphore():
+            response = await self.provider_adapter.generate_embeddings(texts, config)
         
         # Cache the response if cache is available
-        if self.cache:
-            cache_key = self._generate_cache_key(texts, config)
-            self.cache.set(cache_key, response)
+        if cache is not None:
+            cache.set(cache_key, response, ttl=self.cache_ttl_seconds)
         
         return response
     
+    async def embed_one(self, text: str, config: EmbeddingConfig) -> List[float]:
+        """
+        Generate an embedding for a single text via the micro-batcher.
+        
+        Concurrent calls sharing the same model, dimensions and encoding
+        format are coalesced into a single provider request.
+        
+        Args:
+            text: Text to generate an embedding for
+            config: Embedding configuration
+            
+        Returns:
+            Embedding vector for the text
+            
+        Raises:
+            LLMProviderError: If the provider is unavailable or returns an error
+            LLMClientError: If text is empty
+        """
+        if not text:
+            raise LLMClientError("Text cannot be empty")
+        
+        key = (config.model_name, config.dimensions, config.encoding_format)
+        batcher = self._batchers.get(key)
+        if batcher is None:
+            # Provider calls are also bounded by the client semaphore in generate_embeddings
+            batcher = EmbeddingBatcher(
+                self.generate_embeddings, config, max_in_flight=self.max_concurrency
+            )
+            self._batchers[key] = batcher
+        
+        return await batcher.submit(text)
+    
+    async def close(self) -> None:
+        """Stop any background embedding batchers and close the provider adapter."""
+        for batcher in self._batchers.values():
+            await batcher.close()
+        self._batchers.clear()
+        
+        if self.provider_adapter:
+            await self.provider_adapter.close()
+    
     def _generate_cache_key(
         self, 
         data: Union[List[ChatMessage], List[str]], 
@@ -216,6 +692,10 @@ class LLMClient:
         """
         Generate a cache key for the given data and configuration.
         
+        The key is a streaming 128-bit hash over a length-prefixed binary
+        encoding of the input and the config's scalar fields. Freshness is
+        enforced by the cache TTL rather than by the key.
+        
         Args:
             data: Input data (messages or texts)
             config: Model or embedding configuration
@@ -223,21 +703,25 @@ class LLMClient:
         Returns:
             Cache key string
         """
-        # Convert data to a serializable format
-        if isinstance(data, list) and data and isinstance(data[0], ChatMessage):
+        h = _new_key_hasher()
+        
+        if data and isinstance(data[0], ChatMessage):
             # Handle chat messages
-            data_dict = [msg.model_dump() for msg in data]
+            h.update(b"m")
+            for msg in data:
+                h.update(_ROLE_BYTES[msg.role])
+                _update_chunk(h, msg.content.encode())
+                _update_optional(h, msg.name.encode() if msg.name is not None else None)
+                _update_optional(
+                    h, _canonical_json(msg.function_call) if msg.function_call is not None else None
+                )
         else:
             # Handle list of strings
-            data_dict = data
-        
-        # Create a dictionary with all relevant data
-        cache_data = {
-            "data": data_dict,
-            "config": config.model_dump(),
-            "timestamp": int(time.time() / 3600)  # Hour-based cache key
-        }
-        
-        # Generate hash
-        cache_string = json.dumps(cache_data, sort_keys=True)
-        return hashlib.md5(cache_string.encode()).hexdigest() 
\ No newline at end of file
+            h.update(b"t")
+            for text in cast(List[str], data):
+                _update_chunk(h, text.encode())
+        
+        h.update(_config_fingerprint(config))
+        
+        key: str = h.hexdigest()
+        return key
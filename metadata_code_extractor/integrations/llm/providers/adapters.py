@@ -7,14 +7,11 @@ for different LLM providers including OpenAI (for OpenRouter) and Mock adapters.
 
 import asyncio
 import hashlib
+import importlib.util
 import random
 import time
-from typing import Any, Dict, List, Optional, Union
-
-try:
-    from openai import OpenAI
-except ImportError:
-    OpenAI = None
+from functools import lru_cache
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Union
 
 from metadata_code_extractor.integrations.llm.client import LLMProviderAdapter, LLMProviderError
 from metadata_code_extractor.core.models.llm import (
@@ -27,6 +24,121 @@ from metadata_code_extractor.core.models.llm import (
 )
 
 
+# The OpenAI SDK (and httpx) are imported by _load_openai() when an
+# OpenAIAdapter is first created, so mock-only runs never pay for them
+AsyncOpenAI: Any = None
+httpx: Any = None
+_RETRYABLE_ERRORS: tuple = ()
+_TIMEOUT_ERRORS: tuple = ()
+# The SDK's own default (600s read); long completions need the headroom
+_DEFAULT_TIMEOUT: Any = None
+
+# HTTP/2 needs the optional h2 package (httpx[http2])
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+def _retry_after_seconds(error: Exception) -> Optional[float]:
+    """Return the server-requested retry delay from an API error, if any."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    
+    for header, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        value = headers.get(header)
+        if value is None:
+            continue
+        try:
+            return max(0.0, float(value) * scale)
+        except (TypeError, ValueError):
+            # HTTP-date values are not worth parsing; fall back to backoff
+            continue
+    return None
+
+
+async def _with_backoff(
+    coro_fn: Callable[[], Awaitable[Any]],
+    *,
+    max_attempts: int = 5,
+    base: float = 0.1,
+    cap: float = 8.0,
+    retry_timeouts: bool = True
+) -> Any:
+    """
+    Await coro_fn, retrying transient provider errors with exponential backoff.
+    
+    Rate limits, timeouts, connection failures and 5xx responses are retried
+    with jittered delays of base * 2**attempt (capped at cap), or the server's
+    Retry-After when provided. Any other error propagates immediately.
+    Pass retry_timeouts=False for long generations, where a request that
+    timed out once would most likely time out again.
+    """
+    for attempt in range(max_attempts):
+        try:
+            return await coro_fn()
+        except _RETRYABLE_ERRORS as e:
+            if attempt == max_attempts - 1:
+                raise
+            if not retry_timeouts and isinstance(e, _TIMEOUT_ERRORS):
+                raise
+            delay = _retry_after_seconds(e)
+            if delay is None:
+                delay = min(cap, base * 2 ** attempt) * random.uniform(0.5, 1.5)
+            await asyncio.sleep(delay)
+
+
+def _load_openai() -> None:
+    """Import the OpenAI SDK and httpx on first use; missing packages stay None."""
+    global AsyncOpenAI, httpx, _RETRYABLE_ERRORS, _TIMEOUT_ERRORS, _DEFAULT_TIMEOUT
+    
+    if AsyncOpenAI is None or not _RETRYABLE_ERRORS:
+        try:
+            import openai
+        except ImportError:
+            return
+        
+        if AsyncOpenAI is None:
+            AsyncOpenAI = openai.AsyncOpenAI
+        # APITimeoutError subclasses APIConnectionError; listed for clarity
+        _RETRYABLE_ERRORS = (
+            openai.RateLimitError,
+            openai.APITimeoutError,
+            openai.APIConnectionError,
+            openai.InternalServerError,
+        )
+        _TIMEOUT_ERRORS = (openai.APITimeoutError,)
+        _DEFAULT_TIMEOUT = openai.DEFAULT_TIMEOUT
+    
+    if httpx is None:
+        try:
+            import httpx as httpx_module
+        except ImportError:
+            return
+        httpx = httpx_module
+
+
+def _build_http_client(timeout: Any) -> Optional[Any]:
+    """
+    Create a pooled HTTP client for the OpenAI SDK.
+    
+    Raises the connection pool limits so bursty async workloads don't hit
+    pool timeouts, and multiplexes requests over HTTP/2 when h2 is installed.
+    Returns None when httpx is unavailable so the SDK uses its own client.
+    """
+    if httpx is None:
+        return None
+    
+    return httpx.AsyncClient(
+        http2=_HTTP2_AVAILABLE,
+        limits=httpx.Limits(
+            max_connections=256,
+            max_keepalive_connections=64,
+            keepalive_expiry=60.0
+        ),
+        timeout=timeout
+    )
+
+
 class OpenAIAdapter(LLMProviderAdapter):
     """
     OpenAI adapter for LLM operations.
@@ -39,29 +151,69 @@ class OpenAIAdapter(LLMProviderAdapter):
         Initialize the OpenAI adapter.
         
         Args:
-            client: Optional pre-configured OpenAI client
-            config: Optional configuration dictionary with API settings
+            client: Optional pre-configured async OpenAI client. The adapter
+                retries transient errors itself, so build it with
+                ``max_retries=0`` to keep the SDK from retrying on top.
+            config: Optional configuration dictionary with API settings;
+                ``timeout`` overrides the SDK's default request timeout
         """
+        # Only an HTTP client created here is closed by close()
+        self._http_client = None
+        
+        # Needed for retry classification even with an injected client
+        _load_openai()
+        
         if client:
             self.client = client
         else:
-            if OpenAI is None:
+            if AsyncOpenAI is None:
                 raise ImportError("OpenAI package is required for OpenAIAdapter. Install with: pip install openai")
             
+            # Create client with provided configuration; without it the SDK
+            # falls back to environment variables. SDK retries are disabled
+            # because _with_backoff already retries transient errors.
+            client_kwargs: Dict[str, Any] = {"max_retries": 0}
             if config:
-                # Create client with provided configuration
-                client_kwargs = {}
                 if "api_key" in config:
                     client_kwargs["api_key"] = config["api_key"]
                 if "base_url" in config:
                     client_kwargs["base_url"] = config["base_url"]
                 if "organization" in config:
                     client_kwargs["organization"] = config["organization"]
-                
-                self.client = OpenAI(**client_kwargs)
-            else:
-                # Create client with default configuration (uses environment variables)
-                self.client = OpenAI()
+                if "timeout" in config:
+                    client_kwargs["timeout"] = config["timeout"]
+            
+            self._http_client = _build_http_client(client_kwargs.get("timeout", _DEFAULT_TIMEOUT))
+            if self._http_client is not None:
+                client_kwargs["http_client"] = self._http_client
+            
+            self.client = AsyncOpenAI(**client_kwargs)
+    
+    def _chat_params(self, messages: List[ChatMessage], config: ModelConfig) -> Dict[str, Any]:
+        """Build chat completion API parameters from messages and model config."""
+        # Convert ChatMessage objects to OpenAI format; use_enum_values=True
+        # makes role a plain string and unset name/function_call are dropped
+        openai_messages = [msg.model_dump(exclude_none=True) for msg in messages]
+        
+        # Prepare API call parameters
+        api_params = {
+            "model": config.model_name,
+            "messages": openai_messages,
+            "temperature": config.temperature,
+            "max_tokens": config.max_tokens,
+        }
+        
+        # Add optional parameters if specified
+        if config.top_p is not None:
+            api_params["top_p"] = config.top_p
+        if config.frequency_penalty is not None:
+            api_params["frequency_penalty"] = config.frequency_penalty
+        if config.presence_penalty is not None:
+            api_params["presence_penalty"] = config.presence_penalty
+        if config.stop is not None:
+            api_params["stop"] = config.stop
+        
+        return api_params
     
     async def get_chat_completion(
         self, 
@@ -70,39 +222,13 @@ class OpenAIAdapter(LLMProviderAdapter):
     ) -> LLMResponse:
         """Get a chat completion from the OpenAI API."""
         try:
-            # Convert ChatMessage objects to OpenAI format
-            openai_messages = []
-            for msg in messages:
-                openai_msg = {
-                    "role": msg.role,  # MessageRole enum with use_enum_values=True gives us the string directly
-                    "content": msg.content
-                }
-                if msg.name:
-                    openai_msg["name"] = msg.name
-                if msg.function_call:
-                    openai_msg["function_call"] = msg.function_call
-                openai_messages.append(openai_msg)
-            
-            # Prepare API call parameters
-            api_params = {
-                "model": config.model_name,
-                "messages": openai_messages,
-                "temperature": config.temperature,
-                "max_tokens": config.max_tokens,
-            }
+            api_params = self._chat_params(messages, config)
             
-            # Add optional parameters if specified
-            if config.top_p is not None:
-                api_params["top_p"] = config.top_p
-            if config.frequency_penalty is not None:
-                api_params["frequency_penalty"] = config.frequency_penalty
-            if config.presence_penalty is not None:
-                api_params["presence_penalty"] = config.presence_penalty
-            if config.stop is not None:
-                api_params["stop"] = config.stop
-            
-            # Make the API call
-            response = self.client.chat.completions.create(**api_params)
+            # Make the API call; a timed-out generation is not retried
+            response = await _with_backoff(
+                lambda: self.client.chat.completions.create(**api_params),
+                retry_timeouts=False
+            )
             
             # Convert response to our format
             usage = None
@@ -123,6 +249,34 @@ class OpenAIAdapter(LLMProviderAdapter):
         except Exception as e:
             raise LLMProviderError(f"OpenAI API error: {str(e)}") from e
     
+    async def stream_chat_completion(
+        self,
+        messages: List[ChatMessage],
+        config: ModelConfig
+    ) -> AsyncIterator[str]:
+        """Stream chat completion content deltas from the OpenAI API."""
+        try:
+            api_params = self._chat_params(messages, config)
+            
+            # Only opening the stream is retried; a broken stream cannot resume
+            stream = await _with_backoff(
+                lambda: self.client.chat.completions.create(**api_params, stream=True),
+                retry_timeouts=False
+            )
+            
+            # Close the HTTP response even if the consumer stops early
+            try:
+                async for chunk in stream:
+                    if chunk.choices:
+                        delta = chunk.choices[0].delta.content
+                        if delta:
+                            yield delta
+            finally:
+                await stream.close()
+            
+        except Exception as e:
+            raise LLMProviderError(f"OpenAI API error: {str(e)}") from e
+    
     async def generate_embeddings(
         self, 
         texts: List[str], 
@@ -131,7 +285,7 @@ class OpenAIAdapter(LLMProviderAdapter):
         """Generate embeddings using the OpenAI API."""
         try:
             # Prepare API call parameters
-            api_params = {
+            api_params: Dict[str, Any] = {
                 "model": config.model_name,
                 "input": texts,
                 "encoding_format": config.encoding_format
@@ -142,7 +296,9 @@ class OpenAIAdapter(LLMProviderAdapter):
                 api_params["dimensions"] = config.dimensions
             
             # Make the API call
-            response = self.client.embeddings.create(**api_params)
+            response = await _with_backoff(
+                lambda: self.client.embeddings.create(**api_params)
+            )
             
             # Convert response to our format
             embeddings = [item.embedding for item in response.data]
@@ -163,20 +319,38 @@ class OpenAIAdapter(LLMProviderAdapter):
         except Exception as e:
             raise LLMProviderError(f"OpenAI API error: {str(e)}") from e
     
+    async def close(self) -> None:
+        """Close the pooled HTTP client created by this adapter."""
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+    
     async def is_available(self) -> bool:
         """Check if the OpenAI API is available."""
         try:
-            # Make a simple test call to check availability
-            test_response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",  # Use a basic model for testing
-                messages=[{"role": "user", "content": "test"}],
-                max_tokens=1
-            )
-            return test_response is not None
+            # Listing models is cheap and consumes no generation quota
+            models = await self.client.models.list()
+            return models is not None
         except Exception:
             return False
 
 
+# ChatMessage uses use_enum_values=True, so roles are plain strings at runtime
+_USER_ROLE = MessageRole.USER.value
+
+# Mock embeddings repeat a 16-value MD5 pattern up to 384 dimensions
+_MOCK_EMBEDDING_DIM = 384
+_MOCK_EMBEDDING_REPEATS = _MOCK_EMBEDDING_DIM // hashlib.md5().digest_size
+
+
+@lru_cache(maxsize=4096)
+def _mock_embedding_pattern(text: str) -> tuple:
+    """Return the MD5 digest of text as 16 floats normalized to 0-1."""
+    # Raw digest bytes are iterated directly; no hex string round-trip
+    digest = hashlib.md5(text.encode(), usedforsecurity=False).digest()
+    return tuple(byte / 255.0 for byte in digest)
+
+
 class MockAdapter(LLMProviderAdapter):
     """
     Mock adapter for testing and development.
@@ -210,8 +384,10 @@ class MockAdapter(LLMProviderAdapter):
             raise LLMProviderError("Simulated failure")
         
         # Generate mock response based on input
-        user_messages = [msg.content for msg in messages if msg.role == MessageRole.USER]
-        last_user_message = user_messages[-1] if user_messages else "No user message"
+        last_user_message = next(
+            (msg.content for msg in reversed(messages) if msg.role == _USER_ROLE),
+            "No user message"
+        )
         
         mock_content = f"Mock response for: {last_user_message}"
         
@@ -237,25 +413,7 @@ class MockAdapter(LLMProviderAdapter):
             raise LLMProviderError("Simulated failure")
         
         # Generate deterministic mock embeddings based on text content
-        embeddings = []
-        for text in texts:
-            # Create a deterministic embedding based on text hash
-            text_hash = hashlib.md5(text.encode()).hexdigest()
-            
-            # Convert hash to numbers and normalize to create a 384-dimensional vector
-            embedding = []
-            for i in range(0, len(text_hash), 2):
-                # Take pairs of hex characters and convert to float
-                hex_pair = text_hash[i:i+2]
-                value = int(hex_pair, 16) / 255.0  # Normalize to 0-1
-                embedding.append(value)
-            
-            # Extend to 384 dimensions by repeating the pattern
-            while len(embedding) < 384:
-                embedding.extend(embedding[:min(len(embedding), 384 - len(embedding))])
-            
-            embedding = embedding[:384]  # Ensure exactly 384 dimensions
-            embeddings.append(embedding)
+        embeddings = [list(_mock_embedding_pattern(text)) * _MOCK_EMBEDDING_REPEATS for text in texts]
         
         return EmbeddingResponse(
             embeddings=embeddings,
@@ -0,0 +1,37 @@
+"""
+Precompile prompt templates into a single JSON file.
+
+Run at build time so ``PromptManager.load_templates`` can skip per-file
+YAML parsing at startup:
+
+    python -m metadata_code_extractor.prompts.compile_templates [TEMPLATE_DIR] [-o OUTPUT]
+"""
+import argparse
+import sys
+from typing import List, Optional
+
+from metadata_code_extractor.prompts.manager import PromptManager, PromptManagerError
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Compile the templates in TEMPLATE_DIR and write ``<TEMPLATE_DIR>.json``."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("template_dir", nargs="?", default=None,
+                        help="Template directory (defaults to PromptManager's default)")
+    parser.add_argument("-o", "--output", default=None,
+                        help="Output file (defaults to <template_dir>.json next to the directory)")
+    args = parser.parse_args(argv)
+
+    manager = PromptManager(template_dir=args.template_dir)
+    try:
+        output_path = manager.compile_templates(args.output)
+    except PromptManagerError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+
+    print(f"Compiled {len(manager)} templates to {output_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
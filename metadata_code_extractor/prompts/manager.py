@@ -4,13 +4,38 @@ Prompt Management System for LLM Integration.
 This module provides functionality for loading, managing, and using prompt templates
 from various file formats (YAML, JSON, TXT with frontmatter).
 """
+import os
 import re
 import json
+import string
 import yaml
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Tuple, Union
 from packaging import version
 
+# Prefer the libyaml C parser; fall back to the pure-Python one
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+# Shared formatter for partial fills; string.Formatter holds no state
+_FORMATTER = string.Formatter()
+
+# Version strings are a small, reused set; parse each one once
+_parse_version = lru_cache(maxsize=None)(version.parse)
+
+# Template file extensions loaded from the template directory
+_SUPPORTED_EXTENSIONS = {'.yaml', '.yml', '.json', '.txt'}
+
+# Placeholder scan for templates that string.Formatter cannot parse
+_PARAM_RE = re.compile(r'\{([^{}]+)\}')
+
+# YAML frontmatter block and body of a .txt template, LF or CRLF line endings
+_FRONTMATTER_RE = re.compile(r'\A---\r?\n(.*?)\r?\n---\r?\n(.*)\Z', re.DOTALL)
+
 
 class PromptManagerError(Exception):
     """Base exception for prompt manager errors."""
@@ -55,6 +80,16 @@ class PromptTemplate:
         self.version = version
         self.description = description
         self.metadata = metadata or {}
+        
+        # Parse placeholders once; fill() and get_parameters() reuse the tokens
+        self._parsed: Optional[List[Tuple[str, Optional[str], Optional[str], Optional[str]]]]
+        try:
+            self._parsed = list(_FORMATTER.parse(content))
+            self._param_set = frozenset(f for _, f, _, _ in self._parsed if f is not None)
+        except ValueError:
+            # Unbalanced braces: str.format would fail too, keep a regex scan for parameters
+            self._parsed = None
+            self._param_set = frozenset(_PARAM_RE.findall(content))
     
     def fill(self, **kwargs) -> str:
         """
@@ -66,36 +101,33 @@ class PromptTemplate:
         Returns:
             Template content with parameters filled
         """
-        try:
-            return self.content.format(**kwargs)
-        except KeyError as e:
-            # Handle partial parameter substitution by using format_map with a defaultdict
-            from collections import defaultdict
-            
-            # Create a defaultdict that returns the original placeholder for missing keys
-            format_dict = defaultdict(lambda: "{" + str(e).strip("'") + "}")
-            format_dict.update(kwargs)
+        if self._parsed is None or self._param_set <= kwargs.keys():
+            return self.content.format_map(kwargs)
+        
+        # Handle partial parameter substitution by walking the cached parse tokens
+        parts = []
+        for literal_text, field_name, format_spec, conversion in self._parsed:
+            parts.append(literal_text)
+            if field_name is None:
+                continue
             
-            # Use string.Formatter for more control over the formatting process
-            import string
-            formatter = string.Formatter()
-            
-            # Parse the format string and substitute only available parameters
-            result = ""
-            for literal_text, field_name, format_spec, conversion in formatter.parse(self.content):
-                result += literal_text
-                if field_name is not None:
-                    if field_name in kwargs:
-                        # Format the field with the provided value
-                        obj = kwargs[field_name]
-                        if conversion:
-                            obj = formatter.convert_field(obj, conversion)
-                        result += formatter.format_field(obj, format_spec)
-                    else:
-                        # Keep the original placeholder for missing parameters
-                        result += "{" + field_name + "}"
+            if field_name in kwargs:
+                obj = kwargs[field_name]
+            else:
+                # Resolve attribute/index fields such as {user.name}
+                try:
+                    obj, _ = _FORMATTER.get_field(field_name, (), kwargs)
+                except (KeyError, IndexError):
+                    # Keep the original placeholder for missing parameters
+                    parts.append("{" + field_name + "}")
+                    continue
             
-            return result
+            # Format the field with the provided value
+            if conversion:
+                obj = _FORMATTER.convert_field(obj, conversion)
+            parts.append(_FORMATTER.format_field(obj, format_spec))
+        
+        return "".join(parts)
     
     def get_parameters(self) -> List[str]:
         """
@@ -104,10 +136,7 @@ class PromptTemplate:
         Returns:
             List of parameter names found in the template
         """
-        # Find all {parameter} patterns in the content
-        pattern = r'\{([^}]+)\}'
-        matches = re.findall(pattern, self.content)
-        return list(set(matches))  # Remove duplicates
+        return list(self._param_set)
     
     def __repr__(self) -> str:
         return f"PromptTemplate(name='{self.name}', version='{self.version}')"
@@ -138,12 +167,21 @@ class PromptManager:
         
         self.template_dir = template_dir
         self._templates: Dict[str, Dict[str, PromptTemplate]] = {}
+        self._latest: Dict[str, str] = {}
         self._loaded = False
     
+    @property
+    def compiled_path(self) -> Path:
+        """Path of the precompiled ``<template_dir>.json`` file next to the template directory."""
+        return self.template_dir.parent / f"{self.template_dir.name}.json"
+    
     def load_templates(self) -> None:
         """
         Load all templates from the template directory.
         
+        A fresh precompiled file (see ``compile_templates``) is used instead of
+        parsing every template file.
+        
         Raises:
             PromptManagerError: If template directory doesn't exist
             TemplateFormatError: If template files have invalid format
@@ -152,20 +190,143 @@ class PromptManager:
             raise PromptManagerError(f"Template directory does not exist: {self.template_dir}")
         
         self._templates.clear()
+        self._latest.clear()
         
-        # Supported file extensions
-        supported_extensions = {'.yaml', '.yml', '.json', '.txt'}
+        if not self._load_compiled(self._source_manifest()):
+            self._load_source_files()
         
-        for file_path in self.template_dir.iterdir():
-            if file_path.is_file() and file_path.suffix.lower() in supported_extensions:
-                try:
-                    template = self._load_template_file(file_path)
-                    if template:
-                        self._add_template(template)
-                except Exception as e:
-                    raise TemplateFormatError(f"Error loading template from {file_path}: {e}")
+        self._loaded = True
+    
+    def _load_source_files(self) -> None:
+        """Parse every supported template file in the template directory."""
+        file_paths = [
+            file_path for file_path in self.template_dir.iterdir()
+            if file_path.is_file() and file_path.suffix.lower() in _SUPPORTED_EXTENSIONS
+        ]
+        
+        # Read and parse files in parallel; templates are added serially below
+        if len(file_paths) > 1:
+            max_workers = min(8, os.cpu_count() or 4, len(file_paths))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                templates = list(executor.map(self._load_source_file, file_paths))
+        else:
+            templates = [self._load_source_file(file_path) for file_path in file_paths]
+        
+        for template in templates:
+            if template:
+                self._add_template(template)
+    
+    def _load_source_file(self, file_path: Path) -> Optional[PromptTemplate]:
+        """Load one template file, wrapping any failure with the file path."""
+        try:
+            return self._load_template_file(file_path)
+        except Exception as e:
+            raise TemplateFormatError(f"Error loading template from {file_path}: {e}")
+    
+    def _source_manifest(self) -> Dict[str, List[int]]:
+        """
+        Snapshot the template files for freshness checks.
+        
+        Returns:
+            Mapping of file name to ``[size, st_mtime_ns]`` for every supported file
+        """
+        manifest = {}
+        with os.scandir(self.template_dir) as entries:
+            for entry in entries:
+                if entry.is_file() and os.path.splitext(entry.name)[1].lower() in _SUPPORTED_EXTENSIONS:
+                    st = entry.stat()
+                    manifest[entry.name] = [st.st_size, st.st_mtime_ns]
+        return manifest
+    
+    def _load_compiled(self, manifest: Dict[str, List[int]]) -> bool:
+        """
+        Populate templates from the precompiled file if it matches the source files.
         
+        Args:
+            manifest: Current source manifest from ``_source_manifest``
+            
+        Returns:
+            True if the compiled templates were loaded, False if missing or stale
+        """
+        try:
+            with open(self.compiled_path, 'rb') as f:
+                compiled = json.load(f)
+        except (OSError, ValueError):
+            return False
+        
+        if not isinstance(compiled, dict) or compiled.get('manifest') != manifest:
+            return False
+        
+        for name, versions in compiled.get('templates', {}).items():
+            for version_str, data in versions.items():
+                self._add_template(PromptTemplate(
+                    name=name,
+                    content=data['content'],
+                    version=version_str,
+                    description=data.get('description'),
+                    metadata=data.get('metadata')
+                ))
+        return True
+    
+    def compile_templates(self, output_path: Optional[Union[str, Path]] = None) -> Path:
+        """
+        Parse all template files and write them to a single JSON file.
+        
+        The size and mtime of every source file are stored in the header, so
+        ``load_templates`` falls back to parsing the files once any template is
+        added, removed or edited.
+        
+        Args:
+            output_path: Destination file. Defaults to ``compiled_path``.
+            
+        Returns:
+            Path of the written file
+            
+        Raises:
+            PromptManagerError: If the templates cannot be serialized or written
+        """
+        output_path = Path(output_path) if output_path is not None else self.compiled_path
+        
+        if not self.template_dir.is_dir():
+            raise PromptManagerError(f"Template directory does not exist: {self.template_dir}")
+        
+        # Always parse the source files, never a previously compiled copy
+        manifest = self._source_manifest()
+        self._templates.clear()
+        self._latest.clear()
+        self._load_source_files()
         self._loaded = True
+        
+        compiled = {
+            'manifest': manifest,
+            'templates': {
+                name: {
+                    version_str: {
+                        'content': template.content,
+                        'description': template.description,
+                        'metadata': template.metadata,
+                    }
+                    for version_str, template in versions.items()
+                }
+                for name, versions in self._templates.items()
+            },
+        }
+        try:
+            # YAML frontmatter may hold dates and other non-JSON scalars
+            payload = json.dumps(compiled, ensure_ascii=False, default=str)
+        except (TypeError, ValueError) as e:
+            raise PromptManagerError(f"Failed to serialize compiled templates: {e}")
+
+        # Atomic rename so a failed write never leaves a truncated file behind
+        tmp_path = output_path.with_name(f"{output_path.name}.tmp.{os.getpid()}")
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(payload)
+            os.replace(tmp_path, output_path)
+        except OSError as e:
+            tmp_path.unlink(missing_ok=True)
+            raise PromptManagerError(f"Failed to write compiled templates to {output_path}: {e}")
+        return output_path
     
     def _load_template_file(self, file_path: Path) -> Optional[PromptTemplate]:
         """
@@ -198,7 +359,7 @@ class PromptManager:
     def _load_yaml_template(self, content: str, file_path: Path) -> PromptTemplate:
         """Load template from YAML content."""
         try:
-            data = yaml.safe_load(content)
+            data = yaml.load(content, Loader=_YamlLoader)
         except yaml.YAMLError as e:
             raise TemplateFormatError(f"Failed to parse YAML in {file_path}: {e}")
         
@@ -216,21 +377,19 @@ class PromptManager:
     def _load_txt_template(self, content: str, file_path: Path) -> PromptTemplate:
         """Load template from text file with YAML frontmatter."""
         # Check for YAML frontmatter
-        if content.startswith('---\n'):
-            parts = content.split('---\n', 2)
-            if len(parts) >= 3:
-                # Has frontmatter
-                try:
-                    frontmatter = yaml.safe_load(parts[1])
-                    template_content = parts[2].strip()
-                except yaml.YAMLError as e:
-                    raise TemplateFormatError(f"Failed to parse YAML frontmatter in {file_path}: {e}")
-                
-                # Merge frontmatter with content
-                data = frontmatter.copy()
-                data['content'] = template_content
-                
-                return self._create_template_from_data(data, file_path)
+        match = _FRONTMATTER_RE.match(content)
+        if match:
+            try:
+                frontmatter = yaml.load(match.group(1), Loader=_YamlLoader)
+                template_content = match.group(2).strip()
+            except yaml.YAMLError as e:
+                raise TemplateFormatError(f"Failed to parse YAML frontmatter in {file_path}: {e}")
+            
+            # Merge frontmatter with content
+            data = frontmatter.copy()
+            data['content'] = template_content
+            
+            return self._create_template_from_data(data, file_path)
         
         # No frontmatter, treat as plain text template
         # Try to infer name from filename
@@ -274,7 +433,11 @@ class PromptManager:
         if template.name not in self._templates:
             self._templates[template.name] = {}
         
-        self._templates[template.name][template.version] = template
+        versions = self._templates[template.name]
+        versions[template.version] = template
+        
+        # Track the latest version so get_template(name) is a dict lookup
+        self._latest[template.name] = self._get_latest_version(list(versions))
     
     def get_template(self, name: str, version: Optional[str] = None) -> PromptTemplate:
         """
@@ -301,7 +464,9 @@ class PromptManager:
         
         if version is None:
             # Return latest version
-            latest_version = self._get_latest_version(list(template_versions.keys()))
+            latest_version = self._latest.get(name)
+            if latest_version not in template_versions:
+                latest_version = self._get_latest_version(list(template_versions.keys()))
             return template_versions[latest_version]
         else:
             if version not in template_versions:
@@ -323,10 +488,9 @@ class PromptManager:
         if len(versions) == 1:
             return versions[0]
         
-        # Sort versions using packaging.version for proper semantic versioning
+        # Compare versions using packaging.version for proper semantic versioning
         try:
-            sorted_versions = sorted(versions, key=lambda v: version.parse(v), reverse=True)
-            return sorted_versions[0]
+            return max(versions, key=_parse_version)
         except Exception:
             # Fallback to string sorting if version parsing fails
             return sorted(versions, reverse=True)[0]
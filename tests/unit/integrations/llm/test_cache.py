@@ -5,11 +5,11 @@ Tests cover in-memory and file-based cache implementations with proper
 expiration, serialization, and error handling.
 """
 
+import hashlib
 import json
 import os
 import tempfile
 import time
-from datetime import datetime, timedelta
 from pathlib import Path
 from unittest.mock import Mock, patch
 
@@ -24,10 +24,12 @@ from metadata_code_extractor.core.models.llm import (
     ModelConfig,
 )
 from metadata_code_extractor.integrations.llm.cache import (
+    DiskLLMCache,
     InMemoryLLMCache,
     FileLLMCache,
     LLMCacheInterface,
     LLMCacheError,
+    SemanticCache,
 )
 
 
@@ -254,7 +256,7 @@ class TestInMemoryLLMCache:
         
         Dependencies:
         - InMemoryLLMCache class with per-item TTL support
-        - datetime for time calculations
+        - time.monotonic for time calculations
         
         Notes: Per-item TTL enables different caching strategies for different
         types of requests, such as longer caching for stable prompts.
@@ -272,8 +274,8 @@ class TestInMemoryLLMCache:
         
         # Check that the expiry time is set correctly
         entry = cache._cache["test_key"]
-        expected_expiry = datetime.now() + timedelta(seconds=7200)
-        assert abs((entry["expires_at"] - expected_expiry).total_seconds()) < 1
+        expected_expiry = time.monotonic() + 7200
+        assert abs(entry["expires_at"] - expected_expiry) < 1
     
     def test_expiration(self):
         """
@@ -363,14 +365,14 @@ class TestInMemoryLLMCache:
         """
         Test getting cache size.
         
-        Purpose: Verify that InMemoryLLMCache can report its current size,
-        excluding expired entries for accurate memory usage tracking.
+        Purpose: Verify that InMemoryLLMCache can report its current size
+        in constant time, with expired entries dropped lazily on access.
         
         Checkpoints:
         - Empty cache reports size 0
         - Size increases as items are added
-        - Expired entries are not counted in size
-        - Size calculation is accurate and efficient
+        - Expired entries are counted until accessed
+        - Accessing an expired entry removes it
         
         Mocks: None - tests actual size calculation
         
@@ -402,20 +404,22 @@ class TestInMemoryLLMCache:
         cache.set("key3", response, ttl=0.1)
         time.sleep(0.2)
         
-        # Size should still be 2 (expired entries not counted)
+        # Expired entries are dropped lazily, on access
+        assert cache.size() == 3
+        assert cache.get("key3") is None
         assert cache.size() == 2
     
     def test_cleanup_expired(self):
         """
         Test cleanup of expired entries.
         
-        Purpose: Verify that InMemoryLLMCache automatically removes expired
-        entries during normal operations to prevent memory leaks.
+        Purpose: Verify that InMemoryLLMCache removes expired entries when
+        cleanup runs, to prevent memory leaks.
         
         Checkpoints:
         - Expired entries are removed from internal storage
         - Non-expired entries are preserved
-        - Cleanup occurs during size calculation
+        - Cleanup can be triggered explicitly
         - Memory is freed for expired entries
         
         Mocks: None - tests actual cleanup behavior
@@ -442,13 +446,56 @@ class TestInMemoryLLMCache:
         
         time.sleep(0.2)
         
-        # Trigger cleanup by calling size()
+        # Trigger cleanup
+        cache._cleanup_expired()
         assert cache.size() == 1
         
         # Check that expired entry is removed
         assert "key1" not in cache._cache
         assert "key2" in cache._cache
     
+    def test_lru_eviction(self):
+        """
+        Test least recently used eviction.
+        
+        Purpose: Verify that InMemoryLLMCache stays within max_entries by
+        evicting the least recently used entry.
+        
+        Checkpoints:
+        - Cache never holds more than max_entries entries
+        - Reading an entry marks it as recently used
+        - The least recently used entry is evicted first
+        - Non-positive max_entries is rejected
+        
+        Mocks: None - tests actual eviction behavior
+        
+        Dependencies:
+        - InMemoryLLMCache class with LRU eviction
+        
+        Notes: Bounded size keeps memory flat in long-running workers.
+        """
+        cache = InMemoryLLMCache(max_entries=2)
+        
+        response = LLMResponse(
+            content="Test response",
+            model="gpt-4",
+            usage={},
+            finish_reason="stop"
+        )
+        
+        cache.set("key1", response)
+        cache.set("key2", response)
+        assert cache.get("key1") is not None  # key2 is now least recently used
+        
+        cache.set("key3", response)
+        assert cache.size() == 2
+        assert cache.get("key2") is None
+        assert cache.get("key1") is not None
+        assert cache.get("key3") is not None
+        
+        with pytest.raises(ValueError, match="Max entries must be positive"):
+            InMemoryLLMCache(max_entries=0)
+    
     def test_invalid_response_type(self):
         """
         Test setting invalid response type raises error.
@@ -634,7 +681,7 @@ class TestFileLLMCache:
             cache_dir = Path(temp_dir) / "cache"
             assert not cache_dir.exists()
             
-            cache = FileLLMCache(cache_dir=cache_dir)
+            FileLLMCache(cache_dir=cache_dir)
             assert cache_dir.exists()
             assert cache_dir.is_dir()
     
@@ -845,6 +892,46 @@ class TestFileLLMCache:
             assert "response" in data
             assert "expires_at" in data
             assert data["response"]["content"] == "Test response"
+            assert isinstance(data["expires_at"], float)
+    
+    def test_stdlib_json_fallback(self):
+        """
+        Test file cache round trip without orjson installed.
+        
+        Purpose: Verify that FileLLMCache falls back to the stdlib json module
+        when the optional orjson dependency is unavailable.
+        
+        Checkpoints:
+        - Entries are written as compact JSON
+        - Entries can be read back with stdlib json and with orjson
+        - Payload is valid JSON with the response type in the envelope
+        
+        Mocks: orjson module reference set to None
+        
+        Dependencies:
+        - FileLLMCache class with optional orjson support
+        - tempfile for temporary directory
+        
+        Notes: orjson is an optional performance dependency (perf extra).
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = FileLLMCache(cache_dir=temp_dir)
+            
+            response = EmbeddingResponse(
+                embeddings=[[0.1, 0.2, 0.3]],
+                model="text-embedding-ada-002"
+            )
+            
+            with patch("metadata_code_extractor.integrations.llm.cache.orjson", None):
+                cache.set("stdlib_key", response)
+                assert b"\n" not in cache._get_cache_file_path("stdlib_key").read_bytes()
+                assert cache.get("stdlib_key") == response
+            
+            assert cache.get("stdlib_key") == response
+            
+            data = json.loads(cache._get_cache_file_path("stdlib_key").read_bytes())
+            assert data["response_type"] == "EmbeddingResponse"
+            assert data["response"]["embeddings"] == [[0.1, 0.2, 0.3]]
     
     def test_expiration(self):
         """
@@ -1019,8 +1106,12 @@ class TestFileLLMCache:
             
             time.sleep(0.2)
             
-            # Trigger cleanup
-            cache._cleanup_expired()
+            # File mtime carries the expiry time
+            assert cache._get_cache_file_path("key2").stat().st_mtime > time.time() + 3000
+            
+            # Trigger cleanup; it only stats files and never opens them
+            with patch('builtins.open', side_effect=AssertionError("file read during cleanup")):
+                cache._cleanup_expired()
             
             # Check that expired file is removed
             assert not cache._get_cache_file_path("key1").exists()
@@ -1174,6 +1265,50 @@ class TestFileLLMCache:
                 with pytest.raises(LLMCacheError, match="Failed to write cache file"):
                     cache.set("test_key", response)
     
+    def test_atomic_write(self):
+        """
+        Test that cache files are written atomically.
+        
+        Purpose: Verify that FileLLMCache writes through a temporary file and
+        renames it into place, so a failed write never leaves a partial entry.
+        
+        Checkpoints:
+        - Successful writes leave only the final cache file
+        - A failed rename leaves neither a temp file nor a cache file
+        - Failed writes raise LLMCacheError
+        
+        Mocks: os.replace to simulate a failed rename
+        
+        Dependencies:
+        - FileLLMCache class with atomic writes
+        - tempfile for temporary directory
+        
+        Notes: Atomic renames let several processes share one cache directory
+        without readers seeing truncated JSON.
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = FileLLMCache(cache_dir=temp_dir)
+            
+            response = LLMResponse(
+                content="Test response",
+                model="gpt-4",
+                usage={},
+                finish_reason="stop"
+            )
+            
+            cache.set("key1", response)
+            cache_file = cache._get_cache_file_path("key1")
+            assert [p.name for p in cache_file.parent.iterdir()] == [cache_file.name]
+            
+            with patch("metadata_code_extractor.integrations.llm.cache.os.replace",
+                       side_effect=OSError("rename failed")):
+                with pytest.raises(LLMCacheError, match="Failed to write cache file"):
+                    cache.set("key2", response)
+            
+            key2_file = cache._get_cache_file_path("key2")
+            assert not key2_file.exists()
+            assert list(key2_file.parent.iterdir()) == []
+    
     def test_get_cache_file_path(self):
         """
         Test cache file path generation.
@@ -1182,8 +1317,8 @@ class TestFileLLMCache:
         paths for cache keys, handling special characters appropriately.
         
         Checkpoints:
-        - Normal keys generate expected file paths
-        - Special characters are sanitized in file names
+        - Keys map to hashed files bucketed two directories deep
+        - Special characters never reach file names
         - File paths are safe for file system operations
         - Path generation is consistent and deterministic
         
@@ -1202,8 +1337,10 @@ class TestFileLLMCache:
             
             # Test normal key
             path = cache._get_cache_file_path("test_key")
-            expected = Path(temp_dir) / "test_key.json"
+            digest = hashlib.blake2b(b"test_key", digest_size=16).hexdigest()
+            expected = Path(temp_dir) / digest[:2] / digest[2:4] / f"{digest}.json"
             assert path == expected
+            assert cache._get_cache_file_path("test_key") == path
             
             # Test key with special characters
             path = cache._get_cache_file_path("test/key:with*special?chars")
@@ -1211,4 +1348,296 @@ class TestFileLLMCache:
             assert "/" not in path.name
             assert ":" not in path.name
             assert "*" not in path.name
-            assert "?" not in path.name 
\ No newline at end of file
+            assert "?" not in path.name 
+
+
+
+class TestDiskLLMCache:
+    """Test cases for DiskLLMCache."""
+    
+    def test_persists_across_instances(self):
+        """
+        Test that cached responses survive reopening the cache.
+        
+        Purpose: Verify that DiskLLMCache stores responses on disk so a new
+        instance pointed at the same path sees earlier entries.
+        
+        Checkpoints:
+        - LLM and embedding responses round-trip with their types intact
+        - A second cache instance on the same path returns stored entries
+        - Expired entries are not returned
+        - clear() removes all entries
+        
+        Mocks:
+        - time.time: Patched to move past the entry TTL
+        
+        Dependencies:
+        - DiskLLMCache class
+        - tempfile for temporary directory
+        
+        Notes: Persistence is the point of this backend, since in-memory
+        entries vanish on restart.
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            llm_response = LLMResponse(content="Test response", model="gpt-4", usage={"total_tokens": 3})
+            embedding_response = EmbeddingResponse(embeddings=[[0.1, 0.2]], model="embed")
+            
+            cache = DiskLLMCache(temp_dir, default_ttl=60)
+            cache.set("chat", llm_response)
+            cache.set("embed", embedding_response)
+            cache.close()
+            
+            reopened = DiskLLMCache(temp_dir, default_ttl=60)
+            assert reopened.get("chat") == llm_response
+            assert reopened.get("embed") == embedding_response
+            assert reopened.size() == 2
+            
+            with patch("metadata_code_extractor.integrations.llm.cache.time.time",
+                       return_value=time.time() + 120):
+                assert reopened.get("chat") is None
+            
+            reopened.clear()
+            assert reopened.size() == 0
+            reopened.close()
+    
+    def test_lru_eviction(self):
+        """
+        Test least-recently-used eviction when max_bytes is exceeded.
+        
+        Purpose: Verify that DiskLLMCache bounds its size by evicting the
+        entries that were accessed longest ago.
+        
+        Checkpoints:
+        - Reading an entry refreshes its recency
+        - Exceeding max_bytes evicts the least recently used entry
+        - Recently used entries are kept
+        
+        Mocks:
+        - time.time: Patched to give each operation a distinct timestamp
+        
+        Dependencies:
+        - DiskLLMCache class
+        - tempfile for temporary directory
+        
+        Notes: max_bytes is sized to hold exactly two of the test responses.
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            responses = {
+                key: LLMResponse(content=f"Response {key}", model="gpt-4")
+                for key in ("a", "b", "c")
+            }
+            entry_size = len(responses["a"].model_dump_json().encode("utf-8"))
+            cache = DiskLLMCache(temp_dir, max_bytes=entry_size * 2)
+            
+            clock = iter(range(1000, 2000))
+            with patch("metadata_code_extractor.integrations.llm.cache.time.time",
+                       side_effect=lambda: next(clock)):
+                cache.set("a", responses["a"])
+                cache.set("b", responses["b"])
+                assert cache.get("a") == responses["a"]  # "b" is now least recently used
+                cache.set("c", responses["c"])
+                
+                assert cache.get("b") is None
+                assert cache.get("a") == responses["a"]
+                assert cache.get("c") == responses["c"]
+            cache.close()
+    
+    def test_tracks_total_bytes_without_scans(self):
+        """
+        Test the running payload total and periodic expiry purge.
+        
+        Purpose: Verify that DiskLLMCache keeps its byte total in sync through
+        inserts, overwrites and deletes, and only purges expired entries
+        periodically or when over budget.
+        
+        Checkpoints:
+        - Stats total matches SUM(size) after inserts, overwrites and clear
+        - Expired entries are not purged on every write
+        - Expired entries are purged on the PURGE_INTERVAL-th write
+        
+        Mocks: None - uses a real SQLite database
+        
+        Dependencies:
+        - DiskLLMCache class
+        - tempfile for temporary directory
+        
+        Notes: The total lives in a stats row updated by triggers, so writes
+        avoid full-table SUM and DELETE scans.
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = DiskLLMCache(temp_dir, default_ttl=60)
+            
+            def table_bytes():
+                (total,) = cache._conn.execute(
+                    "SELECT COALESCE(SUM(size), 0) FROM entries"
+                ).fetchone()
+                return total
+            
+            cache.set("a", LLMResponse(content="short", model="gpt-4"))
+            cache.set("b", LLMResponse(content="longer response", model="gpt-4"))
+            cache.set("a", LLMResponse(content="overwritten and longer", model="gpt-4"))
+            assert cache._total_bytes() == table_bytes() > 0
+            
+            cache.set("expired", LLMResponse(content="old", model="gpt-4"), ttl=-10)
+            cache.set("c", LLMResponse(content="new", model="gpt-4"))
+            (rows,) = cache._conn.execute("SELECT COUNT(*) FROM entries").fetchone()
+            assert rows == 4  # expired entry not purged on an ordinary write
+            
+            cache._writes = cache.PURGE_INTERVAL - 1
+            cache.set("d", LLMResponse(content="new", model="gpt-4"))
+            (rows,) = cache._conn.execute("SELECT COUNT(*) FROM entries").fetchone()
+            assert rows == 4
+            assert cache._total_bytes() == table_bytes()
+            
+            cache.clear()
+            assert cache._total_bytes() == 0
+            cache.close()
+
+
+class TestSemanticCache:
+    """Test cases for SemanticCache."""
+    
+    def test_lookup_by_similarity(self):
+        """
+        Test similarity-based lookup within namespaces.
+        
+        Purpose: Verify that SemanticCache returns a stored response for
+        embeddings above the similarity threshold and nothing otherwise.
+        
+        Checkpoints:
+        - A nearly parallel embedding returns the stored response
+        - An orthogonal embedding misses
+        - Entries are not visible from other namespaces
+        - Expired entries are not returned and not counted
+        
+        Mocks:
+        - time.time: Patched to move past the entry TTL
+        
+        Dependencies:
+        - SemanticCache class
+        - LLMResponse and EmbeddingConfig models
+        
+        Notes: Similarity is cosine, so vector magnitude must not matter.
+        """
+        cache = SemanticCache(EmbeddingConfig(model_name="mock-embedding-model"), threshold=0.9)
+        response = LLMResponse(content="Cached", model="gpt-4")
+        
+        cache.add([1.0, 0.0, 0.0], response, "ns")
+        
+        assert cache.lookup([2.0, 0.1, 0.0], "ns") == response
+        assert cache.lookup([0.0, 1.0, 0.0], "ns") is None
+        assert cache.lookup([1.0, 0.0, 0.0], "other") is None
+        assert cache.size() == 1
+        
+        with patch("metadata_code_extractor.integrations.llm.cache.time.time",
+                   return_value=time.time() + 7200):
+            assert cache.lookup([1.0, 0.0, 0.0], "ns") is None
+            assert cache.size() == 0
+    
+    def test_evicts_oldest_entry_when_full(self):
+        """
+        Test capacity eviction within a namespace.
+        
+        Purpose: Verify that a full namespace drops its oldest entry when a new
+        one is added, while other namespaces are unaffected.
+        
+        Checkpoints:
+        - A namespace never holds more than max_entries entries
+        - The oldest entry is evicted first
+        - Newer entries remain retrievable
+        
+        Mocks: None - tests actual eviction behavior
+        
+        Dependencies:
+        - SemanticCache class
+        - LLMResponse and EmbeddingConfig models
+        
+        Notes: Entries are kept in a bounded deque, so eviction is O(1).
+        """
+        cache = SemanticCache(EmbeddingConfig(model_name="mock-embedding-model"), max_entries=2)
+        first = LLMResponse(content="first", model="gpt-4")
+        second = LLMResponse(content="second", model="gpt-4")
+        third = LLMResponse(content="third", model="gpt-4")
+        
+        cache.add([1.0, 0.0, 0.0], first, "ns")
+        cache.add([0.0, 1.0, 0.0], second, "ns")
+        cache.add([0.0, 0.0, 1.0], third, "ns")
+        cache.add([1.0, 0.0, 0.0], first, "other")
+        
+        assert cache.size() == 3
+        assert cache.lookup([1.0, 0.0, 0.0], "ns") is None
+        assert cache.lookup([0.0, 1.0, 0.0], "ns") == second
+        assert cache.lookup([0.0, 0.0, 1.0], "ns") == third
+        assert cache.lookup([1.0, 0.0, 0.0], "other") == first
+
+    def test_purges_expired_entries_on_insert(self):
+        """
+        Test that expired entries are removed by inserts, not lookups.
+
+        Purpose: Verify that lookups only skip expired entries while inserts
+        purge them every PURGE_INTERVAL writes.
+
+        Checkpoints:
+        - A lookup past the TTL misses but leaves the entries in place
+        - The next purging insert drops every expired entry
+        - Emptied namespaces are removed
+
+        Mocks:
+        - time.time: Patched to move past the entry TTL
+
+        Dependencies:
+        - SemanticCache class
+        - LLMResponse and EmbeddingConfig models
+
+        Notes: Scanning for expired entries on every lookup made each hit
+        O(n) in Python while holding the lock.
+        """
+        cache = SemanticCache(EmbeddingConfig(model_name="mock-embedding-model"))
+        cache.PURGE_INTERVAL = 3
+        response = LLMResponse(content="Cached", model="gpt-4")
+
+        cache.add([1.0, 0.0, 0.0], response, "old")
+        cache.add([0.0, 1.0, 0.0], response, "ns", ttl=1)
+
+        with patch("metadata_code_extractor.integrations.llm.cache.time.time",
+                   return_value=time.time() + 7200):
+            assert cache.lookup([1.0, 0.0, 0.0], "old") is None
+            assert len(cache._entries["old"]) == 1
+
+            cache.add([0.0, 0.0, 1.0], response, "ns")
+
+        assert "old" not in cache._entries
+        assert len(cache._entries["ns"]) == 1
+        assert cache.lookup([0.0, 0.0, 1.0], "ns") == response
+    
+    def test_init_invalid_params(self):
+        """
+        Test semantic cache initialization with invalid parameters.
+        
+        Purpose: Verify that SemanticCache rejects thresholds outside (0, 1]
+        and non-positive TTL or capacity values.
+        
+        Checkpoints:
+        - Threshold of 0 raises ValueError
+        - Threshold above 1 raises ValueError
+        - Non-positive TTL raises ValueError
+        - Non-positive max_entries raises ValueError
+        
+        Mocks: None - tests actual validation logic
+        
+        Dependencies:
+        - SemanticCache class
+        - pytest for exception testing
+        
+        Notes: Invalid thresholds would either match everything or nothing.
+        """
+        config = EmbeddingConfig(model_name="mock-embedding-model")
+        
+        with pytest.raises(ValueError, match="Threshold"):
+            SemanticCache(config, threshold=0.0)
+        with pytest.raises(ValueError, match="Threshold"):
+            SemanticCache(config, threshold=1.5)
+        with pytest.raises(ValueError, match="TTL must be positive"):
+            SemanticCache(config, default_ttl=0)
+        with pytest.raises(ValueError, match="Max entries must be positive"):
+            SemanticCache(config, max_entries=0)
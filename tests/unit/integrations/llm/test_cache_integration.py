@@ -15,10 +15,13 @@ from metadata_code_extractor.core.models.llm import (
     MessageRole,
     ModelConfig,
 )
+from metadata_code_extractor.core.models.config import LLMSettings
 from metadata_code_extractor.integrations.llm import (
+    DiskLLMCache,
     InMemoryLLMCache,
     LLMClient,
     LLMProviderAdapter,
+    SemanticCache,
 )
 
 
@@ -256,4 +259,156 @@ class TestLLMClientCacheIntegration:
         
         assert provider.call_count == 2
         assert response1.content == "Response 1"
-        assert response2.content == "Response 2" 
\ No newline at end of file
+        assert response2.content == "Response 2" 
+    
+    @pytest.mark.asyncio
+    async def test_semantic_cache_serves_similar_prompts(self):
+        """
+        Test that paraphrased deterministic prompts are served from the semantic cache.
+        
+        Purpose: Verify that the LLM client consults the semantic cache after an
+        exact-cache miss and only for requests where reuse is safe.
+        
+        Checkpoints:
+        - A paraphrased prompt at temperature 0 reuses the earlier response
+        - An unrelated prompt still reaches the provider
+        - Requests with temperature above 0 bypass the semantic cache
+        - Requests with no_cache set bypass the semantic cache
+        
+        Mocks:
+        - TopicProvider: Embeds texts by topic so paraphrases share a vector
+        
+        Dependencies:
+        - SemanticCache for similarity caching
+        - LLMClient for integration testing
+        - pytest.mark.asyncio for async test execution
+        
+        Notes: Non-zero temperatures are excluded so sampled output is never
+        replayed for a different prompt.
+        """
+        class TopicProvider(MockLLMProvider):
+            def __init__(self):
+                super().__init__()
+                self.chat_calls = 0
+            
+            async def get_chat_completion(self, messages, config):
+                self.chat_calls += 1
+                return await super().get_chat_completion(messages, config)
+            
+            async def generate_embeddings(self, texts, config):
+                return EmbeddingResponse(
+                    embeddings=[[1.0, 0.0] if "python" in t.lower() else [0.0, 1.0] for t in texts],
+                    model="mock-embedding-model"
+                )
+        
+        provider = TopicProvider()
+        semantic_cache = SemanticCache(EmbeddingConfig(model_name="mock-embedding-model"))
+        client = LLMClient(provider_adapter=provider, semantic_cache=semantic_cache)
+        config = ModelConfig(model_name="test-model", temperature=0.0)
+        
+        def ask(text):
+            return [ChatMessage(role=MessageRole.USER, content=text)]
+        
+        first = await client.get_chat_completion(ask("What is Python?"), config)
+        second = await client.get_chat_completion(ask("Explain python to me"), config)
+        assert provider.chat_calls == 1
+        assert second.content == first.content
+        
+        await client.get_chat_completion(ask("What is Rust?"), config)
+        assert provider.chat_calls == 2
+        
+        await client.get_chat_completion(
+            ask("What is Python?"), config.model_copy(update={"temperature": 0.5})
+        )
+        assert provider.chat_calls == 3
+        
+        await client.get_chat_completion(
+            ask("What is Python?"), config.model_copy(update={"no_cache": True})
+        )
+        assert provider.chat_calls == 4
+
+    
+    @pytest.mark.asyncio
+    async def test_from_settings_builds_disk_cache(self, tmp_path):
+        """
+        Test that LLM settings with a cache path produce a persistent cache.
+        
+        Purpose: Verify that LLMClient.from_settings wires cache_enabled and
+        cache_path into a DiskLLMCache whose entries survive a new client.
+        
+        Checkpoints:
+        - A DiskLLMCache is created when cache_path is set
+        - No cache is created when caching is disabled
+        - A second client on the same path serves the cached response
+        
+        Mocks:
+        - MockLLMProvider: Tracks API calls to verify cache hits
+        
+        Dependencies:
+        - LLMSettings configuration model
+        - DiskLLMCache for persistent caching
+        - pytest tmp_path fixture
+        
+        Notes: Each client opens its own connection to the same database,
+        mirroring a process restart.
+        """
+        settings = LLMSettings(cache_path=tmp_path / "llm_cache")
+        messages = [ChatMessage(role=MessageRole.USER, content="Test message")]
+        config = ModelConfig(model_name="test-model", temperature=0.1)
+        
+        provider = MockLLMProvider()
+        client = LLMClient.from_settings(settings, provider_adapter=provider)
+        assert isinstance(client.cache, DiskLLMCache)
+        await client.get_chat_completion(messages, config)
+        client.cache.close()
+        
+        restarted = LLMClient.from_settings(settings, provider_adapter=provider)
+        response = await restarted.get_chat_completion(messages, config)
+        assert provider.call_count == 1
+        assert response.content == "Response 1"
+        restarted.cache.close()
+        
+        disabled = LLMClient.from_settings(
+            settings.model_copy(update={"cache_enabled": False}), provider_adapter=provider
+        )
+        assert disabled.cache is None
+
+    
+    @pytest.mark.asyncio
+    async def test_stream_chat_completion_caches_full_response(self):
+        """
+        Test that a consumed stream is cached and replayed.
+        
+        Purpose: Verify that LLMClient.stream_chat_completion forwards provider
+        output, caches the joined content, and serves later requests from cache.
+        
+        Checkpoints:
+        - Providers without native streaming yield their full completion
+        - A fully consumed stream is stored in the cache
+        - A repeated request is served from cache without a provider call
+        
+        Mocks:
+        - MockLLMProvider: Uses the base-class streaming fallback
+        
+        Dependencies:
+        - InMemoryLLMCache for caching functionality
+        - LLMClient for integration testing
+        - pytest.mark.asyncio for async test execution
+        
+        Notes: Caching happens only after the stream is exhausted so partial
+        responses are never stored.
+        """
+        cache = InMemoryLLMCache(default_ttl=3600)
+        provider = MockLLMProvider()
+        client = LLMClient(provider_adapter=provider, cache=cache)
+        
+        messages = [ChatMessage(role=MessageRole.USER, content="Test message")]
+        config = ModelConfig(model_name="test-model", temperature=0.1)
+        
+        first = [delta async for delta in client.stream_chat_completion(messages, config)]
+        second = [delta async for delta in client.stream_chat_completion(messages, config)]
+        
+        assert first == ["Response 1"]
+        assert second == ["Response 1"]
+        assert provider.call_count == 1
+        assert cache.size() == 1
@@ -13,7 +13,7 @@ from unittest.mock import patch
 import pytest
 import yaml
 
-from metadata_code_extractor.core.config import ConfigLoader
+from metadata_code_extractor.core.config import ConfigLoader, _resolve_key_path, reset_config
 from metadata_code_extractor.core.models.config import AppConfig
 
 
@@ -389,4 +389,181 @@ class TestConfigLoader:
             with pytest.raises(Exception):  # Should raise validation error
                 loader.load(config_file=config_file)
         finally:
-            os.unlink(config_file) 
\ No newline at end of file
+            os.unlink(config_file) 
+    def test_merge_dicts_nested(self):
+        """
+        Test merging of nested configuration dictionaries.
+        
+        Purpose: Verify that ConfigLoader._merge_dicts combines nested dictionaries
+        key by key at every depth, with override values taking precedence.
+        
+        Checkpoints:
+        - Keys present only in the base are preserved at every level
+        - Override values replace base values, including non-dict replacements
+        - New nested keys from the override are added
+        - The base dictionary is left unmodified
+        
+        Mocks: None - tests the merge helper directly
+        
+        Dependencies:
+        - ConfigLoader class from core.config
+        
+        Notes: The merge walks nested dicts iteratively, so this also guards the
+        precedence rules for deep structures like llm.providers.<name>.*.
+        """
+        base = {
+            "llm": {
+                "providers": {"openai": {"api_key": "file-key", "timeout": 30}},
+                "model_params": {"temperature": 0.5},
+            },
+            "log_level": "INFO",
+        }
+        override = {
+            "llm": {
+                "providers": {"openai": {"api_key": "env-key"}, "mock": {"provider_name": "mock"}},
+                "model_params": 1,
+            },
+        }
+        
+        loader = ConfigLoader()
+        result = loader._merge_dicts(base, override)
+        
+        assert result == {
+            "llm": {
+                "providers": {
+                    "openai": {"api_key": "env-key", "timeout": 30},
+                    "mock": {"provider_name": "mock"},
+                },
+                "model_params": 1,
+            },
+            "log_level": "INFO",
+        }
+        assert base["llm"]["providers"]["openai"]["api_key"] == "file-key"
+        assert base["llm"]["model_params"] == {"temperature": 0.5}
+
+    def test_env_key_path_resolution(self):
+        """
+        Test resolution of environment variable key paths to nested config keys.
+        
+        Purpose: Verify that env key paths are routed to the correct nested
+        configuration keys, including compound field names and provider settings.
+        
+        Checkpoints:
+        - Known paths with underscores in field names map to a single field
+        - Provider paths split into provider name and compound field name
+        - Unknown paths fall back to a plain underscore split
+        
+        Mocks: None - tests the path resolver directly
+        
+        Dependencies:
+        - _resolve_key_path from core.config
+        
+        Notes: Key paths are resolved through a token trie built once at import,
+        so this guards that it agrees with the documented mappings.
+        """
+        assert _resolve_key_path("llm_default_embedding_model_name") == [
+            "llm", "default_embedding_model_name"
+        ]
+        assert _resolve_key_path("graph_db_type") == ["graph_db", "db_type"]
+        assert _resolve_key_path("llm_providers") == ["llm", "providers"]
+        assert _resolve_key_path("llm_providers_openai_api_key") == [
+            "llm", "providers", "openai", "api_key"
+        ]
+        assert _resolve_key_path("llm_providers_openai") == ["llm", "providers", "openai"]
+        assert _resolve_key_path("custom_setting") == ["custom", "setting"]
+
+    def test_load_is_memoized_on_inputs(self):
+        """
+        Test memoization of loaded configuration.
+        
+        Purpose: Verify that repeated loads with unchanged inputs reuse the
+        validated configuration, while a changed config file or MCE_* variable
+        triggers a fresh load.
+        
+        Checkpoints:
+        - A second load with the same file and environment does not re-read the file
+        - Each load returns its own AppConfig instance
+        - Changing an MCE_* environment variable is picked up
+        - Rewriting the config file (new modification time) is picked up
+        
+        Mocks:
+        - os.environ using patch.dict
+        - ConfigLoader._load_from_file wrapped to count file reads
+        
+        Dependencies:
+        - tempfile for creating the configuration file
+        - reset_config to clear the load cache
+        
+        Notes: Each returned config is a deep copy, so callers can modify theirs
+        without affecting later loads.
+        """
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
+            yaml.dump({"log_level": "DEBUG"}, f)
+            config_file = f.name
+        
+        try:
+            reset_config()
+            loader = ConfigLoader()
+            with patch.object(
+                ConfigLoader, "_load_from_file", autospec=True,
+                side_effect=ConfigLoader._load_from_file
+            ) as load_from_file, patch.dict(os.environ, {"MCE_LOG_LEVEL": "WARNING"}):
+                first = loader.load(config_file=config_file)
+                second = loader.load(config_file=config_file)
+                
+                assert load_from_file.call_count == 1
+                assert first is not second
+                assert second.log_level == "WARNING"
+                
+                first.log_level = "ERROR"
+                assert loader.load(config_file=config_file).log_level == "WARNING"
+                
+                os.environ["MCE_LOG_LEVEL"] = "ERROR"
+                assert loader.load(config_file=config_file).log_level == "ERROR"
+                assert load_from_file.call_count == 2
+                
+                del os.environ["MCE_LOG_LEVEL"]
+                with open(config_file, 'w') as f:
+                    yaml.dump({"log_level": "CRITICAL"}, f)
+                stat = os.stat(config_file)
+                os.utime(config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+                assert loader.load(config_file=config_file).log_level == "CRITICAL"
+        finally:
+            reset_config()
+            os.unlink(config_file)
+
+    def test_convert_env_value_types(self):
+        """
+        Test type conversion of environment variable values.
+        
+        Purpose: Verify that ConfigLoader._convert_env_value turns booleans and
+        numbers into typed values and leaves everything else as strings.
+        
+        Checkpoints:
+        - "true"/"false" in any case become booleans
+        - Signed integers become int
+        - Decimal and exponent forms become float
+        - API keys, URIs and words like "nan" remain strings
+        
+        Mocks: None - tests the converter directly
+        
+        Dependencies:
+        - ConfigLoader class from core.config
+        
+        Notes: Numbers are recognized by pattern rather than by attempting
+        conversions, so this pins down which strings count as numeric.
+        """
+        loader = ConfigLoader()
+        
+        assert loader._convert_env_value("TRUE") is True
+        assert loader._convert_env_value("false") is False
+        assert loader._convert_env_value("2048") == 2048
+        assert loader._convert_env_value("-3") == -3
+        assert loader._convert_env_value("0.1") == 0.1
+        assert loader._convert_env_value(".5") == 0.5
+        assert loader._convert_env_value("1e-3") == 0.001
+        assert isinstance(loader._convert_env_value("2048"), int)
+        assert loader._convert_env_value("sk-123") == "sk-123"
+        assert loader._convert_env_value("bolt://localhost:7687") == "bolt://localhost:7687"
+        assert loader._convert_env_value("nan") == "nan"
+        assert loader._convert_env_value("1.2.3") == "1.2.3"
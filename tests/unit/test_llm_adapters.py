@@ -7,8 +7,6 @@ OpenAI adapter (for OpenRouter) and Mock adapter for testing.
 
 import pytest
 from unittest.mock import AsyncMock, Mock, patch
-from typing import List, Optional
-import json
 
 from metadata_code_extractor.core.models.llm import (
     ChatMessage, MessageRole, ModelConfig, EmbeddingConfig, 
@@ -70,15 +68,17 @@ class TestOpenAIAdapter:
         
         Purpose: Create a mock OpenAI client for testing without actual API calls.
         
-        Notes: Mocks the synchronous OpenAI client structure with chat.completions
-        and embeddings endpoints. OpenAI client methods are synchronous, not async.
+        Notes: Mocks the AsyncOpenAI client structure with chat.completions
+        and embeddings endpoints. AsyncOpenAI client methods are coroutines.
         """
         client = Mock()
         client.chat = Mock()
         client.chat.completions = Mock()
-        client.chat.completions.create = Mock()  # OpenAI client methods are synchronous
+        client.chat.completions.create = AsyncMock()  # AsyncOpenAI client methods are awaited
         client.embeddings = Mock()
-        client.embeddings.create = Mock()  # OpenAI client methods are synchronous
+        client.embeddings.create = AsyncMock()  # AsyncOpenAI client methods are awaited
+        client.models = Mock()
+        client.models.list = AsyncMock()
         return client
     
     @pytest.fixture
@@ -177,7 +177,10 @@ class TestOpenAIAdapter:
         assert call_args.kwargs["model"] == "openai/gpt-4"
         assert call_args.kwargs["temperature"] == 0.7
         assert call_args.kwargs["max_tokens"] == 1024
-        assert len(call_args.kwargs["messages"]) == 2
+        assert call_args.kwargs["messages"] == [
+            {"role": "system", "content": "You are a helpful assistant."},
+            {"role": "user", "content": "What is Python?"}
+        ]
     
     @pytest.mark.asyncio
     async def test_generate_embeddings_success(self, mock_openai_client, openai_embedding_response,
@@ -232,6 +235,67 @@ class TestOpenAIAdapter:
         assert call_args.kwargs["model"] == "openai/text-embedding-ada-002"
         assert call_args.kwargs["input"] == texts
     
+    @pytest.mark.asyncio
+    async def test_stream_chat_completion(self, mock_openai_client, sample_chat_messages, sample_model_config):
+        """
+        Test streaming chat completion with OpenAI adapter.
+        
+        Purpose: Verify that the adapter requests a streamed completion and
+        yields content deltas in order as chunks arrive.
+        
+        Checkpoints:
+        - The API is called with stream=True
+        - Non-empty content deltas are yielded in order
+        - Chunks without choices or content are skipped
+        - The stream is closed after completion and when the consumer stops early
+        
+        Mocks:
+        - mock_openai_client: Mocked OpenAI client returning an async chunk stream
+          with an async close() like the SDK's AsyncStream
+        
+        Dependencies:
+        - OpenAIAdapter class from adapters module
+        
+        Notes: Streaming lets callers start processing before generation
+        completes, so deltas must be forwarded without buffering.
+        """
+        from metadata_code_extractor.integrations.llm.providers.adapters import OpenAIAdapter
+        
+        def chunk(content):
+            return Mock(choices=[Mock(delta=Mock(content=content))])
+        
+        class FakeStream:
+            def __init__(self, items):
+                self._items = iter(items)
+                self.close = AsyncMock()
+            
+            def __aiter__(self):
+                return self
+            
+            async def __anext__(self):
+                try:
+                    return next(self._items)
+                except StopIteration:
+                    raise StopAsyncIteration
+        
+        stream = FakeStream([chunk("Python "), Mock(choices=[]), chunk(None), chunk("is great")])
+        mock_openai_client.chat.completions.create.return_value = stream
+        adapter = OpenAIAdapter(client=mock_openai_client)
+        
+        deltas = [delta async for delta in adapter.stream_chat_completion(sample_chat_messages, sample_model_config)]
+        
+        assert deltas == ["Python ", "is great"]
+        assert mock_openai_client.chat.completions.create.call_args.kwargs["stream"] is True
+        stream.close.assert_awaited_once()
+        
+        # Consumer stops after the first delta
+        stream = FakeStream([chunk("Python "), chunk("is great")])
+        mock_openai_client.chat.completions.create.return_value = stream
+        deltas = adapter.stream_chat_completion(sample_chat_messages, sample_model_config)
+        assert await deltas.__anext__() == "Python "
+        await deltas.aclose()
+        stream.close.assert_awaited_once()
+    
     @pytest.mark.asyncio
     async def test_is_available_success(self, mock_openai_client):
         """
@@ -242,8 +306,8 @@ class TestOpenAIAdapter:
         
         Checkpoints:
         - is_available() returns True when client works
-        - Test call to OpenAI API succeeds
-        - Adapter performs actual connectivity check
+        - Model listing call to OpenAI API succeeds
+        - No chat completion is spent on the check
         
         Mocks:
         - mock_openai_client: Mocked OpenAI client with successful test response
@@ -251,17 +315,13 @@ class TestOpenAIAdapter:
         Dependencies:
         - OpenAIAdapter class from adapters module
         
-        Notes: The availability check performs a minimal test call to verify
-        the client can communicate with the API successfully.
+        Notes: The availability check lists models to verify the client can
+        communicate with the API without consuming generation quota.
         """
         from metadata_code_extractor.integrations.llm.providers.adapters import OpenAIAdapter
         
-        # Setup mock for a simple test call
-        test_response = Mock()
-        test_response.choices = [Mock()]
-        test_response.choices[0].message = Mock()
-        test_response.choices[0].message.content = "test"
-        mock_openai_client.chat.completions.create.return_value = test_response
+        # Setup mock for the model listing call
+        mock_openai_client.models.list.return_value = Mock(data=[Mock(id="gpt-4")])
         
         # Create adapter
         adapter = OpenAIAdapter(client=mock_openai_client)
@@ -271,7 +331,8 @@ class TestOpenAIAdapter:
         
         # Assertions
         assert result is True
-        mock_openai_client.chat.completions.create.assert_called_once()
+        mock_openai_client.models.list.assert_awaited_once()
+        mock_openai_client.chat.completions.create.assert_not_called()
     
     @pytest.mark.asyncio
     async def test_is_available_failure(self, mock_openai_client):
@@ -298,7 +359,7 @@ class TestOpenAIAdapter:
         from metadata_code_extractor.integrations.llm.providers.adapters import OpenAIAdapter
         
         # Setup mock to raise an exception
-        mock_openai_client.chat.completions.create.side_effect = Exception("API Error")
+        mock_openai_client.models.list.side_effect = Exception("API Error")
         
         # Create adapter
         adapter = OpenAIAdapter(client=mock_openai_client)
@@ -384,7 +445,155 @@ class TestOpenAIAdapter:
         # Test that error is wrapped and raised
         with pytest.raises(LLMProviderError, match="API Error"):
             await adapter.generate_embeddings(["test"], sample_embedding_config)
-    
+
+    @pytest.mark.asyncio
+    async def test_transient_errors_are_retried_with_backoff(self, mock_openai_client, openai_chat_response,
+                                                              sample_chat_messages, sample_model_config):
+        """
+        Test retry behaviour for transient and non-retryable API errors.
+
+        Purpose: Verify that rate limits are retried (honoring Retry-After)
+        while client errors such as 400 Bad Request fail immediately.
+
+        Checkpoints:
+        - A RateLimitError followed by success returns the successful response
+        - The Retry-After header value is used as the sleep delay
+        - A BadRequestError is wrapped in LLMProviderError without retrying
+
+        Mocks:
+        - mock_openai_client: Mocked OpenAI client raising openai errors
+        - asyncio.sleep: Patched to record delays without waiting
+
+        Dependencies:
+        - OpenAIAdapter class from adapters module
+        - openai exception classes
+
+        Notes: Error responses are built from Mock objects since the adapter
+        only inspects status codes and headers.
+        """
+        import openai
+
+        from metadata_code_extractor.integrations.llm.providers.adapters import OpenAIAdapter
+        from metadata_code_extractor.integrations.llm.client import LLMProviderError
+
+        rate_limited = openai.RateLimitError(
+            "slow down", response=Mock(status_code=429, headers={"retry-after": "0.25"}), body=None
+        )
+        mock_openai_client.chat.completions.create.side_effect = [rate_limited, openai_chat_response]
+        adapter = OpenAIAdapter(client=mock_openai_client)
+
+        with patch("metadata_code_extractor.integrations.llm.providers.adapters.asyncio.sleep",
+                   new_callable=AsyncMock) as mock_sleep:
+            result = await adapter.get_chat_completion(sample_chat_messages, sample_model_config)
+
+            assert result.content == openai_chat_response.choices[0].message.content
+            mock_sleep.assert_awaited_once_with(0.25)
+
+            bad_request = openai.BadRequestError(
+                "bad input", response=Mock(status_code=400, headers={}), body=None
+            )
+            mock_openai_client.chat.completions.create.side_effect = bad_request
+            mock_openai_client.chat.completions.create.reset_mock()
+
+            with pytest.raises(LLMProviderError, match="bad input"):
+                await adapter.get_chat_completion(sample_chat_messages, sample_model_config)
+            assert mock_openai_client.chat.completions.create.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_retry_attempts_are_bounded(self, mock_openai_client, sample_chat_messages,
+                                              sample_model_config):
+        """
+        Test the total number of attempts for a persistently failing call.
+
+        Purpose: Verify that retries happen only in the adapter, so a request
+        that keeps failing is attempted exactly max_attempts times.
+
+        Checkpoints:
+        - The adapter-built SDK client has its own retries disabled
+        - A persistent 5xx error is attempted five times, then raised
+        - The adapter sleeps between attempts but not after the last one
+
+        Mocks:
+        - mock_openai_client: Mocked OpenAI client that always fails
+        - AsyncOpenAI constructor to inspect SDK client settings
+        - asyncio.sleep: Patched to skip backoff delays
+
+        Dependencies:
+        - OpenAIAdapter class from adapters module
+        - openai exception classes
+
+        Notes: With SDK retries left at their default of 2, each adapter
+        attempt would become up to three HTTP requests.
+        """
+        import openai
+
+        from metadata_code_extractor.integrations.llm.providers.adapters import OpenAIAdapter
+        from metadata_code_extractor.integrations.llm.client import LLMProviderError
+
+        with patch('metadata_code_extractor.integrations.llm.providers.adapters.AsyncOpenAI',
+                   return_value=mock_openai_client) as mock_openai, \
+             patch('metadata_code_extractor.integrations.llm.providers.adapters._build_http_client',
+                   return_value=None):
+            adapter = OpenAIAdapter(config={"api_key": "test-key"})
+        assert mock_openai.call_args.kwargs["max_retries"] == 0
+
+        server_error = openai.InternalServerError(
+            "unavailable", response=Mock(status_code=503, headers={}), body=None
+        )
+        mock_openai_client.chat.completions.create.side_effect = server_error
+
+        with patch("metadata_code_extractor.integrations.llm.providers.adapters.asyncio.sleep",
+                   new_callable=AsyncMock) as mock_sleep:
+            with pytest.raises(LLMProviderError, match="unavailable"):
+                await adapter.get_chat_completion(sample_chat_messages, sample_model_config)
+
+        assert mock_openai_client.chat.completions.create.await_count == 5
+        assert mock_sleep.await_count == 4
+
+    @pytest.mark.asyncio
+    async def test_chat_timeouts_are_not_retried(self, mock_openai_client, sample_chat_messages,
+                                                 sample_model_config, sample_embedding_config):
+        """
+        Test that timed-out chat completions are not retried.
+
+        Purpose: Verify that a chat completion hitting the request timeout
+        fails on the first attempt, while embeddings still retry timeouts.
+
+        Checkpoints:
+        - An APITimeoutError on a chat completion is raised after one attempt
+        - An APITimeoutError on an embedding request is retried
+
+        Mocks:
+        - mock_openai_client: Mocked OpenAI client raising timeouts
+        - asyncio.sleep: Patched to skip backoff delays
+
+        Dependencies:
+        - OpenAIAdapter class from adapters module
+        - openai exception classes
+
+        Notes: A long generation that timed out once would most likely time
+        out again, so retrying only multiplies the wasted time.
+        """
+        import openai
+
+        from metadata_code_extractor.integrations.llm.providers.adapters import OpenAIAdapter
+        from metadata_code_extractor.integrations.llm.client import LLMProviderError
+
+        timeout_error = openai.APITimeoutError(request=Mock())
+        mock_openai_client.chat.completions.create.side_effect = timeout_error
+        mock_openai_client.embeddings.create.side_effect = timeout_error
+        adapter = OpenAIAdapter(client=mock_openai_client)
+
+        with patch("metadata_code_extractor.integrations.llm.providers.adapters.asyncio.sleep",
+                   new_callable=AsyncMock):
+            with pytest.raises(LLMProviderError):
+                await adapter.get_chat_completion(sample_chat_messages, sample_model_config)
+            with pytest.raises(LLMProviderError):
+                await adapter.generate_embeddings(["test"], sample_embedding_config)
+
+        assert mock_openai_client.chat.completions.create.await_count == 1
+        assert mock_openai_client.embeddings.create.await_count == 5
+
     def test_adapter_initialization_with_config(self):
         """
         Test adapter initialization with configuration.
@@ -415,11 +624,14 @@ class TestOpenAIAdapter:
             "organization": "test-org"
         }
         
-        with patch('metadata_code_extractor.integrations.llm.providers.adapters.OpenAI') as mock_openai:
-            adapter = OpenAIAdapter(config=config)
+        with patch('metadata_code_extractor.integrations.llm.providers.adapters.AsyncOpenAI') as mock_openai, \
+             patch('metadata_code_extractor.integrations.llm.providers.adapters._build_http_client',
+                   return_value=None):
+            OpenAIAdapter(config=config)
             
             # Verify OpenAI client was created with correct config
             mock_openai.assert_called_once_with(
+                max_retries=0,
                 api_key="test-key",
                 base_url="https://openrouter.ai/api/v1",
                 organization="test-org"
@@ -449,12 +661,62 @@ class TestOpenAIAdapter:
         """
         from metadata_code_extractor.integrations.llm.providers.adapters import OpenAIAdapter
         
-        with patch('metadata_code_extractor.integrations.llm.providers.adapters.OpenAI') as mock_openai:
-            adapter = OpenAIAdapter()
+        with patch('metadata_code_extractor.integrations.llm.providers.adapters.AsyncOpenAI') as mock_openai, \
+             patch('metadata_code_extractor.integrations.llm.providers.adapters._build_http_client',
+                   return_value=None):
+            OpenAIAdapter()
             
-            # Verify OpenAI client was created with default config
-            mock_openai.assert_called_once_with()
+            # Verify OpenAI client was created with default config and SDK retries off
+            mock_openai.assert_called_once_with(max_retries=0)
+
+    
+    @pytest.mark.asyncio
+    async def test_adapter_uses_pooled_http_client(self):
+        """
+        Test that the adapter supplies and closes a tuned HTTP client.
+        
+        Purpose: Verify that an adapter creating its own OpenAI client passes
+        a pooled HTTP client with raised limits and closes it on shutdown.
+        
+        Checkpoints:
+        - The HTTP client is built with raised connection limits
+        - The SDK's default request timeout is kept
+        - The HTTP client is passed to AsyncOpenAI
+        - close() awaits aclose() on the HTTP client exactly once
+        
+        Mocks:
+        - httpx module replaced with a Mock to capture client construction
+        - OpenAI client constructor using patch
+        
+        Dependencies:
+        - OpenAIAdapter class from adapters module
+        - unittest.mock.patch for module and constructor mocking
+        
+        Notes: Default pool limits cause PoolTimeout under bursty async
+        workloads, and unclosed pools leak sockets.
+        """
+        import openai
 
+        from metadata_code_extractor.integrations.llm.providers.adapters import OpenAIAdapter
+        
+        mock_httpx = Mock()
+        mock_httpx.AsyncClient.return_value.aclose = AsyncMock()
+        
+        with patch('metadata_code_extractor.integrations.llm.providers.adapters.AsyncOpenAI') as mock_openai, \
+             patch('metadata_code_extractor.integrations.llm.providers.adapters.httpx', mock_httpx):
+            adapter = OpenAIAdapter(config={"api_key": "test-key"})
+        
+        http_client = mock_httpx.AsyncClient.return_value
+        mock_httpx.Limits.assert_called_once_with(
+            max_connections=256, max_keepalive_connections=64, keepalive_expiry=60.0
+        )
+        # The SDK's default timeout is kept so long completions don't time out
+        assert mock_httpx.AsyncClient.call_args.kwargs["timeout"] is openai.DEFAULT_TIMEOUT
+        mock_openai.assert_called_once_with(max_retries=0, api_key="test-key", http_client=http_client)
+        
+        await adapter.close()
+        await adapter.close()
+        http_client.aclose.assert_awaited_once()
 
 class TestMockAdapter:
     """Test cases for the Mock adapter."""
@@ -658,6 +920,21 @@ class TestMockAdapter:
         assert result1.content != result2.content
         assert "Hello" in result1.content
         assert "Goodbye" in result2.content
+        
+        # Only the last user message is echoed in a multi-turn conversation
+        conversation = [
+            ChatMessage(role=MessageRole.USER, content="First"),
+            ChatMessage(role=MessageRole.ASSISTANT, content="Reply"),
+            ChatMessage(role=MessageRole.USER, content="Second"),
+            ChatMessage(role=MessageRole.SYSTEM, content="Trailing"),
+        ]
+        result3 = await adapter.get_chat_completion(conversation, sample_model_config)
+        assert result3.content == "Mock response for: Second"
+        
+        result4 = await adapter.get_chat_completion(
+            [ChatMessage(role=MessageRole.SYSTEM, content="System only")], sample_model_config
+        )
+        assert result4.content == "Mock response for: No user message"
     
     def test_mock_adapter_initialization(self):
         """
@@ -798,7 +1075,7 @@ class TestAdapterFactory:
             "base_url": "https://openrouter.ai/api/v1"
         }
         
-        with patch('metadata_code_extractor.integrations.llm.providers.adapters.OpenAI'):
+        with patch('metadata_code_extractor.integrations.llm.providers.adapters.AsyncOpenAI'):
             adapter = create_adapter(config)
             
             from metadata_code_extractor.integrations.llm.providers.adapters import OpenAIAdapter
@@ -840,6 +1117,39 @@ class TestAdapterFactory:
         assert adapter.response_delay == 0.2
         assert adapter.fail_rate == 0.1
     
+    def test_mock_adapter_does_not_import_openai(self):
+        """
+        Test that mock-only usage never imports the OpenAI SDK.
+        
+        Purpose: Verify that importing the adapters module and creating a mock
+        adapter leave the openai package unimported, keeping startup fast.
+        
+        Checkpoints:
+        - openai is not in sys.modules after importing adapters
+        - openai is not in sys.modules after creating a mock adapter
+        
+        Mocks: None - runs a fresh interpreter to observe real imports
+        
+        Dependencies:
+        - create_adapter factory function
+        - subprocess and sys for an isolated interpreter
+        
+        Notes: A fresh interpreter is required because other tests in this
+        session have already imported openai.
+        """
+        import subprocess
+        import sys
+        
+        code = (
+            "import sys\n"
+            "from metadata_code_extractor.integrations.llm.providers.adapters import create_adapter\n"
+            "create_adapter({'provider': 'mock'})\n"
+            "print('openai' in sys.modules)\n"
+        )
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        
+        assert result.stdout.strip() == "False"
+    
     def test_create_adapter_invalid_provider(self):
         """
         Test creating adapter with invalid provider.
@@ -372,6 +372,79 @@ class TestLLMClient:
         with pytest.raises(LLMProviderError, match="Provider is not available"):
             await client.get_chat_completion(sample_chat_messages, sample_model_config)
     
+    @pytest.mark.asyncio
+    async def test_availability_check_is_cached(self, mock_provider_adapter, sample_chat_messages,
+                                                sample_model_config, sample_llm_response):
+        """
+        Test that provider availability is checked at most once per TTL.
+
+        Purpose: Verify that LLMClient reuses a recent is_available() result
+        instead of probing the provider before every request.
+
+        Checkpoints:
+        - Consecutive requests within the TTL trigger a single availability check
+        - A zero TTL checks availability on every request
+
+        Mocks:
+        - mock_provider_adapter: Provider adapter tracking is_available calls
+
+        Dependencies:
+        - LLMClient class with availability checking
+
+        Notes: Availability probes can cost a full provider round-trip, so
+        repeating them per request doubles latency.
+        """
+        from metadata_code_extractor.integrations.llm.client import LLMClient
+
+        mock_provider_adapter.get_chat_completion.return_value = sample_llm_response
+
+        client = LLMClient(provider_adapter=mock_provider_adapter)
+        await client.get_chat_completion(sample_chat_messages, sample_model_config)
+        await client.get_chat_completion(sample_chat_messages, sample_model_config)
+        assert mock_provider_adapter.is_available.await_count == 1
+
+        client = LLMClient(provider_adapter=mock_provider_adapter, availability_ttl=0)
+        await client.get_chat_completion(sample_chat_messages, sample_model_config)
+        await client.get_chat_completion(sample_chat_messages, sample_model_config)
+        assert mock_provider_adapter.is_available.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_unavailable_result_is_not_cached(self, mock_provider_adapter, sample_chat_messages,
+                                                    sample_model_config, sample_llm_response):
+        """
+        Test that a failed availability check is retried on the next call.
+
+        Purpose: Verify that LLMClient only reuses successful availability
+        checks, so a transient failure does not disable the provider.
+
+        Checkpoints:
+        - An unavailable provider raises LLMProviderError
+        - The next request probes again and succeeds once the provider is back
+        - The successful result is then reused within the TTL
+
+        Mocks:
+        - mock_provider_adapter: Provider adapter that is briefly unavailable
+
+        Dependencies:
+        - LLMClient class with availability checking
+        - LLMProviderError for error validation
+
+        Notes: Caching a failure for the full TTL would turn one network blip
+        into 30 seconds of rejected requests.
+        """
+        from metadata_code_extractor.integrations.llm.client import LLMClient, LLMProviderError
+
+        mock_provider_adapter.get_chat_completion.return_value = sample_llm_response
+        mock_provider_adapter.is_available.side_effect = [False, True]
+
+        client = LLMClient(provider_adapter=mock_provider_adapter)
+        with pytest.raises(LLMProviderError, match="Provider is not available"):
+            await client.get_chat_completion(sample_chat_messages, sample_model_config)
+
+        await client.get_chat_completion(sample_chat_messages, sample_model_config)
+        await client.get_chat_completion(sample_chat_messages, sample_model_config)
+        assert mock_provider_adapter.is_available.await_count == 2
+
     def test_client_initialization_with_defaults(self):
         """
         Test client initialization with default parameters.
@@ -541,6 +614,307 @@ class TestLLMClient:
         assert len(cache_calls) == 2
         assert cache_calls[0][0][0] == cache_calls[1][0][0]  # Same cache key
 
+    def test_cache_key_distinguishes_inputs(self, sample_model_config, sample_embedding_config):
+        """
+        Test that cache keys change with every input that affects the response.
+
+        Purpose: Verify that the binary cache-key encoding keeps distinct
+        requests apart, including inputs whose concatenated text is identical.
+
+        Checkpoints:
+        - Equal inputs produce equal keys
+        - Moving text across a message or text boundary changes the key
+        - Changing the role or a config field changes the key
+        - Chat and embedding requests with the same text get different keys
+        - Function calls are keyed canonically, independent of dict order
+        - Absent optional fields differ from empty ones (name=None vs name="")
+        - A function call is never confused with the fields that follow it
+
+        Mocks: None - tests actual key generation
+
+        Dependencies:
+        - LLMClient class with caching support
+
+        Notes: Fields are length-prefixed, so ["ab", "c"] and ["a", "bc"]
+        must not collide.
+        """
+        from metadata_code_extractor.integrations.llm.client import LLMClient
+
+        client = LLMClient()
+        key = client._generate_cache_key
+
+        user = [ChatMessage(role=MessageRole.USER, content="hello")]
+        assert key(user, sample_model_config) == key(
+            [ChatMessage(role=MessageRole.USER, content="hello")], sample_model_config
+        )
+        assert key(user, sample_model_config) != key(
+            [ChatMessage(role=MessageRole.SYSTEM, content="hello")], sample_model_config
+        )
+        assert key(user, sample_model_config) != key(
+            user, sample_model_config.model_copy(update={"temperature": 0.0})
+        )
+        assert key(["ab", "c"], sample_embedding_config) != key(["a", "bc"], sample_embedding_config)
+        assert key(["hello"], sample_model_config) != key(user, sample_model_config)
+
+        def call(function_call):
+            return [ChatMessage(role=MessageRole.ASSISTANT, content="", function_call=function_call)]
+
+        assert key(call({"name": "f", "arguments": "{}"}), sample_model_config) == key(
+            call({"arguments": "{}", "name": "f"}), sample_model_config
+        )
+        assert key(call({"name": "f"}), sample_model_config) != key(call({"name": "g"}), sample_model_config)
+
+        # Optional fields carry a presence tag
+        assert key([ChatMessage(role=MessageRole.USER, content="hi", name=None)], sample_model_config) != key(
+            [ChatMessage(role=MessageRole.USER, content="hi", name="")], sample_model_config
+        )
+        assert key(call({}), sample_model_config) != key(call(None), sample_model_config)
+
+    def test_config_fingerprint_memoized(self, sample_model_config):
+        """
+        Test that config serialization is memoized per config object.
+
+        Purpose: Verify that reusing a ModelConfig across requests serializes
+        its fields once, and that the memo is released with the config.
+
+        Checkpoints:
+        - ModelConfig is frozen, so a memoized fingerprint cannot go stale
+        - Repeated lookups return the same bytes object
+        - The memo entry is removed once the config is garbage collected
+
+        Mocks: None - tests actual memoization
+
+        Dependencies:
+        - _config_fingerprint and _CONFIG_FINGERPRINTS from client module
+
+        Notes: Memoizing by id() is only safe because entries are dropped
+        before CPython can reuse the id.
+        """
+        import gc
+
+        from pydantic import ValidationError
+
+        from metadata_code_extractor.integrations.llm.client import (
+            _CONFIG_FINGERPRINTS,
+            _config_fingerprint,
+        )
+
+        with pytest.raises(ValidationError):
+            sample_model_config.temperature = 0.0
+
+        config = ModelConfig(model_name="memo-model", stop=["END"])
+        config_id = id(config)
+        assert _config_fingerprint(config) is _config_fingerprint(config)
+        assert config_id in _CONFIG_FINGERPRINTS
+
+        del config
+        gc.collect()
+        assert config_id not in _CONFIG_FINGERPRINTS
+
+    @pytest.mark.asyncio
+    async def test_cache_key_stable_over_time(self, mock_provider_adapter, sample_chat_messages,
+                                              sample_model_config, sample_llm_response):
+        """
+        Test that cache keys do not depend on wall-clock time.
+
+        Purpose: Verify that identical requests issued hours apart share a
+        cache key and that freshness is delegated to the cache TTL.
+
+        Checkpoints:
+        - Keys generated across an hour boundary are identical
+        - The key is computed once per request and reused for set()
+        - Responses are stored with the client's cache_ttl_seconds
+
+        Mocks:
+        - time.time: Patched to straddle an hour boundary
+        - mock_cache: Cache implementation recording set() calls
+
+        Dependencies:
+        - LLMClient class with caching support
+
+        Notes: A time-bucketed key would miss the cache for requests made
+        just before and after the top of the hour.
+        """
+        from metadata_code_extractor.integrations.llm.client import LLMClient
+
+        mock_cache = Mock()
+        mock_cache.get = Mock(return_value=None)
+        mock_provider_adapter.get_chat_completion.return_value = sample_llm_response
+        client = LLMClient(provider_adapter=mock_provider_adapter, cache=mock_cache, cache_ttl_seconds=120)
+
+        with patch("time.time", return_value=3599.0):
+            before = client._generate_cache_key(sample_chat_messages, sample_model_config)
+        with patch("time.time", return_value=3601.0):
+            after = client._generate_cache_key(sample_chat_messages, sample_model_config)
+        assert before == after
+
+        with patch.object(client, "_generate_cache_key", wraps=client._generate_cache_key) as key_spy:
+            await client.get_chat_completion(sample_chat_messages, sample_model_config)
+        key_spy.assert_called_once()
+        mock_cache.set.assert_called_once_with(before, sample_llm_response, ttl=120)
+
+    @pytest.mark.asyncio
+    async def test_max_concurrency_bounds_provider_calls(self, mock_provider_adapter, sample_chat_messages,
+                                                         sample_model_config, sample_llm_response):
+        """
+        Test that concurrent provider calls are bounded by max_concurrency.
+
+        Purpose: Verify that LLMClient never has more provider calls in flight
+        than its configured max_concurrency, even when many requests are gathered.
+
+        Checkpoints:
+        - All gathered requests complete and return the provider response
+        - Peak number of in-flight provider calls equals max_concurrency
+        - from_settings wires llm_max_async through to max_concurrency
+
+        Mocks:
+        - mock_provider_adapter: Provider adapter that records in-flight calls
+
+        Dependencies:
+        - LLMClient class with concurrency limiting
+        - LLMSettings configuration model
+
+        Notes: Unbounded fan-out exhausts HTTP connection pools and triggers
+        rate limiting, so the cap must hold under asyncio.gather.
+        """
+        import asyncio
+
+        from metadata_code_extractor.core.models.config import LLMSettings
+        from metadata_code_extractor.integrations.llm.client import LLMClient
+
+        in_flight = 0
+        peak = 0
+
+        async def slow_completion(messages, config):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return sample_llm_response
+
+        mock_provider_adapter.get_chat_completion.side_effect = slow_completion
+        client = LLMClient.from_settings(
+            LLMSettings(llm_max_async=3), provider_adapter=mock_provider_adapter
+        )
+        assert client.max_concurrency == 3
+
+        results = await asyncio.gather(*[
+            client.get_chat_completion(sample_chat_messages, sample_model_config)
+            for _ in range(10)
+        ])
+
+        assert results == [sample_llm_response] * 10
+        assert peak == 3
+
+    @pytest.mark.asyncio
+    async def test_embed_one_batches_concurrent_requests(self, mock_provider_adapter, sample_embedding_config):
+        """
+        Test that concurrent embed_one calls are coalesced into one request.
+
+        Purpose: Verify that the embedding micro-batcher sends texts submitted
+        together as a single provider call and routes each vector back to its caller.
+
+        Checkpoints:
+        - Each caller receives the embedding matching its own text
+        - Concurrent calls with the same config produce one provider request
+        - The batched request preserves submission order
+        - close() stops the background batcher
+
+        Mocks:
+        - mock_provider_adapter: Provider adapter returning one vector per text
+
+        Dependencies:
+        - LLMClient class with embed_one support
+        - EmbeddingBatcher class
+
+        Notes: Batching replaces N embedding round-trips with one, so the
+        per-item fan-out must be exact.
+        """
+        import asyncio
+
+        from metadata_code_extractor.integrations.llm.client import LLMClient
+
+        async def embed(texts, config):
+            return EmbeddingResponse(
+                embeddings=[[float(len(text))] for text in texts],
+                model=config.model_name
+            )
+
+        mock_provider_adapter.generate_embeddings.side_effect = embed
+        client = LLMClient(provider_adapter=mock_provider_adapter)
+
+        texts = ["a", "bb", "ccc", "dddd"]
+        results = await asyncio.gather(*[
+            client.embed_one(text, sample_embedding_config) for text in texts
+        ])
+
+        assert results == [[1.0], [2.0], [3.0], [4.0]]
+        mock_provider_adapter.generate_embeddings.assert_called_once_with(texts, sample_embedding_config)
+
+        await client.close()
+        assert client._batchers == {}
+
+    @pytest.mark.asyncio
+    async def test_embedding_batches_dispatch_concurrently(self, sample_embedding_config):
+        """
+        Test that a slow embedding batch does not hold up the next one.
+
+        Purpose: Verify that the batcher dispatches each batch as its own task,
+        bounded by max_in_flight, and that close() fails in-flight requests.
+
+        Checkpoints:
+        - A second batch is sent while the first is still waiting on the provider
+        - No more than max_in_flight batches run at once
+        - Requests queued while all slots are busy are merged into one batch
+        - close() fails requests whose batch is still in flight
+
+        Mocks:
+        - embed_fn: Coroutine blocking on an event to simulate slow provider calls
+
+        Dependencies:
+        - EmbeddingBatcher class
+
+        Notes: Serial dispatch made every request arriving during a slow call
+        wait a full extra round trip.
+        """
+        import asyncio
+
+        from metadata_code_extractor.integrations.llm.client import EmbeddingBatcher, LLMClientError
+
+        release = asyncio.Event()
+        calls = []
+
+        async def embed(texts, config):
+            calls.append(list(texts))
+            await release.wait()
+            return EmbeddingResponse(embeddings=[[1.0] for _ in texts], model=config.model_name)
+
+        batcher = EmbeddingBatcher(embed, sample_embedding_config, max_wait_ms=1, max_in_flight=2)
+
+        first = asyncio.ensure_future(batcher.submit("a"))
+        await asyncio.sleep(0.02)
+        second = asyncio.ensure_future(batcher.submit("b"))
+        await asyncio.sleep(0.02)
+        assert calls == [["a"], ["b"]]
+
+        # Both slots are busy, so these wait and go out together
+        third = asyncio.ensure_future(batcher.submit("c"))
+        fourth = asyncio.ensure_future(batcher.submit("d"))
+        await asyncio.sleep(0.02)
+        assert len(calls) == 2
+
+        release.set()
+        assert await asyncio.gather(first, second, third, fourth) == [[1.0]] * 4
+        assert calls[2] == ["c", "d"]
+
+        release.clear()
+        stuck = asyncio.ensure_future(batcher.submit("e"))
+        await asyncio.sleep(0.02)
+        await batcher.close()
+        with pytest.raises(LLMClientError, match="closed"):
+            await stuck
+
 
 class TestLLMProviderAdapter:
     """Test cases for the LLMProviderAdapter interface."""
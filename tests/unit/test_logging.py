@@ -11,7 +11,7 @@ from unittest.mock import patch
 
 import pytest
 
-from metadata_code_extractor.core.logging import setup_logging
+from metadata_code_extractor.core.logging import setup_logging, shutdown_logging
 
 
 class TestLogging:
@@ -96,6 +96,7 @@ class TestLogging:
         
         Notes: File logging is crucial for production deployments where logs
         need to be persisted and analyzed. This test ensures file logging works correctly.
+        Writes happen on a listener thread, so the test shuts logging down to flush.
         """
         with tempfile.NamedTemporaryFile(delete=False) as f:
             log_file = f.name
@@ -107,6 +108,9 @@ class TestLogging:
             logger = logging.getLogger("metadata_code_extractor.test")
             logger.info("Test message")
             
+            # Records are written by a background listener; stopping it flushes them
+            shutdown_logging()
+            
             # Check that file was created and contains log message
             assert Path(log_file).exists()
             with open(log_file, 'r') as f:
@@ -200,4 +204,125 @@ class TestLogging:
         final_handler_count = len(logging.getLogger("metadata_code_extractor").handlers)
         
         # Should not have more handlers after second call
-        assert final_handler_count == initial_handler_count 
\ No newline at end of file
+        assert final_handler_count == initial_handler_count
+
+    def test_log_messages_formatted_lazily(self):
+        """
+        Test that logging messages are passed as lazy %-style arguments.
+
+        Purpose: Verify that log records carry their arguments separately so
+        formatting is skipped when a record is filtered out.
+
+        Checkpoints:
+        - The level-change record keeps the %s template in msg
+        - The level is supplied via record args
+        - getMessage() renders the final text
+
+        Mocks: None - captures real records with a handler
+
+        Dependencies:
+        - setup_logging and set_log_level functions from core.logging
+        - Python logging module
+
+        Notes: f-string messages are built before the level check, which
+        wastes CPU for suppressed DEBUG output on hot paths.
+        """
+        from metadata_code_extractor.core.logging import set_log_level
+
+        records = []
+
+        class _Capture(logging.Handler):
+            def emit(self, record):
+                records.append(record)
+
+        setup_logging(level="INFO")
+        logging.getLogger("metadata_code_extractor").addHandler(_Capture())
+        set_log_level("WARNING")
+        set_log_level("INFO")
+
+        assert len(records) == 1
+        assert records[0].msg == "Log level changed to: %s"
+        assert records[0].args == ("INFO",)
+        assert records[0].getMessage() == "Log level changed to: INFO"
+
+    def test_handlers_run_behind_queue_listener(self):
+        """
+        Test that log I/O is moved off the calling thread.
+        
+        Purpose: Verify that setup_logging attaches only a QueueHandler to the
+        application logger and that set_log_level reaches the listener's handlers.
+        
+        Checkpoints:
+        - The application logger has a single QueueHandler
+        - Console and file handlers sit behind the queue listener
+        - set_log_level updates the listener's handler levels
+        - shutdown_logging detaches the queue handler
+        
+        Mocks: None - inspects the real logging configuration
+        
+        Dependencies:
+        - setup_logging, set_log_level and shutdown_logging from core.logging
+        - tempfile for creating test log files
+        
+        Notes: Writing records synchronously blocks the event loop during
+        per-file scans; the caller should only pay for an enqueue.
+        """
+        import logging.handlers
+        
+        from metadata_code_extractor.core import logging as mce_logging
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            setup_logging(level="INFO", log_file=str(Path(temp_dir) / "app.log"))
+            logger = logging.getLogger("metadata_code_extractor")
+            
+            assert [type(h) for h in logger.handlers] == [logging.handlers.QueueHandler]
+            listener_handlers = mce_logging._listener.handlers
+            assert any(isinstance(h, logging.handlers.RotatingFileHandler) for h in listener_handlers)
+            
+            mce_logging.set_log_level("ERROR")
+            assert all(h.level == logging.ERROR for h in listener_handlers)
+            
+            shutdown_logging()
+            assert logger.handlers == []
+            assert mce_logging._listener is None
+
+    def test_repeated_setup_is_noop(self):
+        """
+        Test that repeating an identical setup_logging call reuses the configuration.
+        
+        Purpose: Verify that setup_logging short-circuits when called again with
+        the same arguments, and rebuilds when any argument changes.
+        
+        Checkpoints:
+        - An identical call keeps the running listener and handlers
+        - Changing the level or log file rebuilds the configuration
+        - Handlers share the module-level formatters
+        
+        Mocks: None - inspects the real logging configuration
+        
+        Dependencies:
+        - setup_logging and shutdown_logging from core.logging
+        - tempfile for creating test log files
+        
+        Notes: Test fixtures often call setup_logging repeatedly, so the
+        identical case should not tear down and recreate handlers.
+        """
+        from metadata_code_extractor.core import logging as mce_logging
+        
+        setup_logging(level="INFO")
+        listener = mce_logging._listener
+        queue_handlers = list(logging.getLogger("metadata_code_extractor").handlers)
+        
+        setup_logging(level="INFO")
+        assert mce_logging._listener is listener
+        assert logging.getLogger("metadata_code_extractor").handlers == queue_handlers
+        assert listener.handlers[0].formatter is mce_logging._CONSOLE_FMT
+        
+        setup_logging(level="DEBUG")
+        assert mce_logging._listener is not listener
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            debug_listener = mce_logging._listener
+            setup_logging(level="DEBUG", log_file=str(Path(temp_dir) / "app.log"))
+            assert mce_logging._listener is not debug_listener
+            shutdown_logging()
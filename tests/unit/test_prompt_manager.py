@@ -209,6 +209,69 @@ class TestPromptTemplate:
         filled = template.fill()
         assert filled == "This is a static template."
 
+    
+    def test_prompt_template_format_spec_parameters(self):
+        """
+        Test parameters that carry format specs and conversions.
+        
+        Purpose: Verify that placeholders are parsed once at construction and that
+        format specs do not leak into parameter names or break partial fills.
+        
+        Checkpoints:
+        - Parameter names exclude format specs and conversions
+        - Escaped braces are not reported as parameters
+        - Full fill applies format specs
+        - Partial fill applies specs to provided values and keeps missing ones
+        
+        Mocks: None - tests actual template parsing
+        
+        Dependencies:
+        - PromptTemplate class with cached parse tokens
+        
+        Notes: Prompts often embed literal JSON, so escaped braces must survive.
+        """
+        template = PromptTemplate(
+            name="test_template",
+            content="Score {score:.2f} for {name!r} as {{\"json\": true}}",
+            version="1.0"
+        )
+        
+        assert set(template.get_parameters()) == {"score", "name"}
+        assert template.fill(score=0.5, name="x") == "Score 0.50 for 'x' as {\"json\": true}"
+        assert template.fill(score=0.5) == "Score 0.50 for {name} as {\"json\": true}"
+
+    
+    def test_prompt_template_fill_partial_field_access(self):
+        """
+        Test partial fills with attribute and index placeholders.
+        
+        Purpose: Verify that the partial-fill path resolves attribute and index
+        access against provided values, as str.format does.
+        
+        Checkpoints:
+        - Attribute placeholders are resolved when their root value is given
+        - Index placeholders are resolved when their root value is given
+        - Placeholders whose root value is missing are kept
+        
+        Mocks: None - tests actual template filling
+        
+        Dependencies:
+        - PromptTemplate class with cached parse tokens
+        
+        Notes: The partial path walks parse tokens cached at construction
+        instead of re-parsing the content.
+        """
+        template = PromptTemplate(
+            name="test_template",
+            content="{entity.name} has {fields[0]} and {missing}",
+            version="1.0"
+        )
+        entity = Mock()
+        entity.name = "User"
+        
+        assert template.fill(entity=entity, fields=["id"]) == "User has id and {missing}"
+        assert template.fill(fields=["id"]) == "{entity.name} has id and {missing}"
+
 
 class TestPromptManager:
     """Test the PromptManager class."""
@@ -459,6 +522,39 @@ Extract all validation rules for {entity_name}.
             assert "You are analyzing validation rules." in template.content
             assert "---" not in template.content  # Frontmatter should be removed
     
+    def test_load_txt_template_crlf_frontmatter(self):
+        """
+        Test parsing TXT template content with CRLF line endings.
+        
+        Purpose: Verify that frontmatter is detected when the content uses
+        Windows line endings, not only LF.
+        
+        Checkpoints:
+        - CRLF frontmatter is parsed as metadata
+        - Body after the closing delimiter becomes the template content
+        - Content without frontmatter falls back to the file name
+        
+        Mocks: None - calls the TXT parser directly
+        
+        Dependencies:
+        - PromptManager class with TXT/frontmatter loading support
+        
+        Notes: Files read in text mode already have universal newlines; content
+        passed in from other sources may still contain CRLF.
+        """
+        manager = PromptManager()
+        content = "---\r\nname: crlf_template\r\nversion: 2.0\r\n---\r\nBody {value}\r\n"
+        
+        template = manager._load_txt_template(content, Path("crlf.txt"))
+        assert template.name == "crlf_template"
+        assert template.version == "2.0"
+        assert template.content == "Body {value}"
+        
+        plain = manager._load_txt_template("--- not frontmatter", Path("plain.txt"))
+        assert plain.name == "plain"
+        assert plain.content == "--- not frontmatter"
+    
+
     def test_load_templates_multiple_versions(self):
         """
         Test loading multiple versions of the same template.
@@ -545,6 +641,45 @@ Extract all validation rules for {entity_name}.
             with pytest.raises(TemplateFormatError, match="Failed to parse YAML"):
                 manager.load_templates()
     
+    def test_load_templates_many_files(self):
+        """
+        Test loading a directory with many template files.
+        
+        Purpose: Verify that templates parsed in parallel are all registered
+        and that a failure in one file still surfaces as TemplateFormatError.
+        
+        Checkpoints:
+        - Every template file in the directory is loaded
+        - Errors from any file name the failing file
+        
+        Mocks: None - uses real temporary file system operations
+        
+        Dependencies:
+        - PromptManager class with parallel loading
+        - tempfile for creating test files
+        - yaml module for YAML serialization
+        
+        Notes: Files are read and parsed on a thread pool and added serially.
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            template_dir = Path(temp_dir)
+            
+            for i in range(12):
+                with open(template_dir / f"template_{i}.yaml", 'w') as f:
+                    yaml.dump({"name": f"template_{i}", "content": f"Content {i}"}, f)
+            
+            manager = PromptManager(template_dir=template_dir)
+            manager.load_templates()
+            
+            assert len(manager) == 12
+            assert manager.get_template("template_7").content == "Content 7"
+            
+            with open(template_dir / "broken.yaml", 'w') as f:
+                f.write("name: [unclosed")
+            
+            with pytest.raises(TemplateFormatError, match="broken.yaml"):
+                manager.reload_templates()
+    
     def test_load_templates_missing_required_fields(self):
         """
         Test handling of templates missing required fields.
@@ -725,6 +860,12 @@ Extract all validation rules for {entity_name}.
             
             template = manager.get_template("test_template")
             assert template.version == "2.1"  # Should be the latest version
+            
+            # Latest version is tracked at load time, not recomputed per lookup
+            assert manager._latest["test_template"] == "2.1"
+            with patch.object(manager, "_get_latest_version") as mock_latest:
+                assert manager.get_template("test_template").version == "2.1"
+            mock_latest.assert_not_called()
     
     def test_get_template_not_found(self):
         """
@@ -933,4 +1074,156 @@ Extract all validation rules for {entity_name}.
             
             # First access should trigger auto-load
             template = manager.get_template("auto_load_template")
-            assert template.content == "Auto loaded content" 
\ No newline at end of file
+            assert template.content == "Auto loaded content"
+
+    def test_load_templates_from_compiled_file(self):
+        """
+        Test loading templates from a precompiled JSON file.
+
+        Purpose: Verify that compile_templates writes a single JSON file that
+        load_templates uses while fresh, and that a stale file is ignored.
+
+        Checkpoints:
+        - Compiled file is written next to the template directory
+        - Fresh compiled file is loaded without parsing template files
+        - Compiled templates keep content, description and metadata
+        - Adding a template file makes the compiled file stale
+
+        Mocks: _load_source_files spy to detect per-file parsing
+
+        Dependencies:
+        - PromptManager class with compiled template support
+        - tempfile for creating test templates
+        - yaml module for template creation
+
+        Notes: The compiled file lets startup replace N YAML parses with a
+        single JSON load.
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            template_dir = Path(temp_dir) / "templates"
+            template_dir.mkdir()
+
+            yaml_content = {
+                "name": "compiled_template",
+                "version": "1.0",
+                "description": "Compiled test",
+                "content": "Analyze {code}",
+                "tags": ["analysis"]
+            }
+            with open(template_dir / "compiled_template.yaml", 'w') as f:
+                yaml.dump(yaml_content, f)
+
+            output_path = PromptManager(template_dir=template_dir).compile_templates()
+            assert output_path == Path(temp_dir) / "templates.json"
+            assert output_path.exists()
+
+            manager = PromptManager(template_dir=template_dir)
+            with patch.object(manager, "_load_source_files") as mock_source:
+                manager.load_templates()
+            mock_source.assert_not_called()
+
+            template = manager.get_template("compiled_template")
+            assert template.content == "Analyze {code}"
+            assert template.description == "Compiled test"
+            assert template.metadata == {"tags": ["analysis"]}
+
+            # A new file changes the manifest, so the compiled file is stale
+            with open(template_dir / "other.txt", 'w') as f:
+                f.write("Other content")
+
+            manager.reload_templates()
+            assert "other" in manager
+
+    def test_compiled_file_stale_after_in_place_edit(self):
+        """
+        Test that editing a template in place invalidates the compiled file.
+
+        Purpose: Verify that the compiled file is checked against each source
+        file, not only the directory, so in-place edits are picked up.
+
+        Checkpoints:
+        - Compiled templates are served while sources are unchanged
+        - Editing an existing file makes reload parse the source again
+        - The edited content is returned after reload
+
+        Mocks: None - uses real file system operations
+
+        Dependencies:
+        - PromptManager class with compiled template support
+        - tempfile for creating test templates
+        - yaml module for template creation
+
+        Notes: Editing a file in place leaves the directory mtime unchanged.
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            template_dir = Path(temp_dir) / "templates"
+            template_dir.mkdir()
+            yaml_file = template_dir / "edited.yaml"
+
+            yaml_content = {"name": "edited", "version": "1.0", "content": "Old content"}
+            with open(yaml_file, 'w') as f:
+                yaml.dump(yaml_content, f)
+
+            manager = PromptManager(template_dir=template_dir)
+            manager.compile_templates()
+            dir_stat = os.stat(template_dir)
+
+            manager.reload_templates()
+            assert manager.get_template("edited").content == "Old content"
+
+            # Rewrite in place and keep the directory mtime as it was
+            yaml_content["content"] = "New content, longer"
+            with open(yaml_file, 'w') as f:
+                yaml.dump(yaml_content, f)
+            os.utime(template_dir, ns=(dir_stat.st_atime_ns, dir_stat.st_mtime_ns))
+
+            manager.reload_templates()
+            assert manager.get_template("edited").content == "New content, longer"
+
+    def test_compile_templates_with_date_metadata(self):
+        """
+        Test compiling templates whose frontmatter holds non-JSON values.
+
+        Purpose: Verify that compile_templates serializes YAML scalars such as
+        dates and writes the compiled file atomically.
+
+        Checkpoints:
+        - A date-valued frontmatter field compiles without error
+        - The compiled file is valid JSON and is loaded on the next run
+        - No temporary file is left next to the output
+        - Write failures surface as PromptManagerError
+
+        Mocks: os.replace to simulate a failed write
+
+        Dependencies:
+        - PromptManager class with compiled template support
+        - tempfile for creating test templates
+
+        Notes: The YAML loader turns unquoted dates into datetime.date, which
+        json cannot encode by default.
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            template_dir = Path(temp_dir) / "templates"
+            template_dir.mkdir()
+            with open(template_dir / "dated.txt", 'w') as f:
+                f.write("---\nname: dated\ncreated: 2024-05-01\n---\nReview {code}")
+
+            manager = PromptManager(template_dir=template_dir)
+            output_path = manager.compile_templates()
+
+            with open(output_path) as f:
+                compiled = json.load(f)
+            assert compiled["templates"]["dated"]["1.0"]["metadata"] == {"created": "2024-05-01"}
+            assert sorted(os.listdir(temp_dir)) == ["templates", "templates.json"]
+
+            manager = PromptManager(template_dir=template_dir)
+            with patch.object(manager, "_load_source_files") as mock_source:
+                manager.load_templates()
+            mock_source.assert_not_called()
+            assert manager.get_template("dated").content == "Review {code}"
+
+            with patch("metadata_code_extractor.prompts.manager.os.replace",
+                       side_effect=OSError("disk full")):
+                with pytest.raises(PromptManagerError, match="Failed to write"):
+                    manager.compile_templates()
+            assert sorted(os.listdir(temp_dir)) == ["templates", "templates.json"]